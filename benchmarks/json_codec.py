@@ -0,0 +1,140 @@
+# benchmarks/json_codec.py
+#
+# Compares the JSON codecs available to the server on payloads shaped like real responses:
+#   python benchmarks/json_codec.py [--rows 20000] [--columns 2000] [--runs 5] [--output results.json]
+#
+# "query" mimics a create_execute_query result (column metadata plus row arrays),
+# "columns" a get_all_columns listing, and "arguments" a typical *_json tool
+# argument. For each codec it reports the median encode and decode time and the
+# encoded size. Codecs that are not installed (orjson) are skipped.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from codec import CODECS  # noqa: E402
+
+
+def query_payload(rows):
+    columns = [
+        ("order_id", "bigint"), ("customer", "varchar"), ("amount", "double"), ("currency", "varchar"),
+        ("created_at", "timestamp"), ("shipped", "boolean"), ("notes", "varchar"), ("region", "varchar"),
+    ]
+    return {
+        "response": {
+            "result": {
+                "columns": [{"name": name, "type": data_type} for name, data_type in columns],
+                "rows": [
+                    [
+                        index, f"customer-{index % 997}", round(random.uniform(1, 5000), 2), "EUR",
+                        f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d} 12:{index % 60:02d}:00.000",
+                        index % 3 == 0, None if index % 5 else "gift wrap, deliver after 5pm – ok", "eu-de",
+                    ]
+                    for index in range(rows)
+                ],
+            },
+            "message": {"code": "success", "message": ""},
+        },
+    }
+
+
+def columns_payload(columns):
+    return {
+        "columns": [
+            {
+                "column_name": f"column_{index}",
+                "type": random.choice(["varchar", "bigint", "double", "timestamp(6)", "decimal(18,2)"]),
+                "comment": "" if index % 4 else f"Business description of column {index}",
+                "schema_name": f"schema_{index % 20}",
+                "table_name": f"table_{index % 150}",
+                "catalog_name": "iceberg_data",
+                "extra": {"nullable": True, "ordinal_position": index % 40},
+            }
+            for index in range(columns)
+        ],
+        "total_count": columns,
+    }
+
+
+def arguments_payload():
+    return {
+        "bucket_display_name": "sales-landing",
+        "bucket_type": "ibm_cos",
+        "description": "Landing zone for sales extracts",
+        "managed_by": "customer",
+        "associated_catalog": {"catalog_name": "sales", "catalog_type": "iceberg"},
+        "bucket_details": {
+            "bucket_name": "sales-landing-eu", "endpoint": "https://s3.eu-de.cloud-object-storage.appdomain.cloud",
+            "access_key": "x" * 32, "secret_key": "y" * 48,
+        },
+        "tags": [f"tag-{index}" for index in range(20)],
+    }
+
+
+def _median_ms(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def measure(name, payload, runs):
+    try:
+        dumps, loads = CODECS[name]()
+    except ImportError:
+        return None
+    text = dumps(payload)
+    # Arguments are tiny, so they are timed in batches.
+    repeat = 1 if len(text) > 100_000 else 1000
+    return {
+        "bytes": len(text.encode()),
+        "encode_ms": _median_ms(lambda: [dumps(payload) for _ in range(repeat)], runs) / repeat,
+        "decode_ms": _median_ms(lambda: [loads(text) for _ in range(repeat)], runs) / repeat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON codecs on response-shaped payloads.")
+    parser.add_argument("--rows", type=int, default=20000, help="rows in the query result payload")
+    parser.add_argument("--columns", type=int, default=2000, help="entries in the column listing payload")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    random.seed(0)
+    payloads = {
+        "query": query_payload(args.rows),
+        "columns": columns_payload(args.columns),
+        "arguments": arguments_payload(),
+    }
+    results = {}
+    for payload_name, payload in payloads.items():
+        results[payload_name] = {}
+        for codec in CODECS:
+            measured = measure(codec, payload, args.runs)
+            if measured is None:
+                continue
+            results[payload_name][codec] = {key: round(value, 4) for key, value in measured.items()}
+        baseline = results[payload_name]["json"]
+        for codec, measured in results[payload_name].items():
+            measured["encode_speedup"] = round(baseline["encode_ms"] / measured["encode_ms"], 2)
+            measured["decode_speedup"] = round(baseline["decode_ms"] / measured["decode_ms"], 2)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# benchmarks/startup.py
+#
+# Measures how quickly a freshly spawned server becomes usable:
+#   python benchmarks/startup.py [--runs 5] [--budget-ms 400] [--tool list_catalogs] [--output results.json]
+#
+# Reports the in-process import time of server.py (and of FastMCP alone, as a
+# baseline), and, for a server spawned over stdio, the wall time from process
+# start until initialize, tools/list and a first tool call are answered. The
+# budget applies to the server's own share of the time to tools/list, that is
+# with the FastMCP import subtracted, since this server cannot make that faster.
+# The first tool call includes the deferred SDK import, client construction and
+# IAM token fetch, so it needs real credentials to be representative.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER = os.path.join(ROOT, "server.py")
+
+IMPORT_SNIPPET = (
+    "import sys, time; sys.path.insert(0, {root!r}); "
+    "t = time.perf_counter(); import server; print(time.perf_counter() - t)"
+)
+
+
+# Import cost of FastMCP on its own, which this server cannot avoid.
+BASELINE_SNIPPET = (
+    "import time; t = time.perf_counter(); "
+    "from mcp.server.fastmcp import FastMCP; print(time.perf_counter() - t)"
+)
+
+
+def measure_import(snippet):
+    out = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1]) * 1000
+
+
+def _send(proc, message):
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+
+
+def _wait_for(proc, request_id):
+    for line in proc.stdout:
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+    raise RuntimeError("server exited before answering request %s" % request_id)
+
+
+def measure_session(tool):
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, SERVER], cwd=ROOT, text=True,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _send(proc, {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "startup-benchmark", "version": "0"},
+            },
+        })
+        _wait_for(proc, 1)
+        initialize_ms = (time.perf_counter() - start) * 1000
+        _send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+        _send(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = _wait_for(proc, 2)["result"]["tools"]
+        tools_list_ms = (time.perf_counter() - start) * 1000
+
+        call_start = time.perf_counter()
+        _send(proc, {"jsonrpc": "2.0", "id": 3, "method": "tools/call", "params": {"name": tool, "arguments": {}}})
+        _wait_for(proc, 3)
+        first_call_ms = (time.perf_counter() - call_start) * 1000
+    finally:
+        proc.stdin.close()
+        proc.terminate()
+        proc.wait()
+    return {
+        "initialize_ms": initialize_ms,
+        "tools_list_ms": tools_list_ms,
+        "first_call_ms": first_call_ms,
+        "tools": len(tools),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure server startup and first-call latency.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=400.0,
+                        help="fail if the median time to answer tools/list, less the FastMCP import, exceeds this")
+    parser.add_argument("--tool", default="list_catalogs", help="tool used for the first-call measurement")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    baselines = [measure_import(BASELINE_SNIPPET) for _ in range(args.runs)]
+    imports = [measure_import(IMPORT_SNIPPET.format(root=ROOT)) for _ in range(args.runs)]
+    sessions = [measure_session(args.tool) for _ in range(args.runs)]
+
+    results = {
+        "runs": args.runs,
+        "fastmcp_import_ms": statistics.median(baselines),
+        "import_ms": statistics.median(imports),
+    }
+    results["server_import_overhead_ms"] = results["import_ms"] - results["fastmcp_import_ms"]
+    for metric in ("initialize_ms", "tools_list_ms", "first_call_ms"):
+        results[metric] = statistics.median(session[metric] for session in sessions)
+    results["tools_list_overhead_ms"] = results["tools_list_ms"] - results["fastmcp_import_ms"]
+    results["tools"] = sessions[-1]["tools"]
+    results["budget_ms"] = args.budget_ms
+    results["within_budget"] = results["tools_list_overhead_ms"] <= args.budget_ms
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if results["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+# bulk_ingest.py
+
+import asyncio
+import glob
+import os
+import time
+import uuid
+
+from executor import run_blocking
+from ingestion import FAILED_STATES, SUCCEEDED_STATES
+from resilience import idempotency_key
+from waiters import notify
+
+# Files are packed into jobs of about this many bytes, and at most this many files.
+TARGET_JOB_BYTES = int(os.getenv("WATSONX_DATA_BULK_INGEST_TARGET_BYTES", str(1024 ** 3)))
+MAX_FILES_PER_JOB = int(os.getenv("WATSONX_DATA_BULK_INGEST_MAX_FILES", "200"))
+# Jobs submitted at the same time, and submissions per job before it counts as failed.
+BULK_CONCURRENCY = int(os.getenv("WATSONX_DATA_BULK_INGEST_CONCURRENCY", "4"))
+BULK_ATTEMPTS = int(os.getenv("WATSONX_DATA_BULK_INGEST_ATTEMPTS", "3"))
+
+# Groups in these states are submitted again.
+RESUBMIT_STATES = FAILED_STATES | {"submit_failed"}
+
+FILE_TYPES = {".parquet": "parquet", ".csv": "csv", ".json": "json", ".orc": "orc", ".avro": "avro"}
+
+
+def collect_files(path):
+    """Files to ingest: every known data file directly in a directory, or the matches of a glob."""
+    if os.path.isdir(path):
+        paths = [os.path.join(path, name) for name in os.listdir(path)]
+    else:
+        paths = glob.glob(path, recursive=True)
+    files = []
+    for file_path in sorted(paths):
+        file_type = FILE_TYPES.get(os.path.splitext(file_path)[1].lower())
+        if file_type and os.path.isfile(file_path):
+            files.append((os.path.abspath(file_path), os.path.getsize(file_path), file_type))
+    return files
+
+
+def group_files(files, target_bytes=TARGET_JOB_BYTES, max_files=MAX_FILES_PER_JOB):
+    """Pack files into groups of one file type, each up to target_bytes and max_files.
+
+    A single file larger than target_bytes gets a group of its own.
+    """
+    groups = []
+    current = {}
+    for path, size, file_type in files:
+        group = current.get(file_type)
+        if group is None or (group["files"] and (
+            group["bytes"] + size > target_bytes or len(group["files"]) >= max_files
+        )):
+            group = current[file_type] = {"file_type": file_type, "files": [], "bytes": 0}
+            groups.append(group)
+        group["files"].append(path)
+        group["bytes"] += size
+    return groups
+
+
+async def _submit(submit, semaphore, template, group, job_id):
+    payload = dict(template)
+    payload["job_id"] = job_id
+    payload["source_data_files"] = ",".join(group["files"])
+    # Groups hold one resolved file type each; it always names the files being sent.
+    payload["source_file_type"] = group["file_type"]
+    # The job ID is unique per submission, so a transient failure can be retried safely.
+    idempotency_key.set(job_id)
+    async with semaphore:
+        await submit(body=payload)
+
+
+async def bulk_ingest(submit, tracker, path, template, target_bytes=TARGET_JOB_BYTES,
+                      max_concurrency=BULK_CONCURRENCY, max_attempts=BULK_ATTEMPTS, timeout=3600, ctx=None):
+    """Ingest every file matched by path as a set of jobs built from template.
+
+    Groups are submitted with bounded concurrency and followed by tracker; a
+    group whose submission or job fails is resubmitted under a new job ID up
+    to max_attempts times in total.
+    """
+    start = time.monotonic()
+    files = await run_blocking(collect_files, path)
+    if not files:
+        raise ValueError(f"No data files found at {path}.")
+    declared = template.get("source_file_type")
+    if declared:
+        others = sorted({file_type for _, _, file_type in files} - {str(declared).lower()})
+        if others:
+            raise ValueError(
+                f"The template's source_file_type is {declared}, but {path} also matches {', '.join(others)} "
+                "files; narrow the path or leave source_file_type out to ingest each type as its own jobs."
+            )
+    groups = group_files(files, target_bytes)
+    prefix = f"{template.get('job_id') or 'bulk'}-{uuid.uuid4().hex[:8]}"
+    for index, group in enumerate(groups):
+        group.update(index=index, attempts=0, job_id=None, state=None, error=None)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    deadline = start + timeout
+
+    pending = list(groups)
+    while pending:
+        for group in pending:
+            group["attempts"] += 1
+            group["job_id"] = f"{prefix}-{group['index']:04d}"
+            if group["attempts"] > 1:
+                group["job_id"] += f"-r{group['attempts'] - 1}"
+        outcomes = await asyncio.gather(
+            *(_submit(submit, semaphore, template, group, group["job_id"]) for group in pending),
+            return_exceptions=True,
+        )
+        submitted = []
+        for group, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                group["state"], group["error"] = "submit_failed", str(outcome)
+            else:
+                group["state"], group["error"] = "submitted", None
+                submitted.append(group)
+        await notify(ctx, f"Submitted {len(submitted)} of {len(pending)} ingestion jobs")
+        if submitted:
+            summary = await tracker.wait(
+                [group["job_id"] for group in submitted], max(0.0, deadline - time.monotonic()), ctx,
+            )
+            for group, job in zip(submitted, summary["jobs"]):
+                group["state"] = job["state"] or group["state"]
+                group["error"] = job["error"]
+        if time.monotonic() >= deadline:
+            break
+        pending = [
+            group for group in groups if group["state"] in RESUBMIT_STATES and group["attempts"] < max_attempts
+        ]
+
+    elapsed = time.monotonic() - start
+    succeeded = [group for group in groups if group["state"] in SUCCEEDED_STATES]
+    ingested_bytes = sum(group["bytes"] for group in succeeded)
+    return {
+        "files": len(files),
+        "bytes": sum(size for _, size, _ in files),
+        "jobs": [
+            {
+                "job_id": group["job_id"],
+                "files": len(group["files"]),
+                "bytes": group["bytes"],
+                "state": group["state"],
+                "attempts": group["attempts"],
+                "error": group["error"],
+            }
+            for group in groups
+        ],
+        "succeeded": len(succeeded),
+        "failed": sum(1 for group in groups if group["state"] in RESUBMIT_STATES),
+        "running": sum(1 for group in groups if group["state"] not in SUCCEEDED_STATES | RESUBMIT_STATES),
+        "resubmissions": sum(group["attempts"] - 1 for group in groups),
+        "elapsed_s": round(elapsed, 1),
+        "ingested_bytes": ingested_bytes,
+        "bytes_per_s": round(ingested_bytes / elapsed, 1) if elapsed else None,
+        "files_per_s": round(sum(len(group["files"]) for group in succeeded) / elapsed, 2) if elapsed else None,
+    }
+
@@ -0,0 +1,162 @@
+# cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds a cached metadata response stays fresh, per SDK operation. Each can be
+# overridden with WATSONX_DATA_CACHE_TTL_<OPERATION>, e.g. WATSONX_DATA_CACHE_TTL_LIST_CATALOGS=600.
+DEFAULT_TTL = float(os.getenv("WATSONX_DATA_METADATA_CACHE_TTL", "60"))
+METADATA_TTLS = {
+    "list_catalogs": 300,
+    "get_catalog": 300,
+    "list_schemas": 120,
+    "list_all_schemas": 120,
+    "list_tables": DEFAULT_TTL,
+    "list_all_tables": DEFAULT_TTL,
+    "get_table": DEFAULT_TTL,
+    "list_columns": DEFAULT_TTL,
+    "get_all_columns": DEFAULT_TTL,
+}
+METADATA_TTLS = {
+    operation: float(os.getenv(f"WATSONX_DATA_CACHE_TTL_{operation.upper()}", ttl))
+    for operation, ttl in METADATA_TTLS.items()
+}
+METADATA_CACHE_SIZE = int(os.getenv("WATSONX_DATA_METADATA_CACHE_SIZE", "256"))
+METADATA_CACHE_BYTES = int(os.getenv("WATSONX_DATA_METADATA_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+_CATALOG_READS = ("list_catalogs", "get_catalog")
+_SCHEMA_READS = ("list_schemas", "list_all_schemas")
+_TABLE_READS = ("list_tables", "list_all_tables", "get_table")
+_COLUMN_READS = ("list_columns", "get_all_columns")
+
+# Cached operations dropped when a mutating operation runs through this server.
+INVALIDATED_BY = {
+    "create_schema": _SCHEMA_READS + _TABLE_READS + _COLUMN_READS,
+    "delete_schema": _SCHEMA_READS + _TABLE_READS + _COLUMN_READS,
+    "update_table": _TABLE_READS + _COLUMN_READS,
+    "delete_table": _TABLE_READS + _COLUMN_READS,
+    "rollback_table": _TABLE_READS + _COLUMN_READS,
+    "create_columns": ("get_table",) + _COLUMN_READS,
+    "delete_column": ("get_table",) + _COLUMN_READS,
+    "update_column": ("get_table",) + _COLUMN_READS,
+    "update_sync_catalog": tuple(METADATA_TTLS),
+    "create_database_registration": _CATALOG_READS,
+    "delete_database_catalog": tuple(METADATA_TTLS),
+    "create_bucket_registration": _CATALOG_READS,
+    "delete_bucket_registration": tuple(METADATA_TTLS),
+}
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL.
+
+    Keys are tuples whose first element is the operation name, so all entries
+    for an operation can be invalidated together. With maxbytes set, entries
+    are also evicted until the sizes given to set() fit within it.
+    """
+
+    def __init__(self, maxsize, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so reads that started before a write
+        # can tell their result may be stale and must not be stored.
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key, value, ttl, generation=None, size=0):
+        """Store value; returns False when it was not stored (stale generation or larger than maxbytes)."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            if self.maxbytes is not None and size > self.maxbytes:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, size)
+            self.bytes += size
+            while len(self._entries) > self.maxsize or (
+                self.maxbytes is not None and self.bytes > self.maxbytes
+            ):
+                self._remove(next(iter(self._entries)))
+            return True
+
+    def pop(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            return self._remove(key)[1]
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= entry[2]
+        return entry
+
+    def invalidate(self, operations=None):
+        """Drop entries for the given operation names, or everything when None."""
+        with self._lock:
+            self.generation += 1
+            if operations is None:
+                self._entries.clear()
+                self.bytes = 0
+                return
+            operations = set(operations)
+            for key in [key for key in self._entries if key[0] in operations]:
+                self._remove(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "bytes": self.bytes,
+                "maxbytes": self.maxbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class MetadataCache(TTLCache):
+    """TTLCache that knows which SDK operations are cacheable and what writes invalidate."""
+
+    def __init__(self, maxsize, ttls, invalidated_by, maxbytes=None):
+        super().__init__(maxsize, maxbytes)
+        self.ttls = ttls
+        self.invalidated_by = invalidated_by
+
+    def ttl_for(self, operation):
+        return self.ttls.get(operation)
+
+    def after_call(self, operation, succeeded=True):
+        dependents = self.invalidated_by.get(operation)
+        if dependents:
+            self.invalidate(dependents)
+
+
+def make_key(operation, args, kwargs):
+    key = (operation, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+metadata_cache = MetadataCache(METADATA_CACHE_SIZE, METADATA_TTLS, INVALIDATED_BY, maxbytes=METADATA_CACHE_BYTES)
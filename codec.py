@@ -0,0 +1,64 @@
+# codec.py
+
+import json
+import os
+
+import pydantic_core
+
+# JSON library used for tool arguments, query results and tool responses: "auto"
+# picks orjson when it is installed and the standard library otherwise.
+JSON_CODEC = os.getenv("WATSONX_DATA_JSON_CODEC", "auto").lower()
+
+
+def _stdlib_codec():
+    def dumps(obj):
+        return json.dumps(obj, default=pydantic_core.to_jsonable_python, ensure_ascii=False, separators=(",", ":"))
+
+    return dumps, json.loads
+
+
+def _pydantic_codec():
+    def dumps(obj):
+        return pydantic_core.to_json(obj, fallback=str).decode()
+
+    return dumps, pydantic_core.from_json
+
+
+def _orjson_codec():
+    import orjson
+
+    stdlib_dumps, _ = _stdlib_codec()
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj):
+        try:
+            return orjson.dumps(obj, default=pydantic_core.to_jsonable_python, option=options).decode()
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits and other values orjson refuses.
+            return stdlib_dumps(obj)
+
+    return dumps, orjson.loads
+
+
+CODECS = {"orjson": _orjson_codec, "pydantic": _pydantic_codec, "json": _stdlib_codec}
+
+
+def get_codec(name=JSON_CODEC):
+    """(name, dumps, loads) for a codec; "auto" falls back from orjson to the standard library."""
+    if name == "auto":
+        try:
+            return ("orjson", *_orjson_codec())
+        except ImportError:
+            return ("json", *_stdlib_codec())
+    if name not in CODECS:
+        raise ValueError(f"WATSONX_DATA_JSON_CODEC must be one of: auto, {', '.join(CODECS)}.")
+    return (name, *CODECS[name]())
+
+
+# dumps(obj) returns compact JSON text; loads accepts str or bytes. Decode errors are ValueErrors.
+CODEC, dumps, loads = get_codec()
+
+
+def encoded_size(obj):
+    """Bytes of obj encoded as JSON. Encodes the whole value, so keep large ones off the event loop."""
+    return len(dumps(obj).encode())
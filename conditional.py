@@ -0,0 +1,72 @@
+# conditional.py
+
+import os
+
+from cache import TTLCache
+from codec import encoded_size
+
+# How long the last response of a cached read is kept, after its TTL, to revalidate
+# with If-None-Match/If-Modified-Since instead of downloading it again.
+CONDITIONAL_WINDOW = float(os.getenv("WATSONX_DATA_CONDITIONAL_WINDOW", "3600"))
+CONDITIONAL_CACHE_SIZE = int(os.getenv("WATSONX_DATA_CONDITIONAL_CACHE_SIZE", "256"))
+
+
+def validators(response):
+    """ETag and Last-Modified of an SDK response, as a dict with None for missing ones."""
+    headers = getattr(response, "headers", None) or {}
+    return {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}
+
+
+def conditional_headers(etag=None, last_modified=None):
+    """Request headers that turn a read into a revalidation of a cached response."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def content_length(response):
+    """Content-Length of an SDK response as an int, or None when it is missing."""
+    headers = getattr(response, "headers", None) or {}
+    length = headers.get("Content-Length")
+    return int(length) if isinstance(length, str) and length.isdigit() else None
+
+
+def not_modified(error):
+    return getattr(error, "code", None) == 304
+
+
+def body_size(entry):
+    """Bytes a 304 saved: the stored Content-Length, else the size of the JSON result."""
+    if entry["size"] is None:
+        entry["size"] = encoded_size(entry["response"].get_result())
+    return entry["size"]
+
+
+class ValidatorCache:
+    """Last response and validators of cached reads, kept past the response's TTL.
+
+    When the in-memory entry expires, the AsyncClient revalidates with these
+    validators; a 304 means the kept response is still current.
+    """
+
+    def __init__(self, maxsize=CONDITIONAL_CACHE_SIZE, window=CONDITIONAL_WINDOW):
+        self.window = window
+        self._entries = TTLCache(maxsize)
+
+    def remember(self, key, response):
+        found = validators(response)
+        if not (found["etag"] or found["last_modified"]):
+            self._entries.pop(key)
+            return
+        entry = dict(found, response=response, size=content_length(response))
+        self._entries.set(key, entry, self.window)
+
+    def lookup(self, key):
+        hit, entry = self._entries.get(key)
+        return entry if hit else None
+
+    def stats(self):
+        return self._entries.stats()
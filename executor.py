@@ -0,0 +1,231 @@
+# executor.py
+
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from cache import make_key
+from codec import encoded_size
+from conditional import body_size, conditional_headers, content_length, not_modified
+from resilience import idempotency_key, is_read_operation, is_retryable
+
+# Upper bound on blocking watsonx.data SDK calls running at the same time.
+MAX_WORKERS = int(os.getenv("WATSONX_DATA_MAX_WORKERS", "8"))
+# Threads for local SQLite work (persistent cache, query history, metadata index), kept
+# apart so a disk-cache hit never queues behind slow upstream calls.
+LOCAL_IO_WORKERS = int(os.getenv("WATSONX_DATA_LOCAL_IO_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="watsonxdata")
+_local_executor = ThreadPoolExecutor(max_workers=LOCAL_IO_WORKERS, thread_name_prefix="watsonxdata-local")
+
+
+async def _run_on(executor, func, args, kwargs):
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, partial(context.run, func, *args, **kwargs))
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking callable on the shared worker pool and await its result.
+
+    The caller's context variables, such as the target instance, are visible to func.
+    """
+    return await _run_on(_executor, func, args, kwargs)
+
+
+async def run_local(func, *args, **kwargs):
+    """Like run_blocking, for local disk work; runs on the small local I/O pool."""
+    return await _run_on(_local_executor, func, args, kwargs)
+
+
+class AsyncClient:
+    """Awaitable view of a WatsonxDataV2 client.
+
+    Every method call is dispatched to the worker pool so a slow request only
+    occupies one worker instead of the event loop serving all MCP requests.
+    When a MetadataCache is given, cacheable reads are served from it and
+    writes invalidate the entries they affect, whether or not they succeeded,
+    since a failed write may still have been applied. Observers get the same
+    after_call(operation, succeeded) notification without serving any reads. A metrics
+    registry, if given, records latency and status of every upstream call.
+    A Resilience policy, if given, retries transient failures of reads, of
+    read-only queries and of writes carrying an idempotency key, and fails
+    fast on open circuits.
+    Concurrent identical reads share one upstream request unless single_flight
+    is False. A PersistentCache, if given, serves the operations it persists
+    between the in-memory cache and the network. With a ValidatorCache, an
+    expired in-memory entry that carried an ETag or Last-Modified is
+    revalidated with a conditional request and reused on a 304. With several
+    instances, scope() names the one the current call targets ("" for the
+    default), which keeps their cache entries, flights and circuits apart.
+    """
+
+    def __init__(self, get_client, cache=None, observers=(), metrics=None, resilience=None, single_flight=True,
+                 persistent=None, validators=None, scope=None):
+        self._get_client = get_client
+        self._cache = cache
+        self._observers = tuple(observers)
+        self._metrics = metrics
+        self._resilience = resilience
+        self._single_flight = single_flight
+        self._persistent = persistent
+        self._validators = validators
+        self._scope = scope
+        self._inflight = {}
+        self._writes = 0
+
+    def _scoped(self, kwargs):
+        """kwargs to key caches and flights by, tagged with the current instance unless it is the default."""
+        scope = self._scope() if self._scope is not None else ""
+        return dict(kwargs, _instance=scope) if scope else kwargs
+
+    def add_observer(self, observer):
+        self._observers += (observer,)
+
+    def _invoke(self, name, args, kwargs):
+        return getattr(self._get_client(), name)(*args, **kwargs)
+
+    async def _attempt(self, name, args, kwargs):
+        start = time.perf_counter()
+        try:
+            # Resolve the client on the worker too; building it may import the SDK.
+            response = await run_blocking(self._invoke, name, args, kwargs)
+        except Exception as e:
+            if self._metrics is not None:
+                # A 304 answers a conditional request; it is not a failure.
+                error = None if not_modified(e) else e
+                self._metrics.record_upstream(name, time.perf_counter() - start, getattr(e, "code", None), error)
+            raise
+        if self._metrics is not None:
+            self._metrics.record_upstream(name, time.perf_counter() - start, getattr(response, "status_code", None))
+        return response
+
+    async def _call(self, name, args, kwargs):
+        key_header = idempotency_key.get()
+        if key_header:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), "Idempotency-Key": key_header}
+        succeeded = False
+        try:
+            if self._resilience is None:
+                response = await self._attempt(name, args, kwargs)
+            else:
+                retryable = is_retryable(name, kwargs) or bool(key_header)
+                scope = self._scope() if self._scope is not None else ""
+                circuit = f"{name}@{scope}" if scope else name
+                response = await self._resilience.call(circuit, partial(self._attempt, name, args, kwargs), retryable)
+            succeeded = True
+            return response
+        finally:
+            if not is_read_operation(name):
+                self._writes += 1
+            if self._cache is not None:
+                self._cache.after_call(name, succeeded)
+            for observer in self._observers:
+                observer.after_call(name, succeeded)
+
+    async def _shared_call(self, name, args, kwargs, flight_key):
+        """Run a read, or join an identical read already in flight.
+
+        The first caller makes the request and publishes its outcome on a
+        future; callers arriving before it finishes await that future. The
+        key includes a count of completed writes so a read never joins a
+        flight that started before a write it should observe.
+        """
+        while True:
+            flight = self._inflight.get(flight_key)
+            if flight is None:
+                break
+            try:
+                response = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if flight.cancelled():
+                    # The leader was cancelled, not us; make the request ourselves.
+                    continue
+                raise
+            except Exception as e:
+                if self._metrics is not None:
+                    self._metrics.record_coalesced(name, e)
+                raise
+            if self._metrics is not None:
+                self._metrics.record_coalesced(name)
+            return response
+
+        flight = self._inflight[flight_key] = asyncio.get_running_loop().create_future()
+        try:
+            response = await self._call(name, args, kwargs)
+        except BaseException as e:
+            if isinstance(e, Exception):
+                flight.set_exception(e)
+                # Mark it retrieved so an unjoined flight doesn't log "exception never retrieved".
+                flight.exception()
+            else:
+                flight.cancel()
+            raise
+        else:
+            flight.set_result(response)
+            return response
+        finally:
+            del self._inflight[flight_key]
+
+    async def _fetch(self, name, args, kwargs, headers=None):
+        flight_key = None
+        if self._single_flight and is_read_operation(name):
+            conditional = tuple(sorted((headers or {}).items()))
+            flight_key = make_key(name, args, dict(self._scoped(kwargs), headers=conditional))
+        if headers:
+            kwargs = dict(kwargs, headers={**(kwargs.get("headers") or {}), **headers})
+        if flight_key is None:
+            return await self._call(name, args, kwargs)
+        return await self._shared_call(name, args, kwargs, (self._writes, flight_key))
+
+    async def _revalidate(self, name, args, kwargs, entry):
+        try:
+            return await self._fetch(
+                name, args, kwargs, conditional_headers(entry["etag"], entry["last_modified"]),
+            )
+        except Exception as e:
+            if not not_modified(e):
+                raise
+        if self._metrics is not None:
+            self._metrics.record_not_modified(name, await run_blocking(body_size, entry))
+        return entry["response"]
+
+    def __getattr__(self, name):
+        async def call(*args, **kwargs):
+            cache = self._cache
+            ttl = cache.ttl_for(name) if cache is not None else None
+            key = make_key(name, args, self._scoped(kwargs)) if ttl else None
+            if key is not None:
+                hit, response = cache.get(key)
+                if hit:
+                    return response
+                generation = cache.generation
+            persistent = self._persistent
+            validator = None
+            if key is not None and self._validators is not None:
+                validator = self._validators.lookup(key)
+            if validator is not None:
+                response, fresh = await self._revalidate(name, args, kwargs, validator), True
+            elif persistent is not None and persistent.ttl_for(name):
+                response, fresh = await persistent.fetch(
+                    name, args, self._scoped(kwargs), partial(self._fetch, name, args, kwargs),
+                )
+            else:
+                response, fresh = await self._fetch(name, args, kwargs), True
+            # A stale response being revalidated must not be cached as fresh.
+            if key is not None and fresh:
+                size = 0
+                if cache.maxbytes is not None:
+                    size = content_length(response)
+                    if size is None:
+                        size = await run_blocking(encoded_size, response.get_result())
+                cache.set(key, response, ttl, generation, size=size)
+                if self._validators is not None:
+                    self._validators.remember(key, response)
+            return response
+
+        call.__name__ = name
+        return call
@@ -0,0 +1,215 @@
+# ingestion.py
+
+import asyncio
+import contextvars
+import os
+import time
+
+from instances import current_instance
+from pagination import find_items
+from waiters import POLL_FACTOR, POLL_INITIAL, POLL_MAX, find_state, notify
+
+# Finished jobs are remembered this long so late wait_for_ingestion_jobs calls still see them.
+JOB_RETENTION = float(os.getenv("WATSONX_DATA_INGESTION_JOB_RETENTION", "3600"))
+# When fewer jobs than this are active, poll them one by one instead of listing all jobs.
+LIST_THRESHOLD = int(os.getenv("WATSONX_DATA_INGESTION_LIST_THRESHOLD", "3"))
+# A job is given up, and no longer polled, once it has been tracked this long without
+# finishing or its status could not be fetched this many rounds in a row.
+JOB_MAX_AGE = float(os.getenv("WATSONX_DATA_INGESTION_JOB_MAX_AGE", "86400"))
+JOB_MAX_POLL_ERRORS = int(os.getenv("WATSONX_DATA_INGESTION_MAX_POLL_ERRORS", "20"))
+
+GIVEN_UP = "given_up"
+SUCCEEDED_STATES = {"completed", "complete", "succeeded", "success", "finished"}
+FAILED_STATES = {"failed", "error", "errored", "cancelled", "canceled", "killed", "not_found", GIVEN_UP}
+
+
+def job_ids_in(result):
+    """Job IDs in a create_ingestion_jobs response."""
+    if isinstance(result, dict) and isinstance(result.get("job_id"), str):
+        return [result["job_id"]]
+    _, items = find_items(result)
+    return [item["job_id"] for item in items or [] if isinstance(item, dict) and isinstance(item.get("job_id"), str)]
+
+
+def find_count(result, words, depth=2):
+    """First numeric field whose name contains one of words, searching nested dicts."""
+    if not isinstance(result, dict):
+        return None
+    for key, value in result.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and any(w in key.lower() for w in words):
+            return value
+    if depth:
+        for value in result.values():
+            count = find_count(value, words, depth - 1)
+            if count is not None:
+                return count
+    return None
+
+
+class IngestionTracker:
+    """Follows submitted ingestion jobs from one background polling loop.
+
+    Each round fetches the job listing once (or, for a handful of jobs, each
+    job) and updates every tracked job, however many callers are waiting on
+    them. The loop slows down while nothing changes and exits when no
+    tracked job is still running; jobs that never finish, or whose status
+    keeps failing to load, are given up so the loop does not poll forever.
+    """
+
+    def __init__(self, list_jobs, get_job):
+        self._list_jobs = list_jobs
+        self._get_job = get_job
+        self.jobs = {}
+        self._task = None
+        self._wake = None
+        self._round = None
+
+    def register(self, job_ids):
+        now = time.time()
+        # Prune first: a job registered again after its entry expired is tracked afresh.
+        self._prune(now)
+        for job_id in job_ids:
+            self.jobs.setdefault(
+                job_id, {"state": None, "result": None, "registered_at": now, "finished_at": None, "errors": 0},
+            )
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._round = asyncio.Event()
+            # The loop outlives the tool call that starts it, so it must not inherit that
+            # call's context (its idempotency key above all); only the instance carries over.
+            context = contextvars.Context()
+            context.run(current_instance.set, current_instance.get())
+            self._task = asyncio.create_task(self._run(), context=context)
+        else:
+            self._wake.set()
+
+    def _prune(self, now):
+        for job_id, job in list(self.jobs.items()):
+            if job["finished_at"] is not None and now - job["finished_at"] > JOB_RETENTION:
+                del self.jobs[job_id]
+
+    def _active(self):
+        return [job_id for job_id, job in self.jobs.items() if job["finished_at"] is None]
+
+    async def _poll(self, active):
+        results = {}
+        if len(active) >= LIST_THRESHOLD:
+            try:
+                _, items = find_items((await self._list_jobs()).get_result())
+                for item in items or []:
+                    if isinstance(item, dict) and item.get("job_id") in self.jobs:
+                        results[item["job_id"]] = item
+            except Exception:
+                pass
+        missing = [job_id for job_id in active if job_id not in results]
+        fetched = await asyncio.gather(*(self._get_job(job_id=job_id) for job_id in missing), return_exceptions=True)
+        for job_id, response in zip(missing, fetched):
+            if isinstance(response, Exception):
+                code = getattr(response, "code", None)
+                # A client error won't go away by polling again, so stop tracking the job.
+                if code == 404:
+                    state = "not_found"
+                elif code is not None and 400 <= code < 500 and code != 429:
+                    state = "error"
+                else:
+                    state = None
+                results[job_id] = {"status": state, "poll_error": str(response)}
+            else:
+                results[job_id] = response.get_result()
+        return results
+
+    def _update(self, results):
+        changed = False
+        now = time.time()
+        for job_id, result in results.items():
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            state = find_state(result)
+            job["result"] = result
+            job["errors"] = job["errors"] + 1 if isinstance(result, dict) and "poll_error" in result else 0
+            finished = state in SUCCEEDED_STATES or state in FAILED_STATES
+            if not finished and (job["errors"] >= JOB_MAX_POLL_ERRORS or now - job["registered_at"] > JOB_MAX_AGE):
+                state = GIVEN_UP
+            if state is not None and state != job["state"]:
+                job["state"] = state
+                changed = True
+                if state in SUCCEEDED_STATES or state in FAILED_STATES:
+                    job["finished_at"] = now
+        return changed
+
+    async def _run(self):
+        delay = POLL_INITIAL
+        while True:
+            active = self._active()
+            if not active:
+                break
+            changed = self._update(await self._poll(active))
+            delay = POLL_INITIAL if changed else min(delay * POLL_FACTOR, POLL_MAX)
+            finished_round, self._round = self._round, asyncio.Event()
+            finished_round.set()
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+                delay = POLL_INITIAL
+            except asyncio.TimeoutError:
+                pass
+        self._round.set()
+
+    async def wait(self, job_ids, timeout, ctx=None):
+        """Wait until every job in job_ids has finished or timeout seconds pass."""
+        self.register(job_ids)
+        deadline = time.monotonic() + timeout
+        states = {}
+        while True:
+            round_done = self._round
+            for job_id in job_ids:
+                state = self.jobs[job_id]["state"]
+                if state != states.get(job_id):
+                    states[job_id] = state
+                    await notify(ctx, f"Ingestion job {job_id} is {state}")
+            finished = sum(1 for job_id in job_ids if self.jobs[job_id]["finished_at"] is not None)
+            await notify(ctx, progress=finished, total=len(job_ids))
+            remaining = deadline - time.monotonic()
+            if finished == len(job_ids) or remaining <= 0:
+                return self.summary(job_ids, timed_out=finished < len(job_ids))
+            try:
+                await asyncio.wait_for(round_done.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    def summary(self, job_ids, timed_out=False):
+        now = time.time()
+        jobs = []
+        total_rows = total_bytes = 0
+        for job_id in job_ids:
+            job = self.jobs[job_id]
+            rows = find_count(job["result"], ("rows", "records"))
+            size = find_count(job["result"], ("bytes",))
+            elapsed = (job["finished_at"] or now) - job["registered_at"]
+            total_rows += rows or 0
+            total_bytes += size or 0
+            jobs.append({
+                "job_id": job_id,
+                "state": job["state"],
+                "elapsed_s": round(elapsed, 1),
+                "rows": rows,
+                "bytes": size,
+                "error": job["result"].get("poll_error") if isinstance(job["result"], dict) else None,
+            })
+        started = min(self.jobs[job_id]["registered_at"] for job_id in job_ids)
+        ended = max((self.jobs[job_id]["finished_at"] or now) for job_id in job_ids)
+        wall = max(ended - started, 1e-9)
+        return {
+            "jobs": jobs,
+            "total": len(job_ids),
+            "succeeded": sum(1 for job in jobs if job["state"] in SUCCEEDED_STATES),
+            "failed": sum(1 for job in jobs if job["state"] in FAILED_STATES),
+            "running": sum(1 for job in jobs if job["state"] not in SUCCEEDED_STATES | FAILED_STATES),
+            "timed_out": timed_out,
+            "elapsed_s": round(wall, 1),
+            "rows": total_rows or None,
+            "bytes": total_bytes or None,
+            "rows_per_s": round(total_rows / wall, 1) if total_rows else None,
+            "bytes_per_s": round(total_bytes / wall, 1) if total_bytes else None,
+        }
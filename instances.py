@@ -0,0 +1,144 @@
+# instances.py
+
+import asyncio
+import functools
+import os
+import re
+import threading
+from contextvars import ContextVar
+
+# Name of the instance configured through IBM_CLOUD_IAM_URL/IBM_CLOUD_IAM_APIKEY.
+DEFAULT_INSTANCE = os.getenv("WATSONX_DATA_DEFAULT_INSTANCE", "default")
+# Passing this as instance runs a read tool on every configured instance.
+ALL_INSTANCES = "*"
+
+# Instance the current tool call targets; "" means the default instance.
+current_instance = ContextVar("instance", default="")
+
+
+def _env_name(name):
+    return "WATSONX_DATA_INSTANCE_" + re.sub(r"\W", "_", name).upper()
+
+
+def load_instances(environ=os.environ):
+    """Instance name -> config, from the environment.
+
+    The instance given by IBM_CLOUD_IAM_URL/IBM_CLOUD_IAM_APIKEY comes first,
+    so it is the default. Each name in WATSONX_DATA_INSTANCES (comma separated)
+    adds one configured by WATSONX_DATA_INSTANCE_<NAME>_URL and _APIKEY; the
+    API key falls back to IBM_CLOUD_IAM_APIKEY.
+    """
+    configs = {}
+    names = [name.strip() for name in environ.get("WATSONX_DATA_INSTANCES", "").split(",") if name.strip()]
+    if environ.get("IBM_CLOUD_IAM_URL") or not names:
+        configs[DEFAULT_INSTANCE] = {
+            "url": environ.get("IBM_CLOUD_IAM_URL"), "url_var": "IBM_CLOUD_IAM_URL",
+            "apikey": environ.get("IBM_CLOUD_IAM_APIKEY"), "apikey_var": "IBM_CLOUD_IAM_APIKEY",
+        }
+    for name in names:
+        prefix = _env_name(name)
+        configs[name] = {
+            "url": environ.get(f"{prefix}_URL"), "url_var": f"{prefix}_URL",
+            "apikey": environ.get(f"{prefix}_APIKEY") or environ.get("IBM_CLOUD_IAM_APIKEY"),
+            "apikey_var": f"{prefix}_APIKEY",
+        }
+    return configs
+
+
+def scoped_path(path, scope):
+    """path for the default instance, path with the instance name before the extension otherwise."""
+    if not scope:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{re.sub(r'[^A-Za-z0-9_.-]', '_', scope)}{ext}"
+
+
+class ClientRegistry:
+    """Named watsonx.data instances, each with its own lazily built client.
+
+    Clients are built on first use, so an instance that is never called costs
+    nothing, and each keeps its own connection pool and token refresher.
+    """
+
+    def __init__(self, configs, build):
+        self.configs = configs
+        self.default = next(iter(configs))
+        self._build = build
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @property
+    def multi(self):
+        return len(self.configs) > 1
+
+    def names(self):
+        return list(self.configs)
+
+    def resolve(self, name=""):
+        name = name or self.default
+        if name == ALL_INSTANCES:
+            raise ValueError(f'instance="{ALL_INSTANCES}" is only supported by read tools.')
+        if name not in self.configs:
+            raise ValueError(f"Unknown instance {name!r}; configured instances: {', '.join(self.configs)}.")
+        return name
+
+    def scope(self):
+        """Cache scope of the current call: "" for the default instance, its name otherwise."""
+        name = self.resolve(current_instance.get())
+        return "" if name == self.default else name
+
+    def get(self, name=""):
+        name = self.resolve(name)
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._clients[name] = self._build(self.configs[name])
+        return client
+
+    def current(self):
+        return self.get(current_instance.get())
+
+    def stats(self):
+        return {
+            name: {"url": config["url"], "default": name == self.default, "connected": name in self._clients}
+            for name, config in self.configs.items()
+        }
+
+    def built(self, name=""):
+        """The client of an instance if it has been built, else None."""
+        return self._clients.get(self.resolve(name))
+
+
+def fan_out(fn, names):
+    """Wrap an async read tool so instance="*" runs it on every instance concurrently.
+
+    The results are returned per instance name; any other instance value is
+    passed through to fn unchanged. A pagination cursor belongs to one
+    instance's listing, so it is refused with instance="*".
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if current_instance.get() != ALL_INSTANCES:
+            return await fn(*args, **kwargs)
+        if kwargs.get("cursor"):
+            return {
+                "error": f'cursor cannot be used with instance="{ALL_INSTANCES}"; pass the instance that returned it.',
+            }
+
+        async def run(name):
+            # Each gathered call runs in its own task, so this only affects that call.
+            current_instance.set(name)
+            return await fn(*args, **kwargs)
+
+        results = await asyncio.gather(*(run(name) for name in names), return_exceptions=True)
+        return {
+            "instances": {
+                name: {"error": str(result)} if isinstance(result, Exception) else result
+                for name, result in zip(names, results)
+            },
+        }
+
+    return wrapper
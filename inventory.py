@@ -0,0 +1,165 @@
+# inventory.py
+
+import asyncio
+import os
+import time
+
+from pagination import find_items
+
+# Upstream calls one snapshot makes at the same time.
+INVENTORY_CONCURRENCY = int(os.getenv("WATSONX_DATA_INVENTORY_CONCURRENCY", "16"))
+
+# Engine type -> (engine listing, per-engine catalog listing or None).
+ENGINE_SOURCES = {
+    "presto": ("list_presto_engines", "list_presto_engine_catalogs"),
+    "prestissimo": ("list_prestissimo_engines", "list_prestissimo_engine_catalogs"),
+    "spark": ("list_spark_engines", "list_spark_engine_catalogs"),
+    "db2": ("list_db2_engines", None),
+}
+
+# Fields kept for each kind of object, as output name -> candidate source fields.
+_ENGINE_FIELDS = {
+    "id": ("engine_id", "id"),
+    "name": ("display_name", "engine_display_name", "name"),
+    "status": ("status", "state"),
+    "version": ("build_version", "version", "engine_version"),
+    "size": ("size_config", "node_type"),
+    "origin": ("origin",),
+}
+_BUCKET_FIELDS = {
+    "id": ("bucket_id", "id"),
+    "name": ("bucket_display_name", "display_name", "bucket_name"),
+    "type": ("bucket_type", "type"),
+    "state": ("state", "status"),
+    "managed_by": ("managed_by",),
+}
+_DATABASE_FIELDS = {
+    "id": ("database_id", "id"),
+    "name": ("database_display_name", "display_name", "database_name"),
+    "type": ("database_type", "type"),
+    "host": ("database_details.hostname", "database_details.host"),
+}
+_CATALOG_FIELDS = {
+    "name": ("catalog_name", "name", "catalog_id"),
+    "type": ("catalog_type", "type"),
+    "sync_status": ("sync_status",),
+    "managed_by": ("managed_by",),
+}
+
+
+def _get(item, field):
+    for part in field.split("."):
+        if not isinstance(item, dict):
+            return None
+        item = item.get(part)
+    return item
+
+
+def _normalize(item, fields):
+    """Compact view of item: the first present candidate per field, empty ones left out."""
+    normalized = {}
+    for name, candidates in fields.items():
+        for candidate in candidates:
+            value = _get(item, candidate)
+            if value not in (None, "", [], {}):
+                normalized[name] = value
+                break
+    return normalized
+
+
+def _catalog_name(item):
+    associated = item.get("associated_catalog") if isinstance(item, dict) else None
+    if isinstance(associated, dict):
+        return associated.get("catalog_name")
+    return associated if isinstance(associated, str) else None
+
+
+def _items(response):
+    _, items = find_items(response.get_result())
+    return [item for item in items or [] if isinstance(item, dict)]
+
+
+def engine_ids(response):
+    """Ids of the engines in an engine listing response."""
+    return {_normalize(item, _ENGINE_FIELDS).get("id") for item in _items(response)} - {None}
+
+
+async def inventory_snapshot(client, include_catalogs=True, concurrency=INVENTORY_CONCURRENCY):
+    """One normalized document of engines, storage, databases and catalogs.
+
+    Every listing is issued at once; each engine type's catalog lookups start
+    as soon as its own listing returns, so the total time is close to the
+    slowest listing plus the slowest catalog lookup. A failed call leaves its
+    part out and is reported under "errors" instead of failing the snapshot.
+    """
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    errors = {}
+    calls = 0
+
+    async def call(operation, **kwargs):
+        nonlocal calls
+        calls += 1
+        try:
+            async with semaphore:
+                return _items(await getattr(client, operation)(**kwargs))
+        except Exception as e:
+            errors[operation if not kwargs else f"{operation}:{kwargs.get('engine_id')}"] = str(e)
+            return None
+
+    async def engines(engine_type):
+        listing, catalog_listing = ENGINE_SOURCES[engine_type]
+        items = await call(listing)
+        if items is None:
+            return []
+        normalized = [dict(_normalize(item, _ENGINE_FIELDS), type=engine_type) for item in items]
+        if include_catalogs and catalog_listing:
+            with_id = [engine for engine in normalized if "id" in engine]
+            catalogs = await asyncio.gather(*(call(catalog_listing, engine_id=engine["id"]) for engine in with_id))
+            for engine, engine_catalogs in zip(with_id, catalogs):
+                if engine_catalogs is not None:
+                    engine["catalogs"] = sorted(
+                        {name for name in (_normalize(c, _CATALOG_FIELDS).get("name") for c in engine_catalogs) if name}
+                    )
+        return normalized
+
+    async def listing(operation, fields):
+        items = await call(operation)
+        if items is None:
+            return []
+        return [
+            {**_normalize(item, fields), **({"catalog": _catalog_name(item)} if _catalog_name(item) else {})}
+            for item in items
+        ]
+
+    *engine_lists, buckets, databases, catalogs = await asyncio.gather(
+        *(engines(engine_type) for engine_type in ENGINE_SOURCES),
+        listing("list_bucket_registrations", _BUCKET_FIELDS),
+        listing("list_database_registrations", _DATABASE_FIELDS),
+        listing("list_catalogs", _CATALOG_FIELDS),
+    )
+    all_engines = [engine for engine_list in engine_lists for engine in engine_list]
+
+    # Join catalogs back to the engines that serve them and the storage behind them.
+    by_name = {catalog["name"]: catalog for catalog in catalogs if "name" in catalog}
+    for engine in all_engines:
+        for name in engine.get("catalogs", ()):
+            by_name.setdefault(name, {"name": name}).setdefault("engines", []).append(engine.get("id"))
+    for kind, registrations in (("buckets", buckets), ("databases", databases)):
+        for registration in registrations:
+            if registration.get("catalog") in by_name:
+                by_name[registration["catalog"]].setdefault(kind, []).append(registration.get("id"))
+
+    return {
+        "engines": all_engines,
+        "buckets": buckets,
+        "databases": databases,
+        "catalogs": list(by_name.values()),
+        "counts": {
+            "engines": len(all_engines), "buckets": len(buckets), "databases": len(databases),
+            "catalogs": len(by_name),
+        },
+        "errors": errors,
+        "calls": calls,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
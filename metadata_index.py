@@ -0,0 +1,342 @@
+# metadata_index.py
+
+import asyncio
+import difflib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+from cache import INVALIDATED_BY
+from executor import run_local
+from pagination import find_items
+
+# Where the index is kept; it survives restarts so searches are fast from the first call.
+INDEX_PATH = os.path.expanduser(os.getenv(
+    "WATSONX_DATA_METADATA_INDEX_PATH", os.path.join("~", ".cache", "watsonx-data-mcp", "metadata_index.sqlite"),
+))
+# Seconds before a kind of object is re-listed. Stale entries are still served while
+# the refresh runs in the background.
+INDEX_TTL = float(os.getenv("WATSONX_DATA_METADATA_INDEX_TTL", "900"))
+# Minimum similarity (0-1) for a fuzzy name match.
+FUZZY_CUTOFF = float(os.getenv("WATSONX_DATA_METADATA_FUZZY_CUTOFF", "0.75"))
+
+# SDK listing behind each kind of object.
+SOURCES = {"schema": "list_all_schemas", "table": "list_all_tables", "column": "get_all_columns"}
+
+_NAME_FIELDS = {
+    "schema": ("schema_name", "name", "schema_id"),
+    "table": ("table_name", "name", "table_id"),
+    "column": ("column_name", "name", "column_id"),
+}
+_PARENT_FIELDS = (
+    ("catalog_name", "catalog", "catalog_id"),
+    ("schema_name", "schema", "schema_id"),
+    ("table_name", "table", "table_id"),
+)
+_DEPTH = {"schema": 1, "table": 2, "column": 3}
+_MATCH_RANK = {"exact": 0, "prefix": 1, "substring": 2, "token": 3, "fuzzy": 4}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    kind TEXT NOT NULL,
+    object_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    data_type TEXT,
+    description TEXT,
+    fingerprint TEXT NOT NULL,
+    PRIMARY KEY (kind, object_key)
+);
+CREATE INDEX IF NOT EXISTS objects_name ON objects (kind, lower(name));
+CREATE TABLE IF NOT EXISTS refreshes (kind TEXT PRIMARY KEY, refreshed_at REAL NOT NULL);
+"""
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS objects_fts USING fts5(
+    name, path, description, content='objects', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS objects_ai AFTER INSERT ON objects BEGIN
+    INSERT INTO objects_fts(rowid, name, path, description) VALUES (new.rowid, new.name, new.path, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS objects_ad AFTER DELETE ON objects BEGIN
+    INSERT INTO objects_fts(objects_fts, rowid, name, path, description)
+    VALUES ('delete', old.rowid, old.name, old.path, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS objects_au AFTER UPDATE ON objects BEGIN
+    INSERT INTO objects_fts(objects_fts, rowid, name, path, description)
+    VALUES ('delete', old.rowid, old.name, old.path, old.description);
+    INSERT INTO objects_fts(rowid, name, path, description) VALUES (new.rowid, new.name, new.path, new.description);
+END;
+"""
+
+
+def _first(item, fields):
+    for field in fields:
+        value = item.get(field)
+        if isinstance(value, (str, int)) and value != "":
+            return str(value)
+    return None
+
+
+def extract_objects(kind, result):
+    """Index rows (object_key, name, path, data_type, description, fingerprint) for a listing."""
+    _, items = find_items(result)
+    depth = _DEPTH[kind]
+    rows = []
+    for item in items or []:
+        name = _first(item, _NAME_FIELDS[kind]) if isinstance(item, dict) else None
+        if name is None:
+            continue
+        parents = [_first(item, fields) for fields in _PARENT_FIELDS[:depth]]
+        path = ".".join([parent for parent in parents if parent] + [name])
+        key = _first(item, (f"{kind}_id", "id")) or path
+        data_type = _first(item, ("type", "data_type", "column_type", "table_type"))
+        description = _first(item, ("comment", "description"))
+        fingerprint = hashlib.sha1(json.dumps([name, path, data_type, description]).encode()).hexdigest()
+        rows.append((key, name, path, data_type, description, fingerprint))
+    return rows
+
+
+class FuzzyNames:
+    """Distinct lower-cased names with a trigram index, to narrow fuzzy matching.
+
+    difflib's ratio is 2*M/(a+b) with M <= min(a, b), so only names within a
+    length band around the query can reach the cutoff; of those, only names
+    sharing a trigram with the query are compared.
+    """
+
+    def __init__(self, names=()):
+        self.names = sorted({name.lower() for name in names})
+        postings = defaultdict(list)
+        for position, name in enumerate(self.names):
+            for gram in _trigrams(name):
+                postings[gram].append(position)
+        self._postings = {gram: array("I", positions) for gram, positions in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def close_matches(self, needle, n, cutoff):
+        shortest = cutoff * len(needle) / (2 - cutoff)
+        longest = len(needle) * (2 - cutoff) / cutoff
+        grams = _trigrams(needle)
+        if grams:
+            positions = set()
+            for gram in grams:
+                positions.update(self._postings.get(gram, ()))
+            candidates = (self.names[position] for position in positions)
+        else:
+            candidates = self.names
+        candidates = [name for name in candidates if shortest <= len(name) <= longest]
+        return difflib.get_close_matches(needle, candidates, n=n, cutoff=cutoff)
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class MetadataIndex:
+    """SQLite full-text index of schema, table and column names.
+
+    Each kind is re-listed at most every INDEX_TTL seconds, or sooner after a
+    write through this server affects it; a refresh only rewrites rows whose
+    content changed. Searches rank exact, prefix, substring, token and fuzzy
+    name matches, in that order.
+    """
+
+    def __init__(self, client, path=INDEX_PATH, ttl=INDEX_TTL):
+        self._client = client
+        self.path = path
+        self.ttl = ttl
+        self._db = None
+        self._fts = False
+        self._lock = threading.Lock()
+        self._refreshed = {}
+        self._invalidated = {}
+        self._refreshing = {}
+        self._names = {}
+
+    def _connect(self):
+        if self._db is not None:
+            return self._db
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.executescript(_SCHEMA)
+        try:
+            db.executescript(_FTS_SCHEMA)
+            self._fts = True
+        except sqlite3.OperationalError:
+            # SQLite without FTS5/trigram: fall back to LIKE scans.
+            self._fts = False
+        # Keep kinds already marked stale by writes made before the index was opened.
+        self._refreshed = {**dict(db.execute("SELECT kind, refreshed_at FROM refreshes")), **self._refreshed}
+        for kind in SOURCES:
+            self._names[kind] = FuzzyNames(name for (name,) in db.execute(
+                "SELECT DISTINCT name FROM objects WHERE kind = ?", (kind,),
+            ))
+        self._db = db
+        return db
+
+    def after_call(self, operation, succeeded=True):
+        affected = INVALIDATED_BY.get(operation, ())
+        for kind, source in SOURCES.items():
+            if source in affected:
+                self._refreshed[kind] = 0
+                self._invalidated[kind] = time.time()
+
+    def _store(self, kind, rows, refreshed_at):
+        names = FuzzyNames(row[1] for row in rows)
+        with self._lock:
+            db = self._connect()
+            with db:
+                existing = dict(db.execute(
+                    "SELECT object_key, fingerprint FROM objects WHERE kind = ?", (kind,),
+                ))
+                seen = set()
+                changed = 0
+                for key, name, path, data_type, description, fingerprint in rows:
+                    seen.add(key)
+                    if existing.get(key) == fingerprint:
+                        continue
+                    changed += 1
+                    db.execute(
+                        "INSERT INTO objects (kind, object_key, name, path, data_type, description, fingerprint) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (kind, object_key) DO UPDATE SET "
+                        "name = excluded.name, path = excluded.path, data_type = excluded.data_type, "
+                        "description = excluded.description, fingerprint = excluded.fingerprint",
+                        (kind, key, name, path, data_type, description, fingerprint),
+                    )
+                removed = [(kind, key) for key in existing if key not in seen]
+                db.executemany("DELETE FROM objects WHERE kind = ? AND object_key = ?", removed)
+                # A write during the refresh may not be in this listing; leave the kind stale then.
+                fresh = self._invalidated.get(kind, 0) < refreshed_at
+                if fresh:
+                    db.execute(
+                        "INSERT OR REPLACE INTO refreshes (kind, refreshed_at) VALUES (?, ?)", (kind, refreshed_at),
+                    )
+            self._names[kind] = names
+            if fresh:
+                self._refreshed[kind] = refreshed_at
+            return {"rows": len(rows), "changed": changed, "removed": len(removed)}
+
+    async def _refresh_kind(self, kind):
+        started = time.time()
+        response = await getattr(self._client, SOURCES[kind])()
+        rows = extract_objects(kind, response.get_result())
+        return await run_local(self._store, kind, rows, started)
+
+    def _refresh_task(self, kind):
+        task = self._refreshing.get(kind)
+        if task is None or task.done():
+            task = self._refreshing[kind] = asyncio.ensure_future(self._refresh_kind(kind))
+            # A failed background refresh is retried on the next search; don't log it as unretrieved.
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return task
+
+    async def ensure_fresh(self, kinds, force=False):
+        """Refresh stale kinds: wait for kinds never indexed, refresh the rest in the background."""
+        await run_local(self._connect)
+        waits = []
+        now = time.time()
+        for kind in kinds:
+            refreshed = self._refreshed.get(kind, 0)
+            if force or now - refreshed >= self.ttl:
+                task = self._refresh_task(kind)
+                if force or not self._names.get(kind):
+                    waits.append(task)
+        if waits:
+            await asyncio.gather(*waits)
+
+    def _query(self, query, kinds, limit):
+        needle = query.strip().lower()
+        found = {}
+
+        def add(rows, match):
+            for kind, name, path, data_type, description in rows:
+                if (kind, path) not in found:
+                    found[(kind, path)] = {
+                        "kind": kind, "name": name, "path": path, "data_type": data_type,
+                        "description": description, "match": match,
+                    }
+
+        marks = ",".join("?" * len(kinds))
+        columns = "kind, name, path, data_type, description"
+        with self._lock:
+            db = self._connect()
+            add(db.execute(
+                f"SELECT {columns} FROM objects WHERE kind IN ({marks}) AND lower(name) = ? LIMIT ?",
+                (*kinds, needle, limit),
+            ), "exact")
+            add(db.execute(
+                f"SELECT {columns} FROM objects WHERE kind IN ({marks}) AND lower(name) LIKE ? ESCAPE '\\' "
+                f"ORDER BY length(name) LIMIT ?",
+                (*kinds, _like(needle) + "%", limit),
+            ), "prefix")
+            fts_columns = ", ".join("o." + column for column in columns.split(", "))
+            fts_join = f"SELECT {fts_columns} FROM objects_fts JOIN objects o ON o.rowid = objects_fts.rowid"
+            if len(found) < limit:
+                if self._fts and len(needle) >= 3:
+                    add(db.execute(
+                        f"{fts_join} WHERE objects_fts MATCH ? AND o.kind IN ({marks}) "
+                        f"ORDER BY length(o.name) LIMIT ?",
+                        ("name : " + _phrase(needle), *kinds, limit),
+                    ), "substring")
+                else:
+                    add(db.execute(
+                        f"SELECT {columns} FROM objects WHERE kind IN ({marks}) AND lower(name) LIKE ? ESCAPE '\\' "
+                        f"ORDER BY length(name) LIMIT ?",
+                        (*kinds, "%" + _like(needle) + "%", limit),
+                    ), "substring")
+            tokens = [token for token in needle.replace(".", " ").split() if len(token) >= 3]
+            if len(found) < limit and tokens and self._fts:
+                add(db.execute(
+                    f"{fts_join} WHERE objects_fts MATCH ? AND o.kind IN ({marks}) ORDER BY bm25(objects_fts) LIMIT ?",
+                    (" AND ".join(_phrase(token) for token in tokens), *kinds, limit),
+                ), "token")
+            if len(found) < limit:
+                names = set()
+                for kind in kinds:
+                    names.update(self._names.get(kind, FuzzyNames()).close_matches(needle, limit, FUZZY_CUTOFF))
+                if names:
+                    name_marks = ",".join("?" * len(names))
+                    add(db.execute(
+                        f"SELECT {columns} FROM objects WHERE kind IN ({marks}) AND lower(name) IN ({name_marks}) "
+                        f"LIMIT ?",
+                        (*kinds, *names, limit),
+                    ), "fuzzy")
+        results = sorted(found.values(), key=lambda entry: _MATCH_RANK[entry["match"]])
+        return results[:limit]
+
+    async def search(self, query, kind="", limit=20, refresh=False):
+        kinds = [kind] if kind else list(SOURCES)
+        if any(k not in SOURCES for k in kinds):
+            raise ValueError(f"kind must be one of: {', '.join(SOURCES)}.")
+        if not query.strip():
+            raise ValueError("query must not be empty.")
+        await self.ensure_fresh(kinds, force=refresh)
+        results = await run_local(self._query, query, kinds, max(1, limit))
+        now = time.time()
+        return {
+            "results": results,
+            "count": len(results),
+            "index": {
+                k: {
+                    "names": len(self._names.get(k, [])),
+                    "age_s": round(now - self._refreshed[k], 1) if self._refreshed.get(k) else None,
+                }
+                for k in kinds
+            },
+        }
+
+
+def _phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,292 @@
+# metrics.py
+
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Optional Prometheus exports: a text file rewritten every METRICS_INTERVAL seconds
+# (for node_exporter's textfile collector) and/or an HTTP /metrics endpoint.
+METRICS_FILE = os.getenv("WATSONX_DATA_METRICS_FILE")
+METRICS_PORT = int(os.getenv("WATSONX_DATA_METRICS_PORT", "0"))
+METRICS_INTERVAL = float(os.getenv("WATSONX_DATA_METRICS_INTERVAL", "15"))
+# Latencies kept per tool/operation for percentile estimates.
+RESERVOIR_SIZE = int(os.getenv("WATSONX_DATA_METRICS_RESERVOIR", "2048"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Class of the last upstream exception seen by the current tool call. Tools turn
+# exceptions into {"error": ...} results, so this is how the class reaches the metrics.
+_error_class = contextvars.ContextVar("watsonx_data_error_class", default=None)
+
+
+class LatencyStats:
+    """Cumulative histogram plus a bounded reservoir of recent samples."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+    def summary(self):
+        samples = sorted(self.recent)
+
+        def percentile(p):
+            if not samples:
+                return None
+            return round(samples[min(int(p * len(samples)), len(samples) - 1)] * 1000, 3)
+
+        return {
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "avg": round(self.total / self.count * 1000, 3) if self.count else None,
+            "max": round(self.max * 1000, 3),
+        }
+
+
+class ToolMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = Counter()
+        self.latency = LatencyStats()
+        self.response_bytes = 0
+        self.max_response_bytes = 0
+        self.responses = 0
+        self.shaped = 0
+        self.original_bytes = 0
+        self.shaped_bytes = 0
+
+
+class UpstreamMetrics:
+    def __init__(self):
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.latency = LatencyStats()
+        self.coalesced = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.tools = {}
+        self.upstream = {}
+
+    def record_tool(self, name, seconds, error_class=None):
+        with self._lock:
+            stats = self.tools.setdefault(name, ToolMetrics())
+            stats.calls += 1
+            stats.latency.observe(seconds)
+            if error_class:
+                stats.errors[error_class] += 1
+
+    def record_response_size(self, name, size):
+        with self._lock:
+            stats = self.tools.setdefault(name, ToolMetrics())
+            stats.responses += 1
+            stats.response_bytes += size
+            stats.max_response_bytes = max(stats.max_response_bytes, size)
+
+    def record_shaping(self, name, original_size, shaped_size):
+        """Record the serialized size of a sampled tool result before and after response shaping."""
+        with self._lock:
+            stats = self.tools.setdefault(name, ToolMetrics())
+            stats.shaped += 1
+            stats.original_bytes += original_size
+            stats.shaped_bytes += shaped_size
+
+    def record_upstream(self, operation, seconds, status=None, error=None):
+        with self._lock:
+            stats = self.upstream.setdefault(operation, UpstreamMetrics())
+            stats.latency.observe(seconds)
+            if status is not None:
+                stats.statuses[str(status)] += 1
+            if error is not None:
+                stats.errors[type(error).__name__] += 1
+        if error is not None:
+            _error_class.set(type(error).__name__)
+
+    def record_coalesced(self, operation, error=None):
+        """Count a call that shared another caller's in-flight request."""
+        with self._lock:
+            self.upstream.setdefault(operation, UpstreamMetrics()).coalesced += 1
+        if error is not None:
+            _error_class.set(type(error).__name__)
+
+    def record_not_modified(self, operation, bytes_saved):
+        """Count a 304 that let a cached response be reused instead of downloaded."""
+        with self._lock:
+            stats = self.upstream.setdefault(operation, UpstreamMetrics())
+            stats.not_modified += 1
+            stats.bytes_saved += bytes_saved
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "uptime_s": round(time.time() - self.started, 1),
+                "tools": {
+                    name: {
+                        "calls": stats.calls,
+                        "errors": dict(stats.errors),
+                        "latency_ms": stats.latency.summary(),
+                        "response_bytes": {
+                            "total": stats.response_bytes,
+                            "avg": stats.response_bytes // stats.responses if stats.responses else None,
+                            "max": stats.max_response_bytes,
+                        },
+                        **({"shaping": {
+                            "sampled_responses": stats.shaped,
+                            "original_bytes": stats.original_bytes,
+                            "shaped_bytes": stats.shaped_bytes,
+                            "ratio": round(stats.original_bytes / max(stats.shaped_bytes, 1), 2),
+                        }} if stats.shaped else {}),
+                    }
+                    for name, stats in sorted(self.tools.items())
+                },
+                "upstream": {
+                    operation: {
+                        "calls": stats.latency.count,
+                        "coalesced": stats.coalesced,
+                        "not_modified": stats.not_modified,
+                        "bytes_saved": stats.bytes_saved,
+                        "statuses": dict(stats.statuses),
+                        "errors": dict(stats.errors),
+                        "latency_ms": stats.latency.summary(),
+                    }
+                    for operation, stats in sorted(self.upstream.items())
+                },
+            }
+
+    def prometheus(self):
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, labels, latency):
+            for bound, count in zip(LATENCY_BUCKETS, latency.buckets):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {latency.count}')
+            lines.append(f"{name}_sum{{{labels}}} {latency.total}")
+            lines.append(f"{name}_count{{{labels}}} {latency.count}")
+
+        with self._lock:
+            metric("watsonx_data_tool_calls_total", "counter", "Tool invocations.")
+            for name, stats in sorted(self.tools.items()):
+                lines.append(f'watsonx_data_tool_calls_total{{tool="{name}"}} {stats.calls}')
+            metric("watsonx_data_tool_errors_total", "counter", "Tool invocations that returned an error.")
+            for name, stats in sorted(self.tools.items()):
+                for error_class, count in sorted(stats.errors.items()):
+                    lines.append(
+                        f'watsonx_data_tool_errors_total{{tool="{name}",error_class="{error_class}"}} {count}'
+                    )
+            metric("watsonx_data_tool_latency_seconds", "histogram", "Tool latency.")
+            for name, stats in sorted(self.tools.items()):
+                histogram("watsonx_data_tool_latency_seconds", f'tool="{name}"', stats.latency)
+            metric("watsonx_data_tool_response_bytes_total", "counter", "Serialized tool response bytes.")
+            for name, stats in sorted(self.tools.items()):
+                lines.append(f'watsonx_data_tool_response_bytes_total{{tool="{name}"}} {stats.response_bytes}')
+            metric("watsonx_data_tool_shaped_bytes_total", "counter", "Bytes of sampled tool results before and after shaping.")
+            for name, stats in sorted(self.tools.items()):
+                if stats.shaped:
+                    for stage, size in (("original", stats.original_bytes), ("shaped", stats.shaped_bytes)):
+                        lines.append(f'watsonx_data_tool_shaped_bytes_total{{tool="{name}",stage="{stage}"}} {size}')
+            metric("watsonx_data_upstream_responses_total", "counter", "watsonx.data API responses by HTTP status.")
+            for operation, stats in sorted(self.upstream.items()):
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(
+                        f'watsonx_data_upstream_responses_total{{operation="{operation}",status="{status}"}} {count}'
+                    )
+            metric("watsonx_data_upstream_coalesced_total", "counter", "Calls served by an identical in-flight request.")
+            for operation, stats in sorted(self.upstream.items()):
+                lines.append(f'watsonx_data_upstream_coalesced_total{{operation="{operation}"}} {stats.coalesced}')
+            metric("watsonx_data_upstream_bytes_saved_total", "counter", "Response bytes not downloaded thanks to a 304.")
+            for operation, stats in sorted(self.upstream.items()):
+                lines.append(f'watsonx_data_upstream_bytes_saved_total{{operation="{operation}"}} {stats.bytes_saved}')
+            metric("watsonx_data_upstream_latency_seconds", "histogram", "watsonx.data API call latency.")
+            for operation, stats in sorted(self.upstream.items()):
+                histogram("watsonx_data_upstream_latency_seconds", f'operation="{operation}"', stats.latency)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def instrument(fn, name=None):
+    """Wrap an async tool so its calls, latency and error class are recorded."""
+    name = name or fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = _error_class.set(None)
+        start = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            registry.record_tool(name, time.perf_counter() - start, type(e).__name__)
+            raise
+        else:
+            error_class = None
+            if isinstance(result, dict) and "error" in result:
+                error_class = _error_class.get() or "ToolError"
+            registry.record_tool(name, time.perf_counter() - start, error_class)
+            return result
+        finally:
+            _error_class.reset(token)
+
+    return wrapper
+
+
+def _write_metrics_file():
+    while True:
+        time.sleep(METRICS_INTERVAL)
+        try:
+            tmp = METRICS_FILE + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(registry.prometheus())
+            os.replace(tmp, METRICS_FILE)
+        except OSError:
+            pass
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        # Keep scrape requests out of the MCP host's server log.
+        pass
+
+
+def start_exporters():
+    if METRICS_FILE:
+        threading.Thread(target=_write_metrics_file, name="metrics-file", daemon=True).start()
+    if METRICS_PORT:
+        server = ThreadingHTTPServer(("127.0.0.1", METRICS_PORT), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
@@ -0,0 +1,147 @@
+# pagination.py
+
+import base64
+import hashlib
+import os
+import uuid
+
+from cache import TTLCache
+from codec import encoded_size
+from conditional import content_length
+from executor import run_blocking
+from instances import current_instance
+
+DEFAULT_PAGE_SIZE = int(os.getenv("WATSONX_DATA_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("WATSONX_DATA_MAX_PAGE_SIZE", "1000"))
+# Full listings are kept this long so later pages come from the same snapshot.
+SNAPSHOT_TTL = float(os.getenv("WATSONX_DATA_PAGE_SNAPSHOT_TTL", "300"))
+SNAPSHOT_CACHE_SIZE = int(os.getenv("WATSONX_DATA_PAGE_SNAPSHOT_CACHE_SIZE", "16"))
+SNAPSHOT_CACHE_BYTES = int(os.getenv("WATSONX_DATA_PAGE_SNAPSHOT_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+_snapshots = TTLCache(SNAPSHOT_CACHE_SIZE, SNAPSHOT_CACHE_BYTES)
+
+
+def find_items(result):
+    """Return (key, items) for the main list in an API result, or (None, None)."""
+    if isinstance(result, list):
+        return None, result
+    if not isinstance(result, dict):
+        return None, None
+    lists = [(key, value) for key, value in result.items() if isinstance(value, list)]
+    if not lists:
+        return None, None
+    return max(lists, key=lambda entry: len(entry[1]))
+
+
+def parse_fields(fields):
+    return [field.strip() for field in fields.split(",") if field.strip()] if fields else []
+
+
+def project(item, fields):
+    """Keep only the given fields of an item; dotted names reach into nested dicts."""
+    if not fields or not isinstance(item, dict):
+        return item
+    projected = {}
+    for field in fields:
+        value = item
+        for part in field.split("."):
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target = projected
+            parts = field.split(".")
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return projected
+
+
+def listing_tag(listing):
+    """Short hash of a listing's tool, arguments and instance, carried in its cursors."""
+    return hashlib.sha1(repr((tuple(listing), current_instance.get())).encode()).hexdigest()[:12]
+
+
+def encode_cursor(snapshot_id, offset, tag=""):
+    return base64.urlsafe_b64encode(f"{snapshot_id}:{offset}:{tag}".encode()).decode()
+
+
+def decode_cursor(cursor, tag=""):
+    """(snapshot_id, offset) of a cursor; raises ValueError unless it was issued for tag."""
+    try:
+        snapshot_id, offset, cursor_tag = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        offset = int(offset)
+    except Exception:
+        raise ValueError("Invalid cursor.")
+    if cursor_tag != tag:
+        raise ValueError("Cursor belongs to a different listing, arguments or instance; request the first page again.")
+    return snapshot_id, offset
+
+
+async def _fetch_listing(fetch, keep):
+    """(key, result, size) of a fresh listing, with keep applied; key and size are None for a non-list."""
+    response = await fetch()
+    result = response.get_result()
+    # The list is found once, on the full listing; filtering may leave another list the largest.
+    key, items = find_items(result)
+    if items is None:
+        return None, result, None
+    if keep is not None:
+        items = [item for item in items if keep(item)]
+        result = items if key is None else dict(result, **{key: items})
+    # The response's Content-Length spares encoding the listing to size its snapshot.
+    size = content_length(response) if keep is None else None
+    return key, result, size
+
+
+async def paginate(fetch, limit=DEFAULT_PAGE_SIZE, cursor="", fields="", keep=None, listing=()):
+    """Serve one page of a listing that the API only returns in full.
+
+    The first page fetches the listing and, if there are more pages, keeps it
+    in a small snapshot cache; the returned cursor reads later pages from that
+    snapshot without calling the API again. A listing too large for the
+    snapshot cache gets cursors that fetch it again for each page instead.
+    keep, if given, drops the items it returns False for before the listing
+    is paged or snapshotted. listing names the tool and the arguments that
+    select the items; a cursor is only accepted by the listing, with the same
+    arguments and instance, that issued it.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    tag = listing_tag(listing)
+    if cursor:
+        snapshot_id, offset = decode_cursor(cursor, tag)
+        if snapshot_id:
+            hit, snapshot = _snapshots.get(("snapshot", snapshot_id))
+            if not hit:
+                raise ValueError("Cursor has expired; request the first page again.")
+            key, result = snapshot
+        else:
+            key, result, _ = await _fetch_listing(fetch, keep)
+            if key is None and not isinstance(result, list):
+                raise ValueError("The listing is no longer a list; request the first page again.")
+    else:
+        snapshot_id, offset = uuid.uuid4().hex, 0
+        key, result, size = await _fetch_listing(fetch, keep)
+        if key is None and not isinstance(result, list):
+            return result
+    items = result if key is None else result[key]
+
+    page = [project(item, parse_fields(fields)) for item in items[offset:offset + limit]]
+    next_offset = offset + limit
+    next_cursor = None
+    if next_offset < len(items):
+        if not cursor:
+            if size is None:
+                size = await run_blocking(encoded_size, result)
+            # An empty snapshot id makes later pages fetch the listing again.
+            if not _snapshots.set(("snapshot", snapshot_id), (key, result), SNAPSHOT_TTL, size=size):
+                snapshot_id = ""
+        next_cursor = encode_cursor(snapshot_id, next_offset, tag)
+
+    pagination = {"total": len(items), "offset": offset, "limit": limit, "next_cursor": next_cursor}
+    if key is None:
+        return {"items": page, "pagination": pagination}
+    shaped = {name: value for name, value in result.items() if name != key}
+    shaped[key] = page
+    shaped["pagination"] = pagination
+    return shaped
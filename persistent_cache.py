@@ -0,0 +1,239 @@
+# persistent_cache.py
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from codec import dumps, loads
+from conditional import conditional_headers, not_modified, validators
+from executor import run_local
+from resilience import is_read_operation
+
+# Optional on-disk cache of slow-changing read responses, so a restarted server
+# answers from the last known state while it revalidates in the background.
+PERSISTENT_CACHE = os.getenv("WATSONX_DATA_PERSISTENT_CACHE", "false").lower() == "true"
+PERSISTENT_CACHE_PATH = os.path.expanduser(os.getenv(
+    "WATSONX_DATA_PERSISTENT_CACHE_PATH", os.path.join("~", ".cache", "watsonx-data-mcp", "responses.sqlite"),
+))
+PERSISTENT_CACHE_TTL = float(os.getenv("WATSONX_DATA_PERSISTENT_CACHE_TTL", "300"))
+# Entries older than this are never served, not even while revalidating.
+PERSISTENT_CACHE_MAX_STALE = float(os.getenv("WATSONX_DATA_PERSISTENT_CACHE_MAX_STALE", "86400"))
+
+PERSISTENT_OPERATIONS = (
+    "list_catalogs", "list_presto_engines", "list_prestissimo_engines", "list_spark_engines",
+    "list_bucket_registrations", "list_database_registrations", "get_endpoints", "list_instance_details",
+    "list_instance_service_details",
+)
+PERSISTENT_TTLS = {
+    operation: float(os.getenv(f"WATSONX_DATA_PERSISTENT_CACHE_TTL_{operation.upper()}", PERSISTENT_CACHE_TTL))
+    for operation in PERSISTENT_OPERATIONS
+}
+
+# Writes are matched to the listings they change by the resource named in the operation.
+_AFFECTED = (
+    ("prestissimo_engine", ("list_prestissimo_engines",)),
+    ("presto_engine", ("list_presto_engines",)),
+    ("spark_engine", ("list_spark_engines",)),
+    ("delete_engine", ("list_presto_engines", "list_prestissimo_engines", "list_spark_engines")),
+    ("bucket", ("list_bucket_registrations", "list_catalogs")),
+    ("database", ("list_database_registrations", "list_catalogs")),
+    ("sync_catalog", ("list_catalogs",)),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    operation TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    status_code INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_operation ON responses (operation);
+"""
+
+
+def affected_operations(operation):
+    if is_read_operation(operation):
+        return ()
+    affected = set()
+    for resource, operations in _AFFECTED:
+        if resource in operation:
+            affected.update(operations)
+    return affected
+
+
+class CachedResponse:
+    """Stand-in for a DetailedResponse rebuilt from the persistent cache."""
+
+    def __init__(self, result, status_code, etag=None, last_modified=None):
+        self.result = result
+        self.status_code = status_code
+        self.headers = {key: value for key, value in (("ETag", etag), ("Last-Modified", last_modified)) if value}
+
+    def get_result(self):
+        return self.result
+
+
+class PersistentCache:
+    """SQLite store of read responses that outlives the server process.
+
+    Fresh entries are served directly. An expired entry younger than max_stale
+    is served too, while a background request revalidates it, conditionally
+    when it has an ETag or Last-Modified, so a 304 only extends its expiry.
+    Entries are keyed by the service URL as well, so switching instances
+    never serves another instance's data.
+    """
+
+    def __init__(self, path=PERSISTENT_CACHE_PATH, ttls=PERSISTENT_TTLS, namespace="",
+                 max_stale=PERSISTENT_CACHE_MAX_STALE, metrics=None):
+        self.path = path
+        self.metrics = metrics
+        self.ttls = ttls
+        self.namespace = namespace
+        self.max_stale = max_stale
+        self._db = None
+        self._lock = threading.Lock()
+        self._invalidated_at = {}
+        self._revalidating = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+
+    def ttl_for(self, operation):
+        return self.ttls.get(operation)
+
+    def _connect(self):
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.executescript(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def key_for(self, operation, args, kwargs):
+        return json.dumps([self.namespace, operation, args, sorted(kwargs.items())], default=str)
+
+    def load(self, key):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT operation, stored_at, expires_at, status_code, etag, last_modified, result "
+                "FROM responses WHERE key = ?", (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        operation, stored_at, expires_at, status_code, etag, last_modified, result = row
+        return {
+            "operation": operation, "stored_at": stored_at, "expires_at": expires_at,
+            "response": CachedResponse(loads(result), status_code, etag, last_modified),
+            "etag": etag, "last_modified": last_modified, "size": len(result),
+        }
+
+    def store(self, key, operation, response, ttl, now):
+        try:
+            result = dumps(response.get_result())
+        except (TypeError, ValueError):
+            return
+        found = validators(response)
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, operation, stored_at, expires_at, status_code, etag, last_modified, result) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, operation, now, now + ttl, getattr(response, "status_code", None),
+                     found["etag"], found["last_modified"], result),
+                )
+
+    def touch(self, key, ttl, now):
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute("UPDATE responses SET stored_at = ?, expires_at = ? WHERE key = ?", (now, now + ttl, key))
+
+    def delete_operations(self, operations):
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.executemany("DELETE FROM responses WHERE operation = ?", [(op,) for op in operations])
+
+    def after_call(self, operation, succeeded=True):
+        affected = affected_operations(operation)
+        if not affected:
+            return
+        now = time.time()
+        for affected_operation in affected:
+            self._invalidated_at[affected_operation] = now
+        asyncio.ensure_future(run_local(self.delete_operations, affected))
+
+    def _usable(self, entry, now):
+        return (
+            entry is not None
+            and now - entry["stored_at"] <= self.max_stale
+            and entry["stored_at"] > self._invalidated_at.get(entry["operation"], 0)
+        )
+
+    async def fetch(self, operation, args, kwargs, call):
+        """Serve operation from the cache, or through call(headers) on a miss.
+
+        Returns (response, fresh); fresh is False when an expired entry was
+        served while it is revalidated in the background.
+        """
+        key = self.key_for(operation, args, kwargs)
+        ttl = self.ttls[operation]
+        entry = await run_local(self.load, key)
+        now = time.time()
+        if self._usable(entry, now):
+            if now < entry["expires_at"]:
+                self.hits += 1
+                return entry["response"], True
+            self.stale_hits += 1
+            task = self._revalidating.get(key)
+            if task is None or task.done():
+                task = self._revalidating[key] = asyncio.ensure_future(self._revalidate(key, operation, entry, call))
+                task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            return entry["response"], False
+        self.misses += 1
+        # Entries are stamped with the time the request started, so a write that
+        # finishes while it is in flight still invalidates the stored response.
+        started = time.time()
+        response = await call({})
+        await run_local(self.store, key, operation, response, ttl, started)
+        return response, True
+
+    async def _revalidate(self, key, operation, entry, call):
+        self.revalidations += 1
+        started = time.time()
+        try:
+            response = await call(conditional_headers(entry["etag"], entry["last_modified"]))
+        except Exception as e:
+            if not not_modified(e):
+                raise
+            self.not_modified += 1
+            if self.metrics is not None:
+                self.metrics.record_not_modified(operation, entry["size"])
+            await run_local(self.touch, key, self.ttls[operation], started)
+        else:
+            await run_local(self.store, key, operation, response, self.ttls[operation], started)
+
+    def stats(self):
+        with self._lock:
+            entries = self._connect().execute("SELECT count(*) FROM responses").fetchone()[0]
+        return {
+            "path": self.path,
+            "entries": entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "not_modified": self.not_modified,
+        }
@@ -0,0 +1,289 @@
+# query_history.py
+
+import asyncio
+import json
+import os
+import sqlite3
+import statistics
+import threading
+import time
+
+from executor import run_local
+from query_results import META_KEY
+from sql import fingerprint_sql
+
+# Local log of the queries run through this server, behind the query_history tool.
+QUERY_HISTORY = os.getenv("WATSONX_DATA_QUERY_HISTORY", "true").lower() == "true"
+QUERY_HISTORY_PATH = os.path.expanduser(os.getenv(
+    "WATSONX_DATA_QUERY_HISTORY_PATH", os.path.join("~", ".cache", "watsonx-data-mcp", "query_history.sqlite"),
+))
+QUERY_HISTORY_RETENTION = float(os.getenv("WATSONX_DATA_QUERY_HISTORY_RETENTION_DAYS", "30")) * 86400
+# Also run EXPLAIN ANALYZE in the background for read-only queries, at most once per
+# fingerprint per interval, so plans can be compared over time. EXPLAIN ANALYZE runs the query again.
+QUERY_HISTORY_ANALYZE = os.getenv("WATSONX_DATA_QUERY_HISTORY_ANALYZE", "false").lower() == "true"
+QUERY_HISTORY_ANALYZE_INTERVAL = float(os.getenv("WATSONX_DATA_QUERY_HISTORY_ANALYZE_INTERVAL", "3600"))
+# Background EXPLAIN ANALYZE runs in flight at once; queries finishing while all are busy are not analyzed.
+QUERY_HISTORY_ANALYZE_MAX_CONCURRENT = int(os.getenv("WATSONX_DATA_QUERY_HISTORY_ANALYZE_MAX_CONCURRENT", "2"))
+# A fingerprint regressed when its median wall time grew by this factor, with at least
+# REGRESSION_MIN_RUNS runs on each side of the comparison.
+REGRESSION_RATIO = float(os.getenv("WATSONX_DATA_QUERY_REGRESSION_RATIO", "1.5"))
+REGRESSION_MIN_RUNS = int(os.getenv("WATSONX_DATA_QUERY_REGRESSION_MIN_RUNS", "3"))
+
+# Writes that can change how fast queries run: engine scaling and restarts, catalog
+# syncs and table rollbacks.
+EVENT_PREFIXES = ("scale_", "update_", "pause_", "resume_", "restart_", "rollback_", "sync_")
+EVENT_RESOURCES = ("engine", "catalog", "table")
+
+_TEMPLATE_CHARS = 2000
+_PRUNE_EVERY = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    fingerprint TEXT NOT NULL,
+    template TEXT NOT NULL,
+    instance TEXT NOT NULL,
+    engine TEXT,
+    started_at REAL NOT NULL,
+    wall_ms REAL NOT NULL,
+    rows INTEGER,
+    bytes INTEGER,
+    cached INTEGER NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_fingerprint ON runs (fingerprint, started_at);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at);
+CREATE TABLE IF NOT EXISTS plans (
+    fingerprint TEXT NOT NULL,
+    instance TEXT NOT NULL,
+    engine TEXT,
+    analyzed_at REAL NOT NULL,
+    cpu_ms REAL,
+    scheduled_ms REAL,
+    input_rows INTEGER,
+    input_bytes INTEGER,
+    findings TEXT
+);
+CREATE INDEX IF NOT EXISTS plans_fingerprint ON plans (fingerprint, analyzed_at);
+CREATE TABLE IF NOT EXISTS events (at REAL NOT NULL, operation TEXT NOT NULL, instance TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS events_at ON events (at);
+"""
+
+
+def is_performance_event(operation):
+    return operation.startswith(EVENT_PREFIXES) and any(resource in operation for resource in EVENT_RESOURCES)
+
+
+def query_engine(body):
+    for key in ("engine_id", "engine"):
+        if isinstance(body.get(key), str):
+            return body[key]
+    return None
+
+
+def _ms(value):
+    return round(value, 1) if value is not None else None
+
+
+class QueryHistory:
+    """SQLite log of query runs, EXPLAIN ANALYZE statistics and performance-relevant writes.
+
+    Runs are keyed by SQL fingerprint, so repeated queries that differ only in
+    their literals are compared with each other. Writes are recorded as
+    background tasks, off the request path. scope() names the instance of the
+    current call, like the AsyncClient's.
+    """
+
+    def __init__(self, path=QUERY_HISTORY_PATH, scope=None, retention=QUERY_HISTORY_RETENTION):
+        self.path = path
+        self.retention = retention
+        self._scope = scope
+        self._db = None
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self._analyzed = {}
+
+    def _connect(self):
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.executescript(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def _instance(self):
+        return self._scope() if self._scope is not None else ""
+
+    def _write(self, sql, params):
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute(sql, params)
+                self._inserts += 1
+                if self._inserts % _PRUNE_EVERY == 0:
+                    cutoff = time.time() - self.retention
+                    db.execute("DELETE FROM runs WHERE started_at < ?", (cutoff,))
+                    db.execute("DELETE FROM plans WHERE analyzed_at < ?", (cutoff,))
+                    db.execute("DELETE FROM events WHERE at < ?", (cutoff,))
+
+    def _background(self, sql, params):
+        task = asyncio.ensure_future(run_local(self._write, sql, params))
+        # History is best effort; a failed write must not surface as an unretrieved exception.
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+    def record_run(self, sql, engine, started_at, wall_seconds, result=None, error=None):
+        """Log one query execution; returns its fingerprint."""
+        fingerprint, template = fingerprint_sql(sql)
+        meta = result.get(META_KEY) if isinstance(result, dict) else None
+        meta = meta if isinstance(meta, dict) else {}
+        rows = meta.get("original_rows", meta.get("total_rows"))
+        self._background(
+            "INSERT INTO runs (fingerprint, template, instance, engine, started_at, wall_ms, rows, bytes, cached, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (fingerprint, template[:_TEMPLATE_CHARS], self._instance(), engine, started_at, wall_seconds * 1000,
+             rows, meta.get("downloaded_bytes"), int(bool(meta.get("cached"))), str(error) if error else None),
+        )
+        return fingerprint
+
+    def should_analyze(self, fingerprint):
+        key = (fingerprint, self._instance())
+        now = time.monotonic()
+        if now - self._analyzed.get(key, float("-inf")) < QUERY_HISTORY_ANALYZE_INTERVAL:
+            return False
+        self._analyzed[key] = now
+        return True
+
+    def record_plan(self, sql, engine, analysis):
+        """Log the totals and finding kinds of an analyze_plan result."""
+        fragments = analysis.get("fragments") or []
+
+        def total(key):
+            values = [fragment[key] for fragment in fragments if key in fragment]
+            return sum(values) if values else None
+
+        sources = [fragment for fragment in fragments if fragment.get("partitioning") == "SOURCE"]
+        self._background(
+            "INSERT INTO plans (fingerprint, instance, engine, analyzed_at, cpu_ms, scheduled_ms, input_rows, "
+            "input_bytes, findings) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (fingerprint_sql(sql)[0], self._instance(), engine, time.time(), total("cpu_ms"), total("scheduled_ms"),
+             sum(fragment.get("input_rows", 0) for fragment in sources) or None,
+             sum(fragment.get("input_bytes", 0) for fragment in sources) or None,
+             json.dumps(sorted({finding["kind"] for finding in analysis.get("findings") or []}))),
+        )
+
+    def after_call(self, operation, succeeded=True):
+        # A write that failed did not change how queries run; only the ones that went through are events.
+        if succeeded and is_performance_event(operation):
+            self._background(
+                "INSERT INTO events (at, operation, instance) VALUES (?, ?, ?)",
+                (time.time(), operation, self._instance()),
+            )
+
+    def _rows(self, sql, params):
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    def fingerprint(self, fingerprint, since, limit):
+        instance = self._instance()
+        runs = self._rows(
+            "SELECT template, engine, started_at, wall_ms, rows, bytes, cached, error FROM runs "
+            "WHERE fingerprint = ? AND instance = ? AND started_at >= ? ORDER BY started_at DESC",
+            (fingerprint, instance, since),
+        )
+        plans = self._rows(
+            "SELECT engine, analyzed_at, cpu_ms, scheduled_ms, input_rows, input_bytes, findings FROM plans "
+            "WHERE fingerprint = ? AND instance = ? AND analyzed_at >= ? ORDER BY analyzed_at DESC LIMIT ?",
+            (fingerprint, instance, since, limit),
+        )
+        timings = [run[3] for run in runs if not run[6] and run[7] is None]
+        return {
+            "fingerprint": fingerprint,
+            "template": runs[0][0] if runs else None,
+            "runs": len(runs),
+            "cached_runs": sum(1 for run in runs if run[6]),
+            "errors": sum(1 for run in runs if run[7] is not None),
+            "wall_ms": _summary(timings),
+            "recent": [
+                {"engine": engine, "started_at": started_at, "wall_ms": _ms(wall_ms), "rows": rows, "bytes": size,
+                 "cached": bool(cached), "error": error}
+                for _, engine, started_at, wall_ms, rows, size, cached, error in runs[:limit]
+            ],
+            "plans": [
+                {"engine": engine, "analyzed_at": analyzed_at, "cpu_ms": _ms(cpu_ms),
+                 "scheduled_ms": _ms(scheduled_ms), "input_rows": input_rows, "input_bytes": input_bytes,
+                 "findings": json.loads(findings) if findings else []}
+                for engine, analyzed_at, cpu_ms, scheduled_ms, input_rows, input_bytes, findings in plans
+            ],
+        }
+
+    def top_slowest(self, since, limit):
+        rows = self._rows(
+            "SELECT fingerprint, max(template), count(*), avg(wall_ms), max(wall_ms), max(started_at) FROM runs "
+            "WHERE instance = ? AND started_at >= ? AND cached = 0 AND error IS NULL "
+            "GROUP BY fingerprint ORDER BY avg(wall_ms) DESC LIMIT ?",
+            (self._instance(), since, limit),
+        )
+        return [
+            {"fingerprint": fingerprint, "template": template, "runs": runs, "avg_ms": _ms(avg_ms),
+             "max_ms": _ms(max_ms), "last_run_at": last_run_at}
+            for fingerprint, template, runs, avg_ms, max_ms, last_run_at in rows
+        ]
+
+    def regressions(self, since, limit):
+        """Recurring queries whose median wall time grew, with the write that preceded the change.
+
+        Runs are split at every recorded event, and at the start of the most
+        recent REGRESSION_MIN_RUNS runs; the split with the largest slowdown
+        is reported when it reaches REGRESSION_RATIO.
+        """
+        instance = self._instance()
+        runs = self._rows(
+            "SELECT fingerprint, template, started_at, wall_ms FROM runs "
+            "WHERE instance = ? AND started_at >= ? AND cached = 0 AND error IS NULL ORDER BY started_at",
+            (instance, since),
+        )
+        events = self._rows(
+            "SELECT at, operation FROM events WHERE instance = ? AND at >= ? ORDER BY at", (instance, since),
+        )
+        by_fingerprint = {}
+        for fingerprint, template, started_at, wall_ms in runs:
+            entry = by_fingerprint.setdefault(fingerprint, {"template": template, "runs": []})
+            entry["runs"].append((started_at, wall_ms))
+
+        found = []
+        for fingerprint, entry in by_fingerprint.items():
+            timeline = entry["runs"]
+            if len(timeline) < 2 * REGRESSION_MIN_RUNS:
+                continue
+            splits = [(at, operation) for at, operation in events]
+            splits.append((timeline[-REGRESSION_MIN_RUNS][0], None))
+            best = None
+            for at, operation in splits:
+                before = [wall_ms for started_at, wall_ms in timeline if started_at < at]
+                after = [wall_ms for started_at, wall_ms in timeline if started_at >= at]
+                if len(before) < REGRESSION_MIN_RUNS or len(after) < REGRESSION_MIN_RUNS:
+                    continue
+                before_ms, after_ms = statistics.median(before), statistics.median(after)
+                ratio = after_ms / before_ms if before_ms else None
+                if ratio is not None and (best is None or ratio > best["ratio"]):
+                    best = {
+                        "ratio": round(ratio, 2), "before_ms": _ms(before_ms), "after_ms": _ms(after_ms),
+                        "runs_before": len(before), "runs_after": len(after),
+                        "event": {"operation": operation, "at": at} if operation else None,
+                    }
+            if best is not None and best["ratio"] >= REGRESSION_RATIO:
+                found.append({"fingerprint": fingerprint, "template": entry["template"], **best})
+        found.sort(key=lambda regression: -regression["ratio"])
+        return found[:limit]
+
+
+def _summary(timings):
+    if not timings:
+        return None
+    ordered = sorted(timings)
+    return {
+        "p50": _ms(statistics.median(ordered)),
+        "p95": _ms(ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)]),
+        "max": _ms(ordered[-1]),
+        "count": len(ordered),
+    }
@@ -0,0 +1,297 @@
+# query_plans.py
+
+import json
+import os
+import re
+
+# Thresholds for the findings reported by analyze_plan.
+FULL_SCAN_ROWS = float(os.getenv("WATSONX_DATA_PLAN_FULL_SCAN_ROWS", "1000000"))
+BROADCAST_BYTES = float(os.getenv("WATSONX_DATA_PLAN_BROADCAST_BYTES", str(100 * 1024 ** 2)))
+# Share of a scan's rows a filter must discard before it counts as missed pruning.
+PRUNING_FILTERED_PCT = float(os.getenv("WATSONX_DATA_PLAN_PRUNING_FILTERED_PCT", "50"))
+# Relative standard deviation of per-task input, in percent, that counts as skew.
+SKEW_PCT = float(os.getenv("WATSONX_DATA_PLAN_SKEW_PCT", "100"))
+# Share of the query's CPU or scheduled time one operator must take to be a hotspot.
+HOTSPOT_PCT = float(os.getenv("WATSONX_DATA_PLAN_HOTSPOT_PCT", "30"))
+HOTSPOT_COUNT = int(os.getenv("WATSONX_DATA_PLAN_HOTSPOT_COUNT", "5"))
+
+_DURATION_UNITS = {"ns": 1e-6, "us": 1e-3, "ms": 1, "s": 1e3, "m": 60e3, "h": 3600e3, "d": 86400e3}
+_SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3, "tb": 1024 ** 4, "pb": 1024 ** 5}
+_COUNT_UNITS = {"": 1, "k": 1e3, "m": 1e6, "b": 1e9, "t": 1e12}
+
+_FRAGMENT = re.compile(r"^Fragment (\d+) \[([^\]]*)\]")
+_NODE = re.compile(r"^(\s*)- ([A-Za-z]+(?:\([A-Za-z_]+\))?)(.*)$")
+_NUMBER = r"([\d.,]+)\s*"
+_STATS = {
+    "cpu": re.compile(r"\bCPU: " + _NUMBER + r"([a-z]+)(?: \(([\d.]+)%\))?"),
+    "scheduled": re.compile(r"\bScheduled: " + _NUMBER + r"([a-z]+)(?: \(([\d.]+)%\))?"),
+    "output": re.compile(r"\bOutput: " + _NUMBER + r"([KMBT]?) rows? \(" + _NUMBER + r"([kKMGTP]?B)\)"),
+    "input": re.compile(r"\bInput: " + _NUMBER + r"([KMBT]?) rows? \(" + _NUMBER + r"([kKMGTP]?B)\)"),
+    "estimates": re.compile(r"Estimates: \{rows: " + _NUMBER + r"([KMBT]?) \(" + _NUMBER + r"([kKMGTP]?B)\)"),
+}
+_FILTERED = re.compile(r"\bFiltered: ([\d.]+)%")
+_STD_DEV = re.compile(r"Input std\.dev\.: ([\d.]+)%")
+_TASK_SKEW = re.compile(r"per task: avg\.: ([\d.]+) std\.dev\.: ([\d.]+)")
+_DISTRIBUTION = re.compile(r"\bDistribution: (\w+)")
+_TABLE = re.compile(r"(?:table = |schemaTableName=|connectorHandle=')([\w.:\"-]+)")
+# Signs that the connector pruned partitions or pushed a predicate into the scan.
+_PRUNED = re.compile(r"constraint on|partition(?:s|Predicate)?\s*[=:]|predicate=|TupleDomain|domains=", re.IGNORECASE)
+
+
+def _number(text):
+    return float(text.replace(",", ""))
+
+
+def _duration_ms(value, unit):
+    return _number(value) * _DURATION_UNITS.get(unit, 1)
+
+
+def _size(value, unit):
+    return int(_number(value) * _SIZE_UNITS.get(unit.lower(), 1))
+
+
+def _count(value, suffix):
+    return int(_number(value) * _COUNT_UNITS.get(suffix.lower(), 1))
+
+
+def _new_node(operator, args="", outputs=""):
+    return {"operator": operator, "args": args, "outputs": outputs, "details": [], "children": []}
+
+
+def _read_stats(target, line):
+    """Copy the runtime statistics found in one plan line onto a node or fragment."""
+    for name in ("cpu", "scheduled"):
+        match = _STATS[name].search(line)
+        if match:
+            target[f"{name}_ms"] = round(_duration_ms(match.group(1), match.group(2)), 3)
+            if match.group(3):
+                target[f"{name}_pct"] = float(match.group(3))
+    for name in ("output", "input"):
+        match = _STATS[name].search(line)
+        if match:
+            target[f"{name}_rows"] = _count(match.group(1), match.group(2))
+            target[f"{name}_bytes"] = _size(match.group(3), match.group(4))
+    match = _STATS["estimates"].search(line)
+    if match:
+        target["estimated_rows"] = _count(match.group(1), match.group(2))
+        target["estimated_bytes"] = _size(match.group(3), match.group(4))
+    for key, pattern in (("filtered_pct", _FILTERED), ("input_std_dev_pct", _STD_DEV)):
+        match = pattern.search(line)
+        if match:
+            target[key] = float(match.group(1))
+    match = _TASK_SKEW.search(line)
+    if match and float(match.group(1)):
+        target["task_skew_pct"] = round(float(match.group(2)) / float(match.group(1)) * 100, 1)
+    match = _DISTRIBUTION.search(line)
+    if match:
+        target["distribution"] = match.group(1).upper()
+
+
+def parse_text_plan(text):
+    """Fragments of a text EXPLAIN (ANALYZE) plan, each with its operator tree."""
+    fragments = []
+    fragment = None
+    stack = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        match = _FRAGMENT.match(line.strip())
+        if match:
+            fragment = {"id": int(match.group(1)), "partitioning": match.group(2), "details": [], "plan": None}
+            fragments.append(fragment)
+            stack = []
+            continue
+        if fragment is None:
+            # A plan without fragments (EXPLAIN (TYPE LOGICAL)) is one implicit fragment.
+            fragment = {"id": 0, "partitioning": None, "details": [], "plan": None}
+            fragments.append(fragment)
+        match = _NODE.match(line)
+        if match:
+            indent = len(match.group(1))
+            rest, _, outputs = match.group(3).partition(" => ")
+            node = _new_node(match.group(2), rest.strip(), outputs.strip())
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            if stack:
+                stack[-1][1]["children"].append(node)
+            elif fragment["plan"] is None:
+                fragment["plan"] = node
+            else:
+                # Several roots at the top level: keep them all under the first.
+                fragment["plan"]["children"].append(node)
+            stack.append((indent, node))
+            continue
+        target = stack[-1][1] if stack else fragment
+        target["details"].append(line.strip())
+        _read_stats(target, line)
+    return fragments
+
+
+def _from_json_node(raw):
+    node = _new_node(raw.get("name", ""), raw.get("identifier", ""))
+    details = raw.get("details") or ""
+    node["details"] = [line.strip() for line in details.splitlines() if line.strip()]
+    for line in node["details"]:
+        _read_stats(node, line)
+    for estimate in raw.get("estimates") or []:
+        rows, size = estimate.get("outputRowCount"), estimate.get("outputSizeInBytes")
+        if isinstance(rows, (int, float)) and rows == rows:
+            node["estimated_rows"] = int(rows)
+        if isinstance(size, (int, float)) and size == size:
+            node["estimated_bytes"] = int(size)
+    node["children"] = [_from_json_node(child) for child in raw.get("children") or []]
+    return node
+
+
+def parse_json_plan(plan):
+    """Fragments of an EXPLAIN (FORMAT JSON) plan: one node tree, or fragment id -> {"plan": tree}."""
+    if "name" in plan:
+        return [{"id": 0, "partitioning": None, "details": [], "plan": _from_json_node(plan)}]
+    fragments = []
+    for fragment_id, fragment in sorted(plan.items(), key=lambda entry: int(entry[0]) if entry[0].isdigit() else 0):
+        tree = fragment.get("plan", fragment) if isinstance(fragment, dict) else None
+        if isinstance(tree, dict):
+            fragments.append({
+                "id": int(fragment_id) if fragment_id.isdigit() else fragment_id,
+                "partitioning": None, "details": [], "plan": _from_json_node(tree),
+            })
+    return fragments
+
+
+def plan_text(result):
+    """The plan in an explain response: text, or parsed JSON when the plan is JSON."""
+    if isinstance(result, dict):
+        for key in ("result", "plan", "explain", "query_plan"):
+            if key in result:
+                return plan_text(result[key])
+        return result if "name" in result or all(isinstance(v, dict) for v in result.values()) else None
+    if isinstance(result, list):
+        return "\n".join(str(row[0] if isinstance(row, list) and row else row) for row in result)
+    if isinstance(result, str):
+        stripped = result.strip()
+        if stripped.startswith("{"):
+            try:
+                return json.loads(stripped)
+            except ValueError:
+                pass
+        return result
+    return None
+
+
+def _walk(node, parent=None):
+    yield node, parent
+    for child in node["children"]:
+        yield from _walk(child, node)
+
+
+def _is_scan(node):
+    return "Scan" in node["operator"]
+
+
+def _rows(node):
+    for key in ("input_rows", "output_rows", "estimated_rows"):
+        if key in node:
+            return node[key]
+    return None
+
+
+def _build_bytes(join):
+    if not join["children"]:
+        return None
+    build = join["children"][-1]
+    for node, _ in _walk(build):
+        for key in ("output_bytes", "estimated_bytes"):
+            if key in node:
+                return node[key]
+    return None
+
+
+def _label(node):
+    table = _TABLE.search(node["args"])
+    return f"{node['operator']}[{table.group(1)}]" if table else node["operator"]
+
+
+def find_issues(fragments):
+    """Findings for full scans, missed pruning, large broadcast joins, skew and hotspots."""
+    findings = []
+
+    def add(kind, severity, fragment, node, message, **extra):
+        findings.append({
+            "kind": kind, "severity": severity, "fragment": fragment["id"],
+            "operator": _label(node) if node else None, "message": message, **extra,
+        })
+
+    for fragment in fragments:
+        skew = fragment.get("task_skew_pct")
+        if skew is not None and skew >= SKEW_PCT:
+            add("skewed_stage", "warning", fragment, None,
+                f"Per-task input varies by {skew}% of the average; a few tasks do most of the work.", skew_pct=skew)
+        if fragment["plan"] is None:
+            continue
+        for node, parent in _walk(fragment["plan"]):
+            text = " ".join([node["args"], *node["details"]])
+            if _is_scan(node):
+                filtered = "Filter" in node["operator"] or (parent is not None and "Filter" in parent["operator"])
+                pruned = bool(_PRUNED.search(text))
+                rows = _rows(node)
+                if not filtered and not pruned and (rows is None or rows >= FULL_SCAN_ROWS):
+                    add("full_scan", "warning" if rows is not None else "info", fragment, node,
+                        "Table is read without any predicate" + (f" ({rows} rows)." if rows is not None else "."),
+                        rows=rows)
+                filtered_pct = node.get("filtered_pct")
+                if filtered and not pruned and filtered_pct is not None and filtered_pct >= PRUNING_FILTERED_PCT:
+                    add("missing_partition_pruning", "warning", fragment, node,
+                        f"{filtered_pct}% of the rows read were discarded by a filter after the scan; "
+                        "filter on partition columns so the connector can skip files.", filtered_pct=filtered_pct)
+            if "Join" in node["operator"] and (
+                node.get("distribution") == "REPLICATED" or "REPLICATE" in text
+            ):
+                size = _build_bytes(node)
+                if size is not None and size >= BROADCAST_BYTES:
+                    add("large_broadcast_join", "warning", fragment, node,
+                        f"The build side ({size} bytes) is copied to every worker; a partitioned join "
+                        "or a smaller build side would use less memory and network.", build_bytes=size)
+            std_dev = node.get("input_std_dev_pct")
+            if std_dev is not None and std_dev >= SKEW_PCT:
+                add("skewed_operator", "warning", fragment, node,
+                    f"Input std.dev. across drivers is {std_dev}%.", input_std_dev_pct=std_dev)
+            for metric, kind in (("cpu_pct", "cpu_hotspot"), ("scheduled_pct", "wall_time_hotspot")):
+                share = node.get(metric)
+                if share is not None and share >= HOTSPOT_PCT:
+                    add(kind, "info", fragment, node, f"Takes {share}% of the query's {metric[:-4]} time.",
+                        share_pct=share)
+    return findings
+
+
+def _compact(node):
+    compact = {key: value for key, value in node.items() if key not in ("details", "children") and value != ""}
+    if node["children"]:
+        compact["children"] = [_compact(child) for child in node["children"]]
+    return compact
+
+
+def analyze_plan(plan):
+    """Structured operator tree, findings and top CPU operators for an explain result."""
+    if isinstance(plan, dict):
+        fragments = parse_json_plan(plan)
+    else:
+        fragments = parse_text_plan(plan or "")
+    if not any(fragment["plan"] for fragment in fragments):
+        raise ValueError("The explain output contains no plan operators.")
+    operators = [node for fragment in fragments if fragment["plan"] for node, _ in _walk(fragment["plan"])]
+    timed = sorted((node for node in operators if "cpu_ms" in node), key=lambda node: -node["cpu_ms"])
+    return {
+        "analyzed": bool(timed),
+        "fragments": [
+            dict({key: value for key, value in fragment.items() if key not in ("details", "plan")},
+                 plan=_compact(fragment["plan"]) if fragment["plan"] else None)
+            for fragment in fragments
+        ],
+        "findings": find_issues(fragments),
+        "hotspots": [
+            {key: node[key] for key in ("cpu_ms", "cpu_pct", "scheduled_ms", "scheduled_pct", "output_rows")
+             if key in node} | {"operator": _label(node)}
+            for node in timed[:HOTSPOT_COUNT]
+        ],
+        "operators": len(operators),
+    }
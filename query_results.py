@@ -0,0 +1,203 @@
+# query_results.py
+
+import json
+import os
+import uuid
+
+from cache import MetadataCache, TTLCache
+from codec import dumps, loads
+from executor import run_blocking
+from sql import is_read_only, normalize_sql, sql_text
+
+# Hard cap on the bytes downloaded for one query result; larger results are refused.
+QUERY_MAX_BYTES = int(os.getenv("WATSONX_DATA_QUERY_MAX_BYTES", str(64 * 1024 * 1024)))
+# Rows kept from one result; anything beyond is dropped and reported as truncated.
+QUERY_MAX_ROWS = int(os.getenv("WATSONX_DATA_QUERY_MAX_ROWS", "100000"))
+# Size of each chunk returned to the client.
+QUERY_CHUNK_ROWS = int(os.getenv("WATSONX_DATA_QUERY_CHUNK_ROWS", "500"))
+QUERY_CHUNK_BYTES = int(os.getenv("WATSONX_DATA_QUERY_CHUNK_BYTES", str(256 * 1024)))
+# How long, and how many, partially fetched results stay available to fetch_next.
+RESULT_TTL = float(os.getenv("WATSONX_DATA_QUERY_RESULT_TTL", "600"))
+RESULT_STORE_SIZE = int(os.getenv("WATSONX_DATA_QUERY_RESULT_STORE_SIZE", "16"))
+
+# Optional cache of complete read-only query results, keyed by normalized SQL plus
+# the rest of the request body (engine, catalog, schema). Off unless enabled.
+QUERY_CACHE = os.getenv("WATSONX_DATA_QUERY_CACHE", "false").lower() == "true"
+QUERY_CACHE_TTL = float(os.getenv("WATSONX_DATA_QUERY_CACHE_TTL", "300"))
+QUERY_CACHE_SIZE = int(os.getenv("WATSONX_DATA_QUERY_CACHE_SIZE", "256"))
+QUERY_CACHE_BYTES = int(os.getenv("WATSONX_DATA_QUERY_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# Writes made through other tools that can change query results.
+_TABLE_WRITES = (
+    "create_schema", "delete_schema", "update_table", "delete_table", "rollback_table",
+    "create_columns", "delete_column", "update_column", "update_sync_catalog",
+    "create_ingestion_jobs", "create_ingestion_jobs_local_files",
+)
+
+_READ_SIZE = 64 * 1024
+# Key of the result_id, row counts and flags added to a query response. The API
+# response has its own top-level keys, so this one must not collide with them.
+META_KEY = "_query"
+
+_results = TTLCache(RESULT_STORE_SIZE)
+query_cache = MetadataCache(
+    QUERY_CACHE_SIZE, {}, {operation: ("query",) for operation in _TABLE_WRITES}, maxbytes=QUERY_CACHE_BYTES,
+)
+
+
+class ResultTooLarge(Exception):
+    pass
+
+
+def read_json_capped(raw, max_bytes=QUERY_MAX_BYTES):
+    """Read a streamed requests.Response body, refusing to buffer more than max_bytes.
+
+    Returns the parsed JSON and the size of the body in bytes. A body the SDK
+    has already parsed is measured by encoding it again.
+    """
+    if raw is None:
+        return None, 0
+    if not hasattr(raw, "iter_content"):
+        return raw, len(dumps(raw).encode())
+    try:
+        body = bytearray()
+        for chunk in raw.iter_content(_READ_SIZE):
+            body.extend(chunk)
+            if len(body) > max_bytes:
+                raise ResultTooLarge(
+                    f"Query result exceeds {max_bytes} bytes; add a LIMIT or select fewer columns."
+                )
+    finally:
+        raw.close()
+    return (loads(body) if body else None), len(body)
+
+
+def cache_key(body, sql, scope=""):
+    normalized = dict(body, **{"sql_string": normalize_sql(sql)})
+    if scope:
+        normalized["_instance"] = scope
+    normalized.pop("sql", None)
+    normalized.pop("statement", None)
+    normalized.pop("query", None)
+    return ("query", json.dumps(normalized, sort_keys=True, default=str))
+
+
+def find_rows(result, depth=3):
+    """Return the path to the largest list in a result, searching nested dicts."""
+    if isinstance(result, list):
+        return []
+    if not isinstance(result, dict) or depth == 0:
+        return None
+    best, best_len = None, -1
+    for key, value in result.items():
+        if isinstance(value, list):
+            path, size = [key], len(value)
+        else:
+            path = find_rows(value, depth - 1)
+            if path is None:
+                continue
+            path = [key] + path
+            size = len(_get_path(result, path))
+        if size > best_len:
+            best, best_len = path, size
+    return best
+
+
+def _get_path(result, path):
+    for key in path:
+        result = result[key]
+    return result
+
+
+def _with_rows(result, path, rows):
+    """Copy of result with the list at path replaced, leaving the original untouched."""
+    if not path:
+        return rows
+    copy = dict(result)
+    copy[path[0]] = _with_rows(result[path[0]], path[1:], rows)
+    return copy
+
+
+def _next_chunk(rows, offset, chunk_rows):
+    end = offset
+    size = 0
+    while end < len(rows) and end - offset < chunk_rows:
+        size += len(dumps(rows[end]))
+        if size > QUERY_CHUNK_BYTES and end > offset:
+            break
+        end += 1
+    return rows[offset:end], end
+
+
+def _chunk_response(result_id, entry):
+    chunk, end = _next_chunk(entry["rows"], entry["offset"], entry["chunk_rows"])
+    meta = {
+        "result_id": result_id if end < len(entry["rows"]) else None,
+        "offset": entry["offset"],
+        "returned_rows": len(chunk),
+        "total_rows": len(entry["rows"]),
+        "has_more": end < len(entry["rows"]),
+        "truncated": entry["truncated"],
+    }
+    if entry["truncated"]:
+        meta["original_rows"] = entry["original_rows"]
+    entry["offset"] = end
+    if end < len(entry["rows"]):
+        _results.set(("result", result_id), entry, RESULT_TTL)
+    else:
+        _results.pop(("result", result_id))
+    return chunk, meta
+
+
+async def run_query(execute, body, max_rows=QUERY_MAX_ROWS, chunk_rows=QUERY_CHUNK_ROWS, use_cache=True, scope=""):
+    """Execute a query and return its first chunk of rows plus a handle for the rest.
+
+    With QUERY_CACHE enabled, read-only statements are served from, and stored
+    in, the query cache; use_cache=False bypasses it for both. Any other
+    statement clears it. Cached results are kept apart per scope, the
+    instance the query ran on.
+    """
+    sql = sql_text(body) if isinstance(body, dict) else None
+    cacheable = QUERY_CACHE and use_cache and sql is not None and is_read_only(sql)
+    key = cache_key(body, sql, scope) if cacheable else None
+    cached = False
+    size = None
+    if key is not None:
+        cached, result = query_cache.get(key)
+    if not cached:
+        generation = query_cache.generation
+        response = await execute(body=body, stream=True)
+        result, size = await run_blocking(read_json_capped, response.get_result())
+        if key is not None:
+            query_cache.set(key, result, QUERY_CACHE_TTL, generation, size=size)
+        elif sql is not None and not is_read_only(sql):
+            query_cache.invalidate()
+
+    path = find_rows(result)
+    if path is None:
+        return result
+
+    rows = _get_path(result, path)
+    max_rows = max(1, min(max_rows, QUERY_MAX_ROWS))
+    entry = {
+        "rows": rows[:max_rows],
+        "offset": 0,
+        "chunk_rows": max(1, chunk_rows),
+        "truncated": len(rows) > max_rows,
+        "original_rows": len(rows),
+    }
+    result_id = uuid.uuid4().hex
+    chunk, meta = _chunk_response(result_id, entry)
+    meta["cached"] = cached
+    meta["downloaded_bytes"] = size
+    shaped = _with_rows(result, path, chunk) if path else {"rows": chunk}
+    shaped[META_KEY] = meta
+    return shaped
+
+
+def fetch_next_chunk(result_id):
+    hit, entry = _results.get(("result", result_id))
+    if not hit:
+        raise ValueError("Unknown or expired result_id; run the query again.")
+    chunk, meta = _chunk_response(result_id, entry)
+    return {"rows": chunk, META_KEY: meta}
@@ -0,0 +1,204 @@
+# resilience.py
+
+import asyncio
+import contextvars
+import email.utils
+import os
+import random
+import time
+from collections import Counter
+
+from sql import is_read_only, sql_text
+
+# Retries after the first attempt for transient failures (429, 5xx, dropped connections).
+RETRY_ATTEMPTS = int(os.getenv("WATSONX_DATA_RETRY_ATTEMPTS", "3"))
+# Exponential backoff with full jitter: attempt n waits up to min(MAX, BASE * 2**n) seconds.
+RETRY_BASE_DELAY = float(os.getenv("WATSONX_DATA_RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("WATSONX_DATA_RETRY_MAX_DELAY", "20"))
+# Consecutive transient failures that open an operation's circuit, and how long it stays open.
+BREAKER_THRESHOLD = int(os.getenv("WATSONX_DATA_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("WATSONX_DATA_BREAKER_COOLDOWN", "30"))
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+_CONNECTION_ERRORS = {"ConnectionError", "ConnectTimeout", "ReadTimeout", "Timeout", "ChunkedEncodingError"}
+
+# Operations that only read, so repeating them is always safe.
+READ_PREFIXES = ("list_", "get_")
+READ_OPERATIONS = {"run_explain_statement", "run_prestissimo_explain_statement"}
+# Tools that change state; they accept an idempotency_key that makes them retryable.
+MUTATING_PREFIXES = (
+    "create_", "delete_", "update_", "pause_", "resume_", "restart_", "scale_", "rollback_", "start_",
+)
+# Operations that run the SQL statement in their body. They are as safe to repeat as
+# that statement, whatever their name says.
+STATEMENT_OPERATIONS = {"create_execute_query"}
+
+# Idempotency key supplied to the current tool call, sent upstream as a header.
+idempotency_key = contextvars.ContextVar("watsonx_data_idempotency_key", default="")
+
+
+def is_read_operation(operation):
+    return operation.startswith(READ_PREFIXES) or operation in READ_OPERATIONS
+
+
+def is_mutation(operation):
+    return operation.startswith(MUTATING_PREFIXES) and operation not in STATEMENT_OPERATIONS
+
+
+def is_retryable(operation, kwargs):
+    """Whether a failed call may be repeated without a key: reads, and statements that only read."""
+    if operation in STATEMENT_OPERATIONS:
+        body = kwargs.get("body")
+        sql = sql_text(body) if isinstance(body, dict) else None
+        return sql is not None and is_read_only(sql)
+    return is_read_operation(operation)
+
+
+def is_transient(error):
+    code = getattr(error, "code", None)
+    if code is not None:
+        return code in RETRYABLE_STATUSES
+    return type(error).__name__ in _CONNECTION_ERRORS
+
+
+def retry_after(error):
+    """Seconds the server asked us to wait, from a Retry-After header, or None."""
+    response = getattr(error, "http_response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, error=None):
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    requested = retry_after(error) if error is not None else None
+    return max(delay, requested) if requested is not None else delay
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Closed until BREAKER_THRESHOLD consecutive transient failures, then open
+    for BREAKER_COOLDOWN seconds; after that one trial call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def before_call(self, operation):
+        """Raise CircuitOpen if the call may not go through; True if it is the half-open trial."""
+        state = self.state
+        if state == "open" or (state == "half_open" and self.trial_in_flight):
+            wait = max(self.cooldown - (time.monotonic() - self.opened_at), 0)
+            raise CircuitOpen(
+                f"watsonx.data '{operation}' is failing; not calling it for another {wait:.0f}s."
+            )
+        if state == "half_open":
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_in_flight or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+    def release_trial(self):
+        """Let another call probe the circuit after a trial ended without an outcome."""
+        self.trial_in_flight = False
+
+
+class Resilience:
+    """Retry policy plus one circuit breaker per watsonx.data operation.
+
+    Reads are retried on transient failures; mutations only when the caller
+    supplied an idempotency key. Every call, retried or not, goes through the
+    operation's breaker so a degraded endpoint fails fast.
+    """
+
+    def __init__(self, attempts=RETRY_ATTEMPTS):
+        self.attempts = attempts
+        self.breakers = {}
+        self.retries = Counter()
+        self.rejected = Counter()
+
+    def breaker(self, operation):
+        breaker = self.breakers.get(operation)
+        if breaker is None:
+            breaker = self.breakers[operation] = CircuitBreaker()
+        return breaker
+
+    async def call(self, operation, attempt_call, retryable):
+        breaker = self.breaker(operation)
+        attempt = 0
+        while True:
+            try:
+                trial = breaker.before_call(operation)
+            except CircuitOpen:
+                self.rejected[operation] += 1
+                raise
+            try:
+                response = await attempt_call()
+            except Exception as e:
+                if not is_transient(e):
+                    # A 4xx means the service answered; only transient failures count against it.
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if not retryable or attempt >= self.attempts or breaker.state == "open":
+                    raise
+                delay = backoff_delay(attempt, e)
+                if delay > RETRY_MAX_DELAY:
+                    raise
+                attempt += 1
+                self.retries[operation] += 1
+                await asyncio.sleep(delay)
+            except BaseException:
+                # Cancelled (a client cancel, a timeout or a cancelled shared flight): the
+                # call says nothing about the service, but a trial must not stay in flight.
+                if trial:
+                    breaker.release_trial()
+                raise
+            else:
+                breaker.record_success()
+                return response
+
+    def stats(self):
+        return {
+            "retries": dict(self.retries),
+            "rejected": dict(self.rejected),
+            "open_circuits": {
+                operation: {"state": breaker.state, "failures": breaker.failures}
+                for operation, breaker in sorted(self.breakers.items())
+                if breaker.state != "closed"
+            },
+        }
@@ -1,45 +1,212 @@
 # server.py
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP, Image
+from mcp.types import EmbeddedResource, ImageContent, TextContent
 from dotenv import load_dotenv
-import json
+import asyncio
 import os
+import time
+from functools import partial
 
-# Import the Watsonx.data SDK module.
-from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
-from ibm_watsonxdata import watsonx_data_v2
-
-# Load environment variables from .env
+# Load environment variables from .env before the modules below read their settings.
 load_dotenv()
 
-api_key = os.getenv("IBM_CLOUD_IAM_APIKEY")
-if not api_key:
-    raise ValueError("IBM_CLOUD_IAM_APIKEY environment variable not set.")
-
-service_url = os.getenv("IBM_CLOUD_IAM_URL")
-if not service_url:
-    raise ValueError("IBM_CLOUD_IAM_URL environment variable not set.")
-
-
-
-# Instantiate the MCP server.
-mcp = FastMCP("WatsonxdataWrapper")
+from bulk_ingest import BULK_ATTEMPTS, BULK_CONCURRENCY, TARGET_JOB_BYTES, bulk_ingest
+from cache import metadata_cache
+from codec import CODEC, dumps, loads
+from conditional import ValidatorCache
+from executor import AsyncClient, run_blocking, run_local
+from ingestion import IngestionTracker, job_ids_in
+from instances import ClientRegistry, current_instance, fan_out, load_instances, scoped_path
+from inventory import ENGINE_SOURCES, engine_ids, inventory_snapshot
+from metrics import instrument, registry, start_exporters
+from pagination import DEFAULT_PAGE_SIZE, paginate
+from persistent_cache import PERSISTENT_CACHE, PersistentCache
+from query_history import (
+    QUERY_HISTORY, QUERY_HISTORY_ANALYZE, QUERY_HISTORY_ANALYZE_MAX_CONCURRENT, QueryHistory, query_engine,
+)
+from query_results import (
+    META_KEY, QUERY_CHUNK_ROWS, QUERY_MAX_ROWS, fetch_next_chunk, query_cache, run_query,
+)
+from resilience import Resilience, idempotency_key, is_mutation, is_read_operation
+from shaping import FAMILY_OF, shape_tool
+from spark import (
+    FAILED_STATES as SPARK_FAILED_STATES, SUCCEEDED_STATES as SPARK_SUCCEEDED_STATES, application_filter,
+    failure_diagnostics, parse_time,
+)
+from sql import fingerprint_sql, is_read_only, sql_text, statement_type
+from tool_params import bind_parameter, use_json_arguments
+from waiters import MAX_WAIT, poll_until
+
+
+# Read tools that report this server's own state instead of calling an instance, so
+# running them once per instance with instance="*" would repeat the same data.
+SERVER_TOOLS = {
+    "get_server_metrics", "get_connection_pool_stats", "get_metadata_cache_stats", "get_token_stats",
+    "get_query_cache_stats",
+}
+
+
+class WatsonxDataMCP(FastMCP):
+    """FastMCP server that records call, latency, error and size metrics for every tool.
+
+    Tools that change state also get an optional idempotency_key argument; when
+    it is given the upstream call is sent with an Idempotency-Key header and
+    transient failures are retried. JSON-encoded arguments and responses go
+    through the configured codec (see codec.py). Tools of the engine, table,
+    column, bucket and job families take fields and compact arguments to
+    shrink their responses (see shaping.py). When several instances are
+    configured, every tool gets an optional instance argument, and read tools
+    that call an instance accept instance="*" to run on all of them concurrently.
+    """
+
+    def add_tool(self, fn, name=None, description=None):
+        tool_name = name or fn.__name__
+        if is_mutation(tool_name):
+            fn = bind_parameter(fn, "idempotency_key", str, "", idempotency_key)
+        if tool_name in FAMILY_OF:
+            fn = shape_tool(fn, tool_name)
+        if clients.multi:
+            if is_read_operation(tool_name) and tool_name not in SERVER_TOOLS:
+                fn = fan_out(fn, clients.names())
+            fn = bind_parameter(fn, "instance", str, "", current_instance)
+        super().add_tool(instrument(fn, name), name=name, description=description)
+        use_json_arguments(self._tool_manager.get_tool(tool_name))
+
+    async def call_tool(self, name, arguments):
+        _, content = await self.run_tool(name, arguments)
+        return content
+
+    async def run_tool(self, name, arguments):
+        """Call a tool and return (result, content), recording the size of its encoded response.
+
+        Both MCP tool calls and batch_execute sub-operations go through here.
+        """
+        result = await self._tool_manager.call_tool(name, arguments, context=self.get_context())
+        content = to_content(result)
+        registry.record_response_size(
+            name, sum(len(item.text) for item in content if isinstance(item, TextContent)),
+        )
+        return result, content
+
+
+def to_content(result):
+    """Content items of a tool result, converted the way FastMCP does it but encoded with the codec.
+
+    A list or tuple becomes one item per element, and a value the codec cannot
+    encode falls back to its str(). Encoding here lets call_tool measure the
+    response size without a second pass.
+    """
+    if result is None:
+        return []
+    if isinstance(result, (TextContent, ImageContent, EmbeddedResource)):
+        return [result]
+    if isinstance(result, Image):
+        return [result.to_image_content()]
+    if isinstance(result, (list, tuple)):
+        return [item for element in result for item in to_content(element)]
+    if not isinstance(result, str):
+        try:
+            result = dumps(result)
+        except Exception:
+            result = str(result)
+    return [TextContent(type="text", text=result)]
+
+
+# Refresh the IAM bearer token in the background instead of on the request path.
+TOKEN_REFRESH = os.getenv("WATSONX_DATA_TOKEN_REFRESH", "true").lower() == "true"
+
+
+def build_client(config):
+    # Import the Watsonx.data SDK module.
+    from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
+    from ibm_watsonxdata import watsonx_data_v2
+    from token_refresh import TokenRefresher
+    from transport import configure_transport
+
+    api_key = config["apikey"]
+    if not api_key:
+        raise ValueError(f"{config['apikey_var']} environment variable not set.")
+
+    service_url = config["url"]
+    if not service_url:
+        raise ValueError(f"{config['url_var']} environment variable not set.")
 
-# Create a global Watsonx.data client instance.
-try:
     authenticator = IAMAuthenticator(api_key)
     # Use the factory or new_instance method if available.
-    client = watsonx_data_v2.WatsonxDataV2(authenticator=authenticator)
-    client.set_service_url(service_url)
-#    client.set_disable_ssl_verification(True)
+    new_client = watsonx_data_v2.WatsonxDataV2(authenticator=authenticator)
+    new_client.set_service_url(service_url)
+    configure_transport(new_client)
+    if TOKEN_REFRESH:
+        new_client.token_refresher = TokenRefresher(authenticator.token_manager).start()
+#    new_client.set_disable_ssl_verification(True)
 #    test = watsonx_data_v2.WatsonxDataV2.new_instance()
 #    test.disable_ssl_verification = True
 #    response = test.list_bucket_registrations()
 #    print(response)
+    return new_client
 
-except Exception as init_error:
-    client = None
-    print(f"Error initializing WatsonxDataV2 client: {init_error}")
+
+# One Watsonx.data client per configured instance, each built on first use, so the
+# server can answer initialize/tools/list without paying for the SDK import or IAM setup.
+clients = ClientRegistry(load_instances(), build_client)
+
+
+def get_client():
+    """Client of the instance the current tool call targets."""
+    return clients.current()
+
+
+# Instantiate the MCP server.
+mcp = WatsonxDataMCP("WatsonxdataWrapper")
+start_exporters()
+
+
+# Tools await SDK calls through this wrapper so they run on the worker pool.
+# Identical reads issued while one is already in flight share its response.
+SINGLE_FLIGHT = os.getenv("WATSONX_DATA_SINGLE_FLIGHT", "true").lower() == "true"
+resilience = Resilience()
+# Optional on-disk cache for slow-changing listings such as catalogs and engines.
+persistent_cache = (
+    PersistentCache(namespace=os.getenv("IBM_CLOUD_IAM_URL", ""), metrics=registry) if PERSISTENT_CACHE else None
+)
+# Validators kept for expired metadata cache entries, for conditional revalidation.
+CONDITIONAL_REQUESTS = os.getenv("WATSONX_DATA_CONDITIONAL_REQUESTS", "true").lower() == "true"
+validator_cache = ValidatorCache() if CONDITIONAL_REQUESTS else None
+aclient = AsyncClient(
+    get_client, cache=metadata_cache, observers=[query_cache], metrics=registry, resilience=resilience,
+    single_flight=SINGLE_FLIGHT, persistent=persistent_cache,
+    validators=validator_cache, scope=clients.scope,
+)
+if persistent_cache is not None:
+    aclient.add_observer(persistent_cache)
+# Local history of query runs behind query_history; it also notes engine, catalog and
+# table writes that can explain a change in query times.
+run_history = QueryHistory(scope=clients.scope) if QUERY_HISTORY else None
+if run_history is not None:
+    aclient.add_observer(run_history)
+# Local full-text index of schema, table and column names behind search_metadata, and
+# the tracker following ingestion jobs submitted through this server; one per instance.
+metadata_indexes = {}
+ingestion_trackers = {}
+
+
+def get_metadata_index():
+    scope = clients.scope()
+    if scope not in metadata_indexes:
+        # Imported on first use, like the SDK, so startup does not pay for it.
+        from metadata_index import INDEX_PATH, MetadataIndex
+
+        metadata_indexes[scope] = MetadataIndex(aclient, path=scoped_path(INDEX_PATH, scope))
+        aclient.add_observer(metadata_indexes[scope])
+    return metadata_indexes[scope]
+
+
+def get_ingestion_tracker():
+    scope = clients.scope()
+    if scope not in ingestion_trackers:
+        ingestion_trackers[scope] = IngestionTracker(aclient.list_ingestion_jobs, aclient.get_ingestion_job)
+    return ingestion_trackers[scope]
 
 
 # =============================================================================
@@ -47,84 +214,86 @@ except Exception as init_error:
 # =============================================================================
 
 @mcp.tool()
-def list_bucket_registrations() -> dict:
+async def list_bucket_registrations() -> dict:
     try:
-        response = client.list_bucket_registrations()
+        response = await aclient.list_bucket_registrations()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_bucket_registration(bucket_reg_data_json: str) -> dict:
+async def create_bucket_registration(bucket_reg_data_json: str) -> dict:
     try:
-        data = json.loads(bucket_reg_data_json)
-        response = client.create_bucket_registration(body=data)
+        data = loads(bucket_reg_data_json)
+        response = await aclient.create_bucket_registration(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_bucket_registration(bucket_reg_id: str) -> dict:
+async def get_bucket_registration(bucket_reg_id: str) -> dict:
     try:
-        response = client.get_bucket_registration(bucket_reg_id=bucket_reg_id)
+        response = await aclient.get_bucket_registration(bucket_reg_id=bucket_reg_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_bucket_registration(bucket_reg_id: str) -> dict:
+async def delete_bucket_registration(bucket_reg_id: str) -> dict:
     try:
-        response = client.delete_bucket_registration(bucket_reg_id=bucket_reg_id)
+        response = await aclient.delete_bucket_registration(bucket_reg_id=bucket_reg_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def update_bucket_registration(bucket_reg_id: str, bucket_reg_data_json: str) -> dict:
+async def update_bucket_registration(bucket_reg_id: str, bucket_reg_data_json: str) -> dict:
     try:
-        data = json.loads(bucket_reg_data_json)
-        response = client.update_bucket_registration(bucket_reg_id=bucket_reg_id, body=data)
+        data = loads(bucket_reg_data_json)
+        response = await aclient.update_bucket_registration(bucket_reg_id=bucket_reg_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_activate_bucket(bucket_reg_id: str) -> dict:
+async def create_activate_bucket(bucket_reg_id: str) -> dict:
     try:
-        response = client.create_activate_bucket(bucket_reg_id=bucket_reg_id)
+        response = await aclient.create_activate_bucket(bucket_reg_id=bucket_reg_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_deactivate_bucket(bucket_reg_id: str) -> dict:
+async def delete_deactivate_bucket(bucket_reg_id: str) -> dict:
     try:
-        response = client.delete_deactivate_bucket(bucket_reg_id=bucket_reg_id)
+        response = await aclient.delete_deactivate_bucket(bucket_reg_id=bucket_reg_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_bucket_objects(bucket_reg_id: str) -> dict:
+async def list_bucket_objects(bucket_reg_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = "", fields: str = "") -> dict:
     try:
-        response = client.list_bucket_objects(bucket_reg_id=bucket_reg_id)
-        return response.get_result()
+        return await paginate(
+            partial(aclient.list_bucket_objects, bucket_reg_id=bucket_reg_id), limit, cursor, fields,
+            listing=("list_bucket_objects", bucket_reg_id),
+        )
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_bucket_object_properties(bucket_reg_id: str, object_path: str) -> dict:
+async def get_bucket_object_properties(bucket_reg_id: str, object_path: str) -> dict:
     try:
-        response = client.get_bucket_object_properties(bucket_reg_id=bucket_reg_id, object_path=object_path)
+        response = await aclient.get_bucket_object_properties(bucket_reg_id=bucket_reg_id, object_path=object_path)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_hdfs_storage(hdfs_data_json: str) -> dict:
+async def create_hdfs_storage(hdfs_data_json: str) -> dict:
     try:
-        data = json.loads(hdfs_data_json)
-        response = client.create_hdfs_storage(body=data)
+        data = loads(hdfs_data_json)
+        response = await aclient.create_hdfs_storage(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
@@ -135,43 +304,43 @@ def create_hdfs_storage(hdfs_data_json: str) -> dict:
 # =============================================================================
 
 @mcp.tool()
-def list_database_registrations() -> dict:
+async def list_database_registrations() -> dict:
     try:
-        response = client.list_database_registrations()
+        response = await aclient.list_database_registrations()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_database_registration(db_reg_data_json: str) -> dict:
+async def create_database_registration(db_reg_data_json: str) -> dict:
     try:
-        data = json.loads(db_reg_data_json)
-        response = client.create_database_registration(body=data)
+        data = loads(db_reg_data_json)
+        response = await aclient.create_database_registration(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_database(database_id: str) -> dict:
+async def get_database(database_id: str) -> dict:
     try:
-        response = client.get_database(database_id=database_id)
+        response = await aclient.get_database(database_id=database_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_database_catalog(catalog_id: str) -> dict:
+async def delete_database_catalog(catalog_id: str) -> dict:
     try:
-        response = client.delete_database_catalog(catalog_id=catalog_id)
+        response = await aclient.delete_database_catalog(catalog_id=catalog_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def update_database(database_id: str, db_data_json: str) -> dict:
+async def update_database(database_id: str, db_data_json: str) -> dict:
     try:
-        data = json.loads(db_data_json)
-        response = client.update_database(database_id=database_id, body=data)
+        data = loads(db_data_json)
+        response = await aclient.update_database(database_id=database_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
@@ -182,43 +351,43 @@ def update_database(database_id: str, db_data_json: str) -> dict:
 # =============================================================================
 
 #@mcp.tool()
-#def list_driver_registration() -> dict:
+#async def list_driver_registration() -> dict:
 #    try:
-#        response = client.list_driver_registration()
+#        response = await aclient.list_driver_registration()
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def create_driver_registration(driver_data_json: str) -> dict:
+#async def create_driver_registration(driver_data_json: str) -> dict:
 #    try:
-#        data = json.loads(driver_data_json)
-#        response = client.create_driver_registration(body=data)
+#        data = loads(driver_data_json)
+#        response = await aclient.create_driver_registration(body=data)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def delete_driver_registration(driver_id: str) -> dict:
+#async def delete_driver_registration(driver_id: str) -> dict:
 #    try:
-#        response = client.delete_driver_registration(driver_id=driver_id)
+#        response = await aclient.delete_driver_registration(driver_id=driver_id)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def delete_driver_engines(driver_id: str) -> dict:
+#async def delete_driver_engines(driver_id: str) -> dict:
 #    try:
-#        response = client.delete_driver_engines(driver_id=driver_id)
+#        response = await aclient.delete_driver_engines(driver_id=driver_id)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def update_driver_engines(driver_id: str, engines_data_json: str) -> dict:
+#async def update_driver_engines(driver_id: str, engines_data_json: str) -> dict:
 #    try:
-#        data = json.loads(engines_data_json)
-#        response = client.update_driver_engines(driver_id=driver_id, body=data)
+#        data = loads(engines_data_json)
+#        response = await aclient.update_driver_engines(driver_id=driver_id, body=data)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
@@ -229,26 +398,26 @@ def update_database(database_id: str, db_data_json: str) -> dict:
 # =============================================================================
 
 #@mcp.tool()
-#def list_other_engines() -> dict:
+#async def list_other_engines() -> dict:
 #    try:
-#        response = client.list_other_engines()
+#        response = await aclient.list_other_engines()
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def create_other_engine(engine_data_json: str) -> dict:
+#async def create_other_engine(engine_data_json: str) -> dict:
 #    try:
-#        data = json.loads(engine_data_json)
-#        response = client.create_other_engine(body=data)
+#        data = loads(engine_data_json)
+#        response = await aclient.create_other_engine(body=data)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def delete_other_engine(engine_id: str) -> dict:
+#async def delete_other_engine(engine_id: str) -> dict:
 #    try:
-#        response = client.delete_other_engine(engine_id=engine_id)
+#        response = await aclient.delete_other_engine(engine_id=engine_id)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
@@ -259,43 +428,43 @@ def update_database(database_id: str, db_data_json: str) -> dict:
 # =============================================================================
 
 #@mcp.tool()
-#def list_all_integrations() -> dict:
+#async def list_all_integrations() -> dict:
 #    try:
-#        response = client.list_all_integrations()
+#        response = await aclient.list_all_integrations()
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def create_integration(integration_data_json: str) -> dict:
+#async def create_integration(integration_data_json: str) -> dict:
 #    try:
-#        data = json.loads(integration_data_json)
-#        response = client.create_integration(body=data)
+#        data = loads(integration_data_json)
+#        response = await aclient.create_integration(body=data)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def get_integrations() -> dict:
+#async def get_integrations() -> dict:
 #    try:
-#        response = client.get_integrations()
+#        response = await aclient.get_integrations()
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def delete_integration(integration_id: str) -> dict:
+#async def delete_integration(integration_id: str) -> dict:
 #    try:
-#        response = client.delete_integration(integration_id=integration_id)
+#        response = await aclient.delete_integration(integration_id=integration_id)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def update_integration(integration_id: str, integration_data_json: str) -> dict:
+#async def update_integration(integration_id: str, integration_data_json: str) -> dict:
 #    try:
-#        data = json.loads(integration_data_json)
-#        response = client.update_integration(integration_id=integration_id, body=data)
+#        data = loads(integration_data_json)
+#        response = await aclient.update_integration(integration_id=integration_id, body=data)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
@@ -306,35 +475,35 @@ def update_database(database_id: str, db_data_json: str) -> dict:
 # =============================================================================
 
 @mcp.tool()
-def list_db2_engines() -> dict:
+async def list_db2_engines() -> dict:
     try:
-        response = client.list_db2_engines()
+        response = await aclient.list_db2_engines()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_db2_engine(db2_data_json: str) -> dict:
+async def create_db2_engine(db2_data_json: str) -> dict:
     try:
-        data = json.loads(db2_data_json)
-        response = client.create_db2_engine(body=data)
+        data = loads(db2_data_json)
+        response = await aclient.create_db2_engine(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_db2_engine(db2_engine_id: str) -> dict:
+async def delete_db2_engine(db2_engine_id: str) -> dict:
     try:
-        response = client.delete_db2_engine(db2_engine_id=db2_engine_id)
+        response = await aclient.delete_db2_engine(db2_engine_id=db2_engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def update_db2_engine(db2_engine_id: str, db2_data_json: str) -> dict:
+async def update_db2_engine(db2_engine_id: str, db2_data_json: str) -> dict:
     try:
-        data = json.loads(db2_data_json)
-        response = client.update_db2_engine(db2_engine_id=db2_engine_id, body=data)
+        data = loads(db2_data_json)
+        response = await aclient.update_db2_engine(db2_engine_id=db2_engine_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
@@ -345,35 +514,35 @@ def update_db2_engine(db2_engine_id: str, db2_data_json: str) -> dict:
 # =============================================================================
 
 #@mcp.tool()
-#def list_netezza_engines() -> dict:
+#async def list_netezza_engines() -> dict:
 #    try:
-#        response = client.list_netezza_engines()
+#        response = await aclient.list_netezza_engines()
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def create_netezza_engine(netezza_data_json: str) -> dict:
+#async def create_netezza_engine(netezza_data_json: str) -> dict:
 #    try:
-#        data = json.loads(netezza_data_json)
-#        response = client.create_netezza_engine(body=data)
+#        data = loads(netezza_data_json)
+#        response = await aclient.create_netezza_engine(body=data)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def delete_netezza_engine(netezza_engine_id: str) -> dict:
+#async def delete_netezza_engine(netezza_engine_id: str) -> dict:
 #    try:
-#        response = client.delete_netezza_engine(netezza_engine_id=netezza_engine_id)
+#        response = await aclient.delete_netezza_engine(netezza_engine_id=netezza_engine_id)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def update_netezza_engine(netezza_engine_id: str, netezza_data_json: str) -> dict:
+#async def update_netezza_engine(netezza_engine_id: str, netezza_data_json: str) -> dict:
 #    try:
-#        data = json.loads(netezza_data_json)
-#        response = client.update_netezza_engine(netezza_engine_id=netezza_engine_id, body=data)
+#        data = loads(netezza_data_json)
+#        response = await aclient.update_netezza_engine(netezza_engine_id=netezza_engine_id, body=data)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
@@ -384,11 +553,141 @@ def update_db2_engine(db2_engine_id: str, db2_data_json: str) -> dict:
 # =============================================================================
 
 @mcp.tool()
-def create_execute_query(query_data_json: str) -> dict:
+async def create_execute_query(query_data_json: str, max_rows: int = QUERY_MAX_ROWS, chunk_rows: int = QUERY_CHUNK_ROWS, use_cache: bool = True) -> dict:
     try:
-        data = json.loads(query_data_json)
-        response = client.create_execute_query(body=data)
-        return response.get_result()
+        data = loads(query_data_json)
+        started, start = time.time(), time.perf_counter()
+        try:
+            result = await run_query(aclient.create_execute_query, data, max_rows, chunk_rows, use_cache, clients.scope())
+        except Exception as e:
+            record_query(data, started, time.perf_counter() - start, error=e)
+            raise
+        record_query(data, started, time.perf_counter() - start, result)
+        return result
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def record_query(body, started, elapsed, result=None, error=None):
+    """Log a query run in the history and, if enabled, explain-analyze it in the background.
+
+    Recording is best effort: it never changes what the tool returns.
+    """
+    try:
+        sql = sql_text(body) if isinstance(body, dict) else None
+        if run_history is None or sql is None:
+            return
+        engine = query_engine(body)
+        fingerprint = run_history.record_run(sql, engine, started, elapsed, result, error)
+        meta = result.get(META_KEY) if isinstance(result, dict) else None
+        fresh = error is None and not (isinstance(meta, dict) and meta.get("cached"))
+        if (QUERY_HISTORY_ANALYZE and fresh and engine and is_read_only(sql)
+                and len(_analysis_tasks) < QUERY_HISTORY_ANALYZE_MAX_CONCURRENT
+                and run_history.should_analyze(fingerprint)):
+            task = asyncio.ensure_future(_analyze_in_background(sql, engine))
+            # The loop only keeps weak references to tasks; hold them until they finish.
+            _analysis_tasks.add(task)
+            task.add_done_callback(_analysis_tasks.discard)
+    except Exception:
+        pass
+
+
+_analysis_tasks = set()
+
+
+async def _analyze_in_background(sql, engine):
+    # EXPLAIN ANALYZE runs the query again, so only on the engine type it ran on, and not at all if that is unknown.
+    try:
+        engine_type = await _explainable_engine_type(engine)
+        if engine_type is not None:
+            await explain_plan(sql, engine, engine_type, analyze=True)
+    except Exception:
+        pass
+
+
+async def _explainable_engine_type(engine):
+    """The engine type in _EXPLAIN_OPERATIONS whose (cached) engine listing includes engine, or None."""
+    for engine_type in _EXPLAIN_OPERATIONS:
+        response = await getattr(aclient, ENGINE_SOURCES[engine_type][0])()
+        if engine in engine_ids(response):
+            return engine_type
+    return None
+
+
+# Engine type -> (EXPLAIN, EXPLAIN ANALYZE) operations.
+_EXPLAIN_OPERATIONS = {
+    "presto": ("run_explain_statement", "run_explain_analyze_statement"),
+    "prestissimo": ("run_prestissimo_explain_statement", "run_prestissimo_explain_analyze_statement"),
+}
+
+
+@mcp.tool()
+async def analyze_query_plan(sql: str, engine: str, engine_type: str = "presto", analyze: bool = True) -> dict:
+    """Explain a query on a Presto/Prestissimo engine and return its operator tree with findings:
+    full scans, filters that did not prune partitions, large broadcast joins, skewed stages and,
+    with analyze=True (EXPLAIN ANALYZE, which runs the query; read-only statements only),
+    CPU and wall-time hotspots."""
+    try:
+        analysis = await explain_plan(sql, engine, engine_type, analyze)
+        return {"engine": engine, "statement_type": statement_type(sql), **analysis}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def explain_plan(sql, engine, engine_type, analyze):
+    operations = _EXPLAIN_OPERATIONS.get(engine_type.lower())
+    if operations is None:
+        raise ValueError(f"engine_type must be one of: {', '.join(_EXPLAIN_OPERATIONS)}.")
+    if analyze and not is_read_only(sql):
+        raise ValueError("EXPLAIN ANALYZE executes the statement; use analyze=False for statements that write.")
+    if analyze:
+        response = await getattr(aclient, operations[1])(engine_id=engine, statement=sql)
+    else:
+        response = await getattr(aclient, operations[0])(engine_id=engine, statement=sql, type="distributed")
+    from query_plans import analyze_plan, plan_text
+
+    analysis = await run_blocking(analyze_plan, plan_text(response.get_result()))
+    if analysis["analyzed"] and run_history is not None:
+        run_history.record_plan(sql, engine, analysis)
+    return analysis
+
+
+_HISTORY_MODES = ("fingerprint", "top_slowest", "regressions")
+
+
+@mcp.tool()
+async def query_history(
+    mode: str = "top_slowest", fingerprint: str = "", sql: str = "", since: str = "7d", limit: int = 20,
+) -> dict:
+    """Performance history of the queries run through create_execute_query.
+
+    mode="fingerprint" shows the runs, timings and EXPLAIN ANALYZE statistics of one
+    query shape (pass its fingerprint, or sql to fingerprint it); "top_slowest" lists
+    the query shapes with the highest average time; "regressions" lists recurring
+    queries whose median time grew, with the engine scaling, catalog sync or table
+    rollback that preceded the change when one was recorded.
+    """
+    try:
+        if run_history is None:
+            raise ValueError("The query history is disabled (WATSONX_DATA_QUERY_HISTORY=false).")
+        if mode not in _HISTORY_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(_HISTORY_MODES)}.")
+        start = parse_time(since)
+        if start is None:
+            raise ValueError(f"Cannot parse since={since!r}; use a duration such as 7d or an ISO-8601 time.")
+        if mode == "fingerprint":
+            if not (fingerprint or sql):
+                raise ValueError('mode="fingerprint" needs fingerprint or sql.')
+            return await run_local(run_history.fingerprint, fingerprint or fingerprint_sql(sql)[0], start, limit)
+        report = run_history.top_slowest if mode == "top_slowest" else run_history.regressions
+        return {mode: await run_local(report, start, limit), "since": start}
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.tool()
+async def fetch_next(result_id: str) -> dict:
+    try:
+        return fetch_next_chunk(result_id)
     except Exception as e:
         return {"error": str(e)}
 
@@ -398,33 +697,33 @@ def create_execute_query(query_data_json: str) -> dict:
 # =============================================================================
 
 @mcp.tool()
-def list_instance_details() -> dict:
+async def list_instance_details() -> dict:
     try:
-        response = client.list_instance_details()
+        response = await aclient.list_instance_details()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_instance_service_details() -> dict:
+async def list_instance_service_details() -> dict:
     try:
-        response = client.list_instance_service_details()
+        response = await aclient.list_instance_service_details()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_services_details() -> dict:
+async def get_services_details() -> dict:
     try:
-        response = client.get_services_details()
+        response = await aclient.get_services_details()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_service_detail(service_id: str) -> dict:
+async def get_service_detail(service_id: str) -> dict:
     try:
-        response = client.get_service_detail(service_id=service_id)
+        response = await aclient.get_service_detail(service_id=service_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
@@ -435,125 +734,125 @@ def get_service_detail(service_id: str) -> dict:
 # =============================================================================
 
 @mcp.tool()
-def list_prestissimo_engines() -> dict:
+async def list_prestissimo_engines() -> dict:
     try:
-        response = client.list_prestissimo_engines()
+        response = await aclient.list_prestissimo_engines()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_prestissimo_engine(engine_data_json: str) -> dict:
+async def create_prestissimo_engine(engine_data_json: str) -> dict:
     try:
-        data = json.loads(engine_data_json)
-        response = client.create_prestissimo_engine(body=data)
+        data = loads(engine_data_json)
+        response = await aclient.create_prestissimo_engine(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_prestissimo_engine(engine_id: str) -> dict:
+async def get_prestissimo_engine(engine_id: str) -> dict:
     try:
-        response = client.get_prestissimo_engine(engine_id=engine_id)
+        response = await aclient.get_prestissimo_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_prestissimo_engine(engine_id: str) -> dict:
+async def delete_prestissimo_engine(engine_id: str) -> dict:
     try:
-        response = client.delete_prestissimo_engine(engine_id=engine_id)
+        response = await aclient.delete_prestissimo_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def update_prestissimo_engine(engine_id: str, engine_data_json: str) -> dict:
+async def update_prestissimo_engine(engine_id: str, engine_data_json: str) -> dict:
     try:
-        data = json.loads(engine_data_json)
-        response = client.update_prestissimo_engine(engine_id=engine_id, body=data)
+        data = loads(engine_data_json)
+        response = await aclient.update_prestissimo_engine(engine_id=engine_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_prestissimo_engine_catalogs(engine_id: str) -> dict:
+async def list_prestissimo_engine_catalogs(engine_id: str) -> dict:
     try:
-        response = client.list_prestissimo_engine_catalogs(engine_id=engine_id)
+        response = await aclient.list_prestissimo_engine_catalogs(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_prestissimo_engine_catalogs(engine_id: str, catalog_data_json: str) -> dict:
+async def create_prestissimo_engine_catalogs(engine_id: str, catalog_data_json: str) -> dict:
     try:
-        data = json.loads(catalog_data_json)
-        response = client.create_prestissimo_engine_catalogs(engine_id=engine_id, body=data)
+        data = loads(catalog_data_json)
+        response = await aclient.create_prestissimo_engine_catalogs(engine_id=engine_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_prestissimo_engine_catalogs(engine_id: str, catalog_id: str) -> dict:
+async def delete_prestissimo_engine_catalogs(engine_id: str, catalog_id: str) -> dict:
     try:
-        response = client.delete_prestissimo_engine_catalogs(engine_id=engine_id, catalog_id=catalog_id)
+        response = await aclient.delete_prestissimo_engine_catalogs(engine_id=engine_id, catalog_id=catalog_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_prestissimo_engine_catalog(engine_id: str, catalog_id: str) -> dict:
+async def get_prestissimo_engine_catalog(engine_id: str, catalog_id: str) -> dict:
     try:
-        response = client.get_prestissimo_engine_catalog(engine_id=engine_id, catalog_id=catalog_id)
+        response = await aclient.get_prestissimo_engine_catalog(engine_id=engine_id, catalog_id=catalog_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def pause_prestissimo_engine(engine_id: str) -> dict:
+async def pause_prestissimo_engine(engine_id: str) -> dict:
     try:
-        response = client.pause_prestissimo_engine(engine_id=engine_id)
+        response = await aclient.pause_prestissimo_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def run_prestissimo_explain_statement(statement: str) -> dict:
+async def run_prestissimo_explain_statement(statement: str) -> dict:
     try:
-        response = client.run_prestissimo_explain_statement(sql_string=statement)
+        response = await aclient.run_prestissimo_explain_statement(sql_string=statement)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def run_prestissimo_explain_analyze_statement(statement: str) -> dict:
+async def run_prestissimo_explain_analyze_statement(statement: str) -> dict:
     try:
-        response = client.run_prestissimo_explain_analyze_statement(sql_string=statement)
+        response = await aclient.run_prestissimo_explain_analyze_statement(sql_string=statement)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def restart_prestissimo_engine(engine_id: str) -> dict:
+async def restart_prestissimo_engine(engine_id: str) -> dict:
     try:
-        response = client.restart_prestissimo_engine(engine_id=engine_id)
+        response = await aclient.restart_prestissimo_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def resume_prestissimo_engine(engine_id: str) -> dict:
+async def resume_prestissimo_engine(engine_id: str) -> dict:
     try:
-        response = client.resume_prestissimo_engine(engine_id=engine_id)
+        response = await aclient.resume_prestissimo_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def scale_prestissimo_engine(engine_id: str, scale_data_json: str) -> dict:
+async def scale_prestissimo_engine(engine_id: str, scale_data_json: str) -> dict:
     try:
-        data = json.loads(scale_data_json)
-        response = client.scale_prestissimo_engine(engine_id=engine_id, body=data)
+        data = loads(scale_data_json)
+        response = await aclient.scale_prestissimo_engine(engine_id=engine_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
@@ -564,125 +863,125 @@ def scale_prestissimo_engine(engine_id: str, scale_data_json: str) -> dict:
 # =============================================================================
 
 @mcp.tool()
-def list_presto_engines() -> dict:
+async def list_presto_engines() -> dict:
     try:
-        response = client.list_presto_engines()
+        response = await aclient.list_presto_engines()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_presto_engine(engine_data_json: str) -> dict:
+async def create_presto_engine(engine_data_json: str) -> dict:
     try:
-        data = json.loads(engine_data_json)
-        response = client.create_presto_engine(body=data)
+        data = loads(engine_data_json)
+        response = await aclient.create_presto_engine(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_presto_engine(engine_id: str) -> dict:
+async def get_presto_engine(engine_id: str) -> dict:
     try:
-        response = client.get_presto_engine(engine_id=engine_id)
+        response = await aclient.get_presto_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_engine(engine_id: str) -> dict:
+async def delete_engine(engine_id: str) -> dict:
     try:
-        response = client.delete_engine(engine_id=engine_id)
+        response = await aclient.delete_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def update_presto_engine(engine_id: str, engine_data_json: str) -> dict:
+async def update_presto_engine(engine_id: str, engine_data_json: str) -> dict:
     try:
-        data = json.loads(engine_data_json)
-        response = client.update_presto_engine(engine_id=engine_id, body=data)
+        data = loads(engine_data_json)
+        response = await aclient.update_presto_engine(engine_id=engine_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_presto_engine_catalogs(engine_id: str) -> dict:
+async def list_presto_engine_catalogs(engine_id: str) -> dict:
     try:
-        response = client.list_presto_engine_catalogs(engine_id=engine_id)
+        response = await aclient.list_presto_engine_catalogs(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_presto_engine_catalogs(engine_id: str, catalog_data_json: str) -> dict:
+async def create_presto_engine_catalogs(engine_id: str, catalog_data_json: str) -> dict:
     try:
-        data = json.loads(catalog_data_json)
-        response = client.create_presto_engine_catalogs(engine_id=engine_id, body=data)
+        data = loads(catalog_data_json)
+        response = await aclient.create_presto_engine_catalogs(engine_id=engine_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_presto_engine_catalogs(engine_id: str, catalog_id: str) -> dict:
+async def delete_presto_engine_catalogs(engine_id: str, catalog_id: str) -> dict:
     try:
-        response = client.delete_presto_engine_catalogs(engine_id=engine_id, catalog_id=catalog_id)
+        response = await aclient.delete_presto_engine_catalogs(engine_id=engine_id, catalog_id=catalog_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_presto_engine_catalog(engine_id: str, catalog_id: str) -> dict:
+async def get_presto_engine_catalog(engine_id: str, catalog_id: str) -> dict:
     try:
-        response = client.get_presto_engine_catalog(engine_id=engine_id, catalog_id=catalog_id)
+        response = await aclient.get_presto_engine_catalog(engine_id=engine_id, catalog_id=catalog_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def pause_presto_engine(engine_id: str) -> dict:
+async def pause_presto_engine(engine_id: str) -> dict:
     try:
-        response = client.pause_presto_engine(engine_id=engine_id)
+        response = await aclient.pause_presto_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def run_explain_statement(query_string: str) -> dict:
+async def run_explain_statement(query_string: str) -> dict:
     try:
-        response = client.run_explain_statement(sql_string=query_string)
+        response = await aclient.run_explain_statement(sql_string=query_string)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def run_explain_analyze_statement(query_string: str) -> dict:
+async def run_explain_analyze_statement(query_string: str) -> dict:
     try:
-        response = client.run_explain_analyze_statement(sql_string=query_string)
+        response = await aclient.run_explain_analyze_statement(sql_string=query_string)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def restart_presto_engine(engine_id: str) -> dict:
+async def restart_presto_engine(engine_id: str) -> dict:
     try:
-        response = client.restart_presto_engine(engine_id=engine_id)
+        response = await aclient.restart_presto_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def resume_presto_engine(engine_id: str) -> dict:
+async def resume_presto_engine(engine_id: str) -> dict:
     try:
-        response = client.resume_presto_engine(engine_id=engine_id)
+        response = await aclient.resume_presto_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def scale_presto_engine(engine_id: str, scale_data_json: str) -> dict:
+async def scale_presto_engine(engine_id: str, scale_data_json: str) -> dict:
     try:
-        data = json.loads(scale_data_json)
-        response = client.scale_presto_engine(engine_id=engine_id, body=data)
+        data = loads(scale_data_json)
+        response = await aclient.scale_presto_engine(engine_id=engine_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
@@ -693,151 +992,151 @@ def scale_presto_engine(engine_id: str, scale_data_json: str) -> dict:
 # =============================================================================
 
 @mcp.tool()
-def get_sal_integration() -> dict:
+async def get_sal_integration() -> dict:
     try:
-        response = client.get_sal_integration()
+        response = await aclient.get_sal_integration()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_sal_integration(sal_data_json: str) -> dict:
+async def create_sal_integration(sal_data_json: str) -> dict:
     try:
-        data = json.loads(sal_data_json)
-        response = client.create_sal_integration(body=data)
+        data = loads(sal_data_json)
+        response = await aclient.create_sal_integration(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_sal_integration(integration_id: str) -> dict:
+async def delete_sal_integration(integration_id: str) -> dict:
     try:
-        response = client.delete_sal_integration(integration_id=integration_id)
+        response = await aclient.delete_sal_integration(integration_id=integration_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def update_sal_integration(integration_id: str, sal_data_json: str) -> dict:
+async def update_sal_integration(integration_id: str, sal_data_json: str) -> dict:
     try:
-        data = json.loads(sal_data_json)
-        response = client.update_sal_integration(integration_id=integration_id, body=data)
+        data = loads(sal_data_json)
+        response = await aclient.update_sal_integration(integration_id=integration_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_sal_integration_enrichment(enrichment_data_json: str) -> dict:
+async def create_sal_integration_enrichment(enrichment_data_json: str) -> dict:
     try:
-        data = json.loads(enrichment_data_json)
-        response = client.create_sal_integration_enrichment(body=data)
+        data = loads(enrichment_data_json)
+        response = await aclient.create_sal_integration_enrichment(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_sal_integration_enrichment_assets() -> dict:
+async def get_sal_integration_enrichment_assets() -> dict:
     try:
-        response = client.get_sal_integration_enrichment_assets()
+        response = await aclient.get_sal_integration_enrichment_assets()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_sal_integration_enrichment_data_asset() -> dict:
+async def get_sal_integration_enrichment_data_asset() -> dict:
     try:
-        response = client.get_sal_integration_enrichment_data_asset()
+        response = await aclient.get_sal_integration_enrichment_data_asset()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_sal_integration_enrichment_job_run_logs(job_id: str) -> dict:
+async def get_sal_integration_enrichment_job_run_logs(job_id: str) -> dict:
     try:
-        response = client.get_sal_integration_enrichment_job_run_logs(job_id=job_id)
+        response = await aclient.get_sal_integration_enrichment_job_run_logs(job_id=job_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_sal_integration_enrichment_job_runs(job_id: str) -> dict:
+async def get_sal_integration_enrichment_job_runs(job_id: str) -> dict:
     try:
-        response = client.get_sal_integration_enrichment_job_runs(job_id=job_id)
+        response = await aclient.get_sal_integration_enrichment_job_runs(job_id=job_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_sal_integration_enrichment_jobs() -> dict:
+async def get_sal_integration_enrichment_jobs() -> dict:
     try:
-        response = client.get_sal_integration_enrichment_jobs()
+        response = await aclient.get_sal_integration_enrichment_jobs()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_sal_integration_glossary_terms() -> dict:
+async def get_sal_integration_glossary_terms() -> dict:
     try:
-        response = client.get_sal_integration_glossary_terms()
+        response = await aclient.get_sal_integration_glossary_terms()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_sal_integration_mappings() -> dict:
+async def get_sal_integration_mappings() -> dict:
     try:
-        response = client.get_sal_integration_mappings()
+        response = await aclient.get_sal_integration_mappings()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_sal_integration_enrichment_global_settings() -> dict:
+async def get_sal_integration_enrichment_global_settings() -> dict:
     try:
-        response = client.get_sal_integration_enrichment_global_settings()
+        response = await aclient.get_sal_integration_enrichment_global_settings()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_sal_integration_enrichment_global_settings(settings_json: str) -> dict:
+async def create_sal_integration_enrichment_global_settings(settings_json: str) -> dict:
     try:
-        data = json.loads(settings_json)
-        response = client.create_sal_integration_enrichment_global_settings(body=data)
+        data = loads(settings_json)
+        response = await aclient.create_sal_integration_enrichment_global_settings(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_sal_integration_enrichment_settings() -> dict:
+async def get_sal_integration_enrichment_settings() -> dict:
     try:
-        response = client.get_sal_integration_enrichment_settings()
+        response = await aclient.get_sal_integration_enrichment_settings()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_sal_integration_enrichment_settings(settings_json: str) -> dict:
+async def create_sal_integration_enrichment_settings(settings_json: str) -> dict:
     try:
-        data = json.loads(settings_json)
-        response = client.create_sal_integration_enrichment_settings(body=data)
+        data = loads(settings_json)
+        response = await aclient.create_sal_integration_enrichment_settings(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_sal_integration_upload_glossary(glossary_json: str) -> dict:
+async def create_sal_integration_upload_glossary(glossary_json: str) -> dict:
     try:
-        data = json.loads(glossary_json)
-        response = client.create_sal_integration_upload_glossary(body=data)
+        data = loads(glossary_json)
+        response = await aclient.create_sal_integration_upload_glossary(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_sal_integration_upload_glossary_status(process_id: str) -> dict:
+async def get_sal_integration_upload_glossary_status(process_id: str) -> dict:
     try:
-        response = client.get_sal_integration_upload_glossary_status(process_id=process_id)
+        response = await aclient.get_sal_integration_upload_glossary_status(process_id=process_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
@@ -848,166 +1147,179 @@ def get_sal_integration_upload_glossary_status(process_id: str) -> dict:
 # =============================================================================
 
 @mcp.tool()
-def list_spark_engines() -> dict:
+async def list_spark_engines() -> dict:
     try:
-        response = client.list_spark_engines()
+        response = await aclient.list_spark_engines()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_spark_engine(spark_data_json: str) -> dict:
+async def create_spark_engine(spark_data_json: str) -> dict:
     try:
-        data = json.loads(spark_data_json)
-        response = client.create_spark_engine(body=data)
+        data = loads(spark_data_json)
+        response = await aclient.create_spark_engine(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_spark_engine(engine_id: str) -> dict:
+async def get_spark_engine(engine_id: str) -> dict:
     try:
-        response = client.get_spark_engine(engine_id=engine_id)
+        response = await aclient.get_spark_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_spark_engine(engine_id: str) -> dict:
+async def delete_spark_engine(engine_id: str) -> dict:
     try:
-        response = client.delete_spark_engine(engine_id=engine_id)
+        response = await aclient.delete_spark_engine(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def update_spark_engine(engine_id: str, spark_data_json: str) -> dict:
+async def update_spark_engine(engine_id: str, spark_data_json: str) -> dict:
     try:
-        data = json.loads(spark_data_json)
-        response = client.update_spark_engine(engine_id=engine_id, body=data)
+        data = loads(spark_data_json)
+        response = await aclient.update_spark_engine(engine_id=engine_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_spark_engine_applications() -> dict:
+async def list_spark_engine_applications(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str = "",
+    fields: str = "",
+    state: str = "",
+    submitted_after: str = "",
+    submitted_before: str = "",
+) -> dict:
+    """state is a comma-separated list (e.g. "failed,killed"). submitted_after/before take
+    ISO-8601, epoch seconds, or a duration such as "24h" meaning that long ago. Filters
+    apply to the first page; pass the cursor with the same filters for later pages."""
     try:
-        response = client.list_spark_engine_applications()
-        return response.get_result()
+        keep = application_filter(state, submitted_after, submitted_before)
+        return await paginate(
+            aclient.list_spark_engine_applications, limit, cursor, fields, keep,
+            listing=("list_spark_engine_applications", state, submitted_after, submitted_before),
+        )
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_spark_engine_application(application_data_json: str) -> dict:
+async def create_spark_engine_application(application_data_json: str) -> dict:
     try:
-        data = json.loads(application_data_json)
-        response = client.create_spark_engine_application(body=data)
+        data = loads(application_data_json)
+        response = await aclient.create_spark_engine_application(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_spark_engine_applications(app_id: str) -> dict:
+async def delete_spark_engine_applications(app_id: str) -> dict:
     try:
-        response = client.delete_spark_engine_applications(app_id=app_id)
+        response = await aclient.delete_spark_engine_applications(app_id=app_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_spark_engine_application_status(app_id: str) -> dict:
+async def get_spark_engine_application_status(app_id: str) -> dict:
     try:
-        response = client.get_spark_engine_application_status(app_id=app_id)
+        response = await aclient.get_spark_engine_application_status(app_id=app_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_spark_engine_catalogs(engine_id: str) -> dict:
+async def list_spark_engine_catalogs(engine_id: str) -> dict:
     try:
-        response = client.list_spark_engine_catalogs(engine_id=engine_id)
+        response = await aclient.list_spark_engine_catalogs(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_spark_engine_catalogs(engine_id: str, catalog_data_json: str) -> dict:
+async def create_spark_engine_catalogs(engine_id: str, catalog_data_json: str) -> dict:
     try:
-        data = json.loads(catalog_data_json)
-        response = client.create_spark_engine_catalogs(engine_id=engine_id, body=data)
+        data = loads(catalog_data_json)
+        response = await aclient.create_spark_engine_catalogs(engine_id=engine_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_spark_engine_catalogs(engine_id: str, catalog_id: str) -> dict:
+async def delete_spark_engine_catalogs(engine_id: str, catalog_id: str) -> dict:
     try:
-        response = client.delete_spark_engine_catalogs(engine_id=engine_id, catalog_id=catalog_id)
+        response = await aclient.delete_spark_engine_catalogs(engine_id=engine_id, catalog_id=catalog_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_spark_engine_catalog(engine_id: str, catalog_id: str) -> dict:
+async def get_spark_engine_catalog(engine_id: str, catalog_id: str) -> dict:
     try:
-        response = client.get_spark_engine_catalog(engine_id=engine_id, catalog_id=catalog_id)
+        response = await aclient.get_spark_engine_catalog(engine_id=engine_id, catalog_id=catalog_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_spark_engine_history_server(engine_id: str) -> dict:
+async def get_spark_engine_history_server(engine_id: str) -> dict:
     try:
-        response = client.get_spark_engine_history_server(engine_id=engine_id)
+        response = await aclient.get_spark_engine_history_server(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def start_spark_engine_history_server(engine_id: str) -> dict:
+async def start_spark_engine_history_server(engine_id: str) -> dict:
     try:
-        response = client.start_spark_engine_history_server(engine_id=engine_id)
+        response = await aclient.start_spark_engine_history_server(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_spark_engine_history_server(engine_id: str) -> dict:
+async def delete_spark_engine_history_server(engine_id: str) -> dict:
     try:
-        response = client.delete_spark_engine_history_server(engine_id=engine_id)
+        response = await aclient.delete_spark_engine_history_server(engine_id=engine_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def pause_spark_engine() -> dict:
+async def pause_spark_engine() -> dict:
     try:
-        response = client.pause_spark_engine()
+        response = await aclient.pause_spark_engine()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def resume_spark_engine() -> dict:
+async def resume_spark_engine() -> dict:
     try:
-        response = client.resume_spark_engine()
+        response = await aclient.resume_spark_engine()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def scale_spark_engine(engine_id: str, scale_data_json: str) -> dict:
+async def scale_spark_engine(engine_id: str, scale_data_json: str) -> dict:
     try:
-        data = json.loads(scale_data_json)
-        response = client.scale_spark_engine(engine_id=engine_id, body=data)
+        data = loads(scale_data_json)
+        response = await aclient.scale_spark_engine(engine_id=engine_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_spark_versions() -> dict:
+async def list_spark_versions() -> dict:
     try:
-        response = client.list_spark_versions()
+        response = await aclient.list_spark_versions()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
@@ -1018,134 +1330,134 @@ def list_spark_versions() -> dict:
 # =============================================================================
 
 @mcp.tool()
-def list_catalogs() -> dict:
+async def list_catalogs() -> dict:
     try:
-        response = client.list_catalogs()
+        response = await aclient.list_catalogs()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_catalog(catalog_id: str) -> dict:
+async def get_catalog(catalog_id: str) -> dict:
     try:
-        response = client.get_catalog(catalog_id=catalog_id)
+        response = await aclient.get_catalog(catalog_id=catalog_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_schemas() -> dict:
+async def list_schemas() -> dict:
     try:
-        response = client.list_schemas()
+        response = await aclient.list_schemas()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_schema(schema_data_json: str) -> dict:
+async def create_schema(schema_data_json: str) -> dict:
     try:
-        data = json.loads(schema_data_json)
-        response = client.create_schema(body=data)
+        data = loads(schema_data_json)
+        response = await aclient.create_schema(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_schema(schema_id: str) -> dict:
+async def delete_schema(schema_id: str) -> dict:
     try:
-        response = client.delete_schema(schema_id=schema_id)
+        response = await aclient.delete_schema(schema_id=schema_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_tables() -> dict:
+async def list_tables() -> dict:
     try:
-        response = client.list_tables()
+        response = await aclient.list_tables()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_table(table_id: str) -> dict:
+async def get_table(table_id: str) -> dict:
     try:
-        response = client.get_table(table_id=table_id)
+        response = await aclient.get_table(table_id=table_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_table(table_id: str) -> dict:
+async def delete_table(table_id: str) -> dict:
     try:
-        response = client.delete_table(table_id=table_id)
+        response = await aclient.delete_table(table_id=table_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def update_table(table_id: str, table_data_json: str) -> dict:
+async def update_table(table_id: str, table_data_json: str) -> dict:
     try:
-        data = json.loads(table_data_json)
-        response = client.update_table(table_id=table_id, body=data)
+        data = loads(table_data_json)
+        response = await aclient.update_table(table_id=table_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_columns(table_id: str) -> dict:
+async def list_columns(table_id: str) -> dict:
     try:
-        response = client.list_columns(table_id=table_id)
+        response = await aclient.list_columns(table_id=table_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_columns(table_id: str, columns_data_json: str) -> dict:
+async def create_columns(table_id: str, columns_data_json: str) -> dict:
     try:
-        data = json.loads(columns_data_json)
-        response = client.create_columns(table_id=table_id, body=data)
+        data = loads(columns_data_json)
+        response = await aclient.create_columns(table_id=table_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_column(table_id: str, column_id: str) -> dict:
+async def delete_column(table_id: str, column_id: str) -> dict:
     try:
-        response = client.delete_column(table_id=table_id, column_id=column_id)
+        response = await aclient.delete_column(table_id=table_id, column_id=column_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def update_column(table_id: str, column_id: str, column_data_json: str) -> dict:
+async def update_column(table_id: str, column_id: str, column_data_json: str) -> dict:
     try:
-        data = json.loads(column_data_json)
-        response = client.update_column(table_id=table_id, column_id=column_id, body=data)
+        data = loads(column_data_json)
+        response = await aclient.update_column(table_id=table_id, column_id=column_id, body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_table_snapshots(table_id: str) -> dict:
+async def list_table_snapshots(table_id: str) -> dict:
     try:
-        response = client.list_table_snapshots(table_id=table_id)
+        response = await aclient.list_table_snapshots(table_id=table_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def rollback_table(table_id: str, snapshot_id: str) -> dict:
+async def rollback_table(table_id: str, snapshot_id: str) -> dict:
     try:
-        response = client.rollback_table(table_id=table_id, snapshot_id=snapshot_id)
+        response = await aclient.rollback_table(table_id=table_id, snapshot_id=snapshot_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def update_sync_catalog(sync_data_json: str) -> dict:
+async def update_sync_catalog(sync_data_json: str) -> dict:
     try:
-        data = json.loads(sync_data_json)
-        response = client.update_sync_catalog(body=data)
+        data = loads(sync_data_json)
+        response = await aclient.update_sync_catalog(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
@@ -1156,93 +1468,93 @@ def update_sync_catalog(sync_data_json: str) -> dict:
 # =============================================================================
 
 #@mcp.tool()
-#def list_milvus_services() -> dict:
+#async def list_milvus_services() -> dict:
 #    try:
-#        response = client.list_milvus_services()
+#        response = await aclient.list_milvus_services()
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def create_milvus_service(milvus_data_json: str) -> dict:
+#async def create_milvus_service(milvus_data_json: str) -> dict:
 #    try:
-#        data = json.loads(milvus_data_json)
-#        response = client.create_milvus_service(body=data)
+#        data = loads(milvus_data_json)
+#        response = await aclient.create_milvus_service(body=data)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def get_milvus_service(service_id: str) -> dict:
+#async def get_milvus_service(service_id: str) -> dict:
 #    try:
-#        response = client.get_milvus_service(service_id=service_id)
+#        response = await aclient.get_milvus_service(service_id=service_id)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def delete_milvus_service(service_id: str) -> dict:
+#async def delete_milvus_service(service_id: str) -> dict:
 #    try:
-#        response = client.delete_milvus_service(service_id=service_id)
+#        response = await aclient.delete_milvus_service(service_id=service_id)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def update_milvus_service(service_id: str, milvus_data_json: str) -> dict:
+#async def update_milvus_service(service_id: str, milvus_data_json: str) -> dict:
 #    try:
-#        data = json.loads(milvus_data_json)
-#        response = client.update_milvus_service(service_id=service_id, body=data)
+#        data = loads(milvus_data_json)
+#        response = await aclient.update_milvus_service(service_id=service_id, body=data)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def update_milvus_service_bucket(service_id: str, bucket_data_json: str) -> dict:
+#async def update_milvus_service_bucket(service_id: str, bucket_data_json: str) -> dict:
 #    try:
-#        data = json.loads(bucket_data_json)
-#        response = client.update_milvus_service_bucket(service_id=service_id, body=data)
+#        data = loads(bucket_data_json)
+#        response = await aclient.update_milvus_service_bucket(service_id=service_id, body=data)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def list_milvus_service_databases(service_id: str) -> dict:
+#async def list_milvus_service_databases(service_id: str) -> dict:
 #    try:
-#        response = client.list_milvus_service_databases(service_id=service_id)
+#        response = await aclient.list_milvus_service_databases(service_id=service_id)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def list_milvus_database_collections(database_id: str) -> dict:
+#async def list_milvus_database_collections(database_id: str) -> dict:
 #    try:
-#        response = client.list_milvus_database_collections(database_id=database_id)
+#        response = await aclient.list_milvus_database_collections(database_id=database_id)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def create_milvus_service_pause(service_id: str) -> dict:
+#async def create_milvus_service_pause(service_id: str) -> dict:
 #    try:
-#        response = client.create_milvus_service_pause(service_id=service_id)
+#        response = await aclient.create_milvus_service_pause(service_id=service_id)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def create_milvus_service_resume(service_id: str) -> dict:
+#async def create_milvus_service_resume(service_id: str) -> dict:
 #    try:
-#        response = client.create_milvus_service_resume(service_id=service_id)
+#        response = await aclient.create_milvus_service_resume(service_id=service_id)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
 #
 #@mcp.tool()
-#def create_milvus_service_scale(service_id: str, scale_data_json: str) -> dict:
+#async def create_milvus_service_scale(service_id: str, scale_data_json: str) -> dict:
 #    try:
-#        data = json.loads(scale_data_json)
-#        response = client.create_milvus_service_scale(service_id=service_id, body=data)
+#        data = loads(scale_data_json)
+#        response = await aclient.create_milvus_service_scale(service_id=service_id, body=data)
 #        return response.get_result()
 #    except Exception as e:
 #        return {"error": str(e)}
@@ -1253,110 +1565,368 @@ def update_sync_catalog(sync_data_json: str) -> dict:
 # =============================================================================
 
 @mcp.tool()
-def list_ingestion_jobs() -> dict:
+async def list_ingestion_jobs(limit: int = DEFAULT_PAGE_SIZE, cursor: str = "", fields: str = "") -> dict:
     try:
-        response = client.list_ingestion_jobs()
-        return response.get_result()
+        return await paginate(aclient.list_ingestion_jobs, limit, cursor, fields, listing=("list_ingestion_jobs",))
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_ingestion_jobs(ingestion_data_json: str) -> dict:
+async def create_ingestion_jobs(ingestion_data_json: str) -> dict:
     try:
-        data = json.loads(ingestion_data_json)
-        response = client.create_ingestion_jobs(body=data)
-        return response.get_result()
+        data = loads(ingestion_data_json)
+        response = await aclient.create_ingestion_jobs(body=data)
+        result = response.get_result()
+        get_ingestion_tracker().register(job_ids_in(result))
+        return result
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_ingestion_jobs_local_files(ingestion_data_json: str) -> dict:
+async def create_ingestion_jobs_local_files(ingestion_data_json: str) -> dict:
     try:
-        data = json.loads(ingestion_data_json)
-        response = client.create_ingestion_jobs_local_files(body=data)
-        return response.get_result()
+        data = loads(ingestion_data_json)
+        response = await aclient.create_ingestion_jobs_local_files(body=data)
+        result = response.get_result()
+        get_ingestion_tracker().register(job_ids_in(result))
+        return result
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_ingestion_job(job_id: str) -> dict:
+async def get_ingestion_job(job_id: str) -> dict:
     try:
-        response = client.get_ingestion_job(job_id=job_id)
+        response = await aclient.get_ingestion_job(job_id=job_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def delete_ingestion_jobs(job_id: str) -> dict:
+async def delete_ingestion_jobs(job_id: str) -> dict:
     try:
-        response = client.delete_ingestion_jobs(job_id=job_id)
+        response = await aclient.delete_ingestion_jobs(job_id=job_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def create_preview_ingestion_file(preview_data_json: str) -> dict:
+async def create_preview_ingestion_file(preview_data_json: str) -> dict:
     try:
-        data = json.loads(preview_data_json)
-        response = client.create_preview_ingestion_file(body=data)
+        data = loads(preview_data_json)
+        response = await aclient.create_preview_ingestion_file(body=data)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
+@mcp.tool()
+async def bulk_ingest_local_files(
+    path: str,
+    ingestion_template_json: str,
+    target_job_bytes: int = TARGET_JOB_BYTES,
+    max_concurrency: int = BULK_CONCURRENCY,
+    max_attempts: int = BULK_ATTEMPTS,
+    timeout: float = 3600,
+    ctx: Context = None,
+) -> dict:
+    """Ingest every Parquet/CSV/JSON/ORC/Avro file in a local directory, or matching a glob.
+    Files are packed into jobs of about target_job_bytes; each job is the template (target
+    table, engine, etc.) plus its job_id, source_data_files and source_file_type. Failed
+    jobs are resubmitted up to max_attempts times in total. timeout=0 only submits."""
+    try:
+        template = loads(ingestion_template_json)
+        return await bulk_ingest(
+            aclient.create_ingestion_jobs_local_files, get_ingestion_tracker(), path, template,
+            max(1, target_job_bytes), max_concurrency, max(1, max_attempts), max(0.0, min(timeout, MAX_WAIT)), ctx,
+        )
+    except Exception as e:
+        return {"error": str(e)}
+
 
 # =============================================================================
 # Miscellaneous Operations
 # =============================================================================
 
 @mcp.tool()
-def get_endpoints() -> dict:
+async def get_endpoints() -> dict:
     try:
-        response = client.get_endpoints()
+        response = await aclient.get_endpoints()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_all_columns() -> dict:
+async def get_all_columns(limit: int = DEFAULT_PAGE_SIZE, cursor: str = "", fields: str = "") -> dict:
     try:
-        response = client.get_all_columns()
-        return response.get_result()
+        return await paginate(aclient.get_all_columns, limit, cursor, fields, listing=("get_all_columns",))
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_all_schemas() -> dict:
+async def list_all_schemas() -> dict:
     try:
-        response = client.list_all_schemas()
+        response = await aclient.list_all_schemas()
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_schema_details_alt(schema_id: str) -> dict:
+async def get_schema_details_alt(schema_id: str) -> dict:
     try:
-        response = client.get_schema_details(schema_id=schema_id)
+        response = await aclient.get_schema_details(schema_id=schema_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def list_all_tables() -> dict:
+async def list_all_tables(limit: int = DEFAULT_PAGE_SIZE, cursor: str = "", fields: str = "") -> dict:
     try:
-        response = client.list_all_tables()
-        return response.get_result()
+        return await paginate(aclient.list_all_tables, limit, cursor, fields, listing=("list_all_tables",))
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_table_details_alt(table_id: str) -> dict:
+async def search_metadata(query: str, kind: str = "", limit: int = 20, refresh: bool = False) -> dict:
+    """Find schemas, tables or columns by name from a local index instead of listing them.
+    kind is schema, table or column (default all). Results are ranked exact, prefix,
+    substring, token (also matching catalog/schema/table path and comments), then fuzzy."""
     try:
-        response = client.get_table_details(table_id=table_id)
+        return await get_metadata_index().search(query, kind, limit, refresh)
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.tool()
+async def get_table_details_alt(table_id: str) -> dict:
+    try:
+        response = await aclient.get_table_details(table_id=table_id)
         return response.get_result()
     except Exception as e:
         return {"error": str(e)}
 
 
+# =============================================================================
+# Long-Running Operation Waiters
+# =============================================================================
+
+_ENGINE_GETTERS = {
+    "presto": "get_presto_engine",
+    "prestissimo": "get_prestissimo_engine",
+    "spark": "get_spark_engine",
+}
+
+
+@mcp.tool()
+async def wait_for_engine_state(
+    engine_id: str, target_state: str, timeout: float = 600, engine_type: str = "presto", ctx: Context = None,
+) -> dict:
+    """Poll an engine server-side until its status is target_state (e.g. "running" or
+    "paused"), it fails, or timeout seconds pass. engine_type is presto, prestissimo
+    or spark. State changes are sent as log notifications and elapsed time as progress."""
+    try:
+        getter = _ENGINE_GETTERS.get(engine_type.lower())
+        if getter is None:
+            raise ValueError(f"engine_type must be one of: {', '.join(_ENGINE_GETTERS)}.")
+        fetch = partial(getattr(aclient, getter), engine_id=engine_id)
+
+        async def fetch_result():
+            return (await fetch()).get_result()
+
+        return await poll_until(fetch_result, [target_state], timeout, ctx, label=f"Engine {engine_id}")
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+async def wait_for_spark_application(app_id: str, timeout: float = 1800, ctx: Context = None) -> dict:
+    """Poll a Spark application server-side until it finishes, fails or timeout seconds
+    pass. State changes are sent as log notifications. If it fails, "diagnostics" holds
+    the return code and the last state details, trimmed to a bounded size."""
+    try:
+        async def fetch_status():
+            return (await aclient.get_spark_engine_application_status(app_id=app_id)).get_result()
+
+        outcome = await poll_until(
+            fetch_status, SPARK_SUCCEEDED_STATES, timeout, ctx,
+            label=f"Spark application {app_id}", terminal=SPARK_FAILED_STATES,
+        )
+        if outcome["failed"]:
+            outcome["diagnostics"] = failure_diagnostics(outcome["result"])
+        return outcome
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+async def wait_for_ingestion_jobs(job_ids: list[str], timeout: float = 1800, ctx: Context = None) -> dict:
+    """Wait server-side until all the given ingestion jobs finish or timeout seconds pass.
+    Jobs are polled together in one background loop; progress is the number of finished
+    jobs. Returns each job's state plus aggregate rows/bytes per second where reported."""
+    try:
+        if not job_ids:
+            raise ValueError("job_ids must not be empty.")
+        return await get_ingestion_tracker().wait(list(dict.fromkeys(job_ids)), max(0.0, min(timeout, MAX_WAIT)), ctx)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# =============================================================================
+# Inventory
+# =============================================================================
+
+@mcp.tool()
+async def get_inventory_snapshot(include_catalogs: bool = True) -> dict:
+    """Every engine (Presto, Prestissimo, Spark, Db2), bucket and database registration and
+    catalog in one compact document, fetched concurrently. Engines list the catalogs they
+    serve, and catalogs the engines, buckets and databases behind them. include_catalogs=False
+    skips the per-engine catalog lookups. Failed listings are reported under "errors"."""
+    try:
+        return await inventory_snapshot(aclient, include_catalogs)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# =============================================================================
+# Batch Operations
+# =============================================================================
+
+# Tools run at the same time within one batch_execute call, and the most items it accepts.
+BATCH_CONCURRENCY = int(os.getenv("WATSONX_DATA_BATCH_CONCURRENCY", "8"))
+BATCH_MAX_ITEMS = int(os.getenv("WATSONX_DATA_BATCH_MAX_ITEMS", "200"))
+
+
+async def _run_batch_item(semaphore, item):
+    name = item.get("tool") if isinstance(item, dict) else None
+    try:
+        if not name:
+            raise ValueError("Each batch item needs a 'tool' name.")
+        if name == "batch_execute":
+            raise ValueError("batch_execute cannot be nested.")
+        args = dict(item.get("args") or {})
+        if clients.multi:
+            # A sub-operation's own instance argument would otherwise default to the
+            # default instance; it targets the batch's instance unless it names one.
+            args.setdefault("instance", current_instance.get())
+        async with semaphore:
+            result, _ = await mcp.run_tool(name, args)
+        return {"tool": name, "result": result}
+    except Exception as e:
+        return {"tool": name, "error": str(e)}
+
+
+@mcp.tool()
+async def batch_execute(operations: list[dict], max_concurrency: int = BATCH_CONCURRENCY) -> dict:
+    """Run several tools concurrently. Each operation is {"tool": <name>, "args": {...}};
+    results are returned in the same order, each with either "result" or "error".
+    Operations run on the batch's instance unless their args name another one."""
+    try:
+        if len(operations) > BATCH_MAX_ITEMS:
+            raise ValueError(f"A batch may contain at most {BATCH_MAX_ITEMS} operations.")
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        results = await asyncio.gather(*(_run_batch_item(semaphore, item) for item in operations))
+        errors = sum(
+            1 for entry in results
+            if "error" in entry or (isinstance(entry["result"], dict) and "error" in entry["result"])
+        )
+        return {"results": results, "count": len(results), "errors": errors}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# =============================================================================
+# Server Diagnostics
+# =============================================================================
+
+@mcp.tool()
+async def get_server_metrics(format: str = "json") -> dict:
+    """Per-tool call counts, latency percentiles, error classes and response sizes, plus
+    upstream HTTP statuses per watsonx.data operation. format="prometheus" returns the
+    Prometheus text exposition instead."""
+    try:
+        if format == "prometheus":
+            return {"text": registry.prometheus()}
+        snapshot = _metrics_section(registry.snapshot)
+        metrics = {"tools": snapshot} if "error" in snapshot else snapshot
+        metrics["metadata_cache"] = _metrics_section(metadata_cache.stats)
+        metrics["query_cache"] = _metrics_section(query_cache.stats)
+        metrics["resilience"] = _metrics_section(resilience.stats)
+        metrics["json_codec"] = CODEC
+        if clients.multi:
+            metrics["instances"] = _metrics_section(clients.stats)
+        if persistent_cache is not None:
+            metrics["persistent_cache"] = _metrics_section(persistent_cache.stats)
+        if validator_cache is not None:
+            metrics["conditional_requests"] = _metrics_section(validator_cache.stats)
+        client = clients.built(current_instance.get())
+        if client is not None:
+            from transport import connection_stats
+            metrics["connection_pool"] = _metrics_section(lambda: connection_stats(client))
+            refresher = getattr(client, "token_refresher", None)
+            if refresher is not None:
+                metrics["token"] = _metrics_section(refresher.stats)
+        return metrics
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _metrics_section(collect):
+    """One section of get_server_metrics; a collector that fails reports its error in that section only."""
+    try:
+        return collect()
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.tool()
+async def get_connection_pool_stats() -> dict:
+    try:
+        client = clients.built(current_instance.get())
+        if client is None:
+            return {"error": "watsonx.data client has not been initialized yet."}
+        from transport import connection_stats
+        return connection_stats(client)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+async def get_metadata_cache_stats() -> dict:
+    try:
+        return metadata_cache.stats()
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.tool()
+async def invalidate_metadata_cache(operation: str = "") -> dict:
+    try:
+        metadata_cache.invalidate([operation] if operation else None)
+        return metadata_cache.stats()
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.tool()
+async def get_token_stats() -> dict:
+    try:
+        refresher = getattr(clients.built(current_instance.get()), "token_refresher", None)
+        if refresher is None:
+            return {"error": "Background token refresh is not running."}
+        return refresher.stats()
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.tool()
+async def get_query_cache_stats() -> dict:
+    try:
+        return query_cache.stats()
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.tool()
+async def invalidate_query_cache() -> dict:
+    try:
+        query_cache.invalidate()
+        return query_cache.stats()
+    except Exception as e:
+        return {"error": str(e)}
+
+
 # =============================================================================
 # Start the MCP server
 # =============================================================================
@@ -0,0 +1,143 @@
+# shaping.py
+
+import functools
+import inspect
+import itertools
+import os
+
+from codec import dumps
+from metrics import registry
+from pagination import find_items, parse_fields, project
+
+# Whether tools of a shaped family return compact responses unless compact=False is passed.
+COMPACT_RESPONSES = os.getenv("WATSONX_DATA_COMPACT_RESPONSES", "false").lower() == "true"
+# Measuring the unshaped size means encoding the full result, so only one shaped call in
+# this many per tool is measured for the shaping metrics.
+SHAPING_SAMPLE_EVERY = max(1, int(os.getenv("WATSONX_DATA_SHAPING_SAMPLE_EVERY", "20")))
+
+# Tool family -> tools it covers.
+TOOL_FAMILIES = {
+    "engines": (
+        "list_presto_engines", "get_presto_engine", "list_prestissimo_engines", "get_prestissimo_engine",
+        "list_spark_engines", "get_spark_engine", "list_db2_engines",
+    ),
+    "tables": ("list_tables", "get_table", "list_all_tables", "get_table_details_alt"),
+    "columns": ("list_columns", "get_all_columns"),
+    "buckets": ("list_bucket_registrations", "get_bucket_registration"),
+    "jobs": (
+        "list_ingestion_jobs", "get_ingestion_job", "list_spark_engine_applications",
+        "get_spark_engine_application_status",
+    ),
+}
+FAMILY_OF = {tool: family for family, tools in TOOL_FAMILIES.items() for tool in tools}
+
+# Fields a compact response keeps per item; names missing from a response are skipped.
+COMPACT_FIELDS = {
+    "engines": (
+        "engine_id", "display_name", "type", "status", "build_version", "size_config", "origin",
+        "associated_catalogs", "host_name", "port",
+    ),
+    "tables": (
+        "catalog_name", "schema_name", "table_name", "table_id", "table_type", "format", "location", "comment",
+    ),
+    "columns": (
+        "catalog_name", "schema_name", "table_name", "column_name", "name", "type", "data_type", "comment",
+        "nullable",
+    ),
+    "buckets": (
+        "bucket_id", "bucket_display_name", "bucket_type", "state", "managed_by", "associated_catalog.catalog_name",
+        "bucket_details.bucket_name", "bucket_details.endpoint",
+    ),
+    "jobs": (
+        "job_id", "application_id", "id", "status", "state", "engine_id", "target_table", "submission_time",
+        "start_time", "end_time", "finish_time", "start_timestamp", "end_timestamp",
+    ),
+}
+# Keys that only link to other API resources.
+_LINK_KEYS = {"href", "links", "_links", "self"}
+
+
+def prune(value):
+    """value without empty fields and link keys, recursively."""
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            if key in _LINK_KEYS:
+                continue
+            item = prune(item)
+            if item not in (None, "", [], {}):
+                pruned[key] = item
+        return pruned
+    if isinstance(value, list):
+        return [prune(item) for item in value]
+    return value
+
+
+def _shape_item(item, family, fields):
+    if fields:
+        return project(item, fields)
+    compact = project(item, COMPACT_FIELDS[family])
+    # An item with none of the family's fields has an unexpected shape; keep all of it.
+    return prune(compact or item)
+
+
+def shape(result, family, fields=(), listing=True):
+    """Project a tool result onto fields, or reduce it to its family's compact fields.
+
+    For listings this applies to every item of the main list; other keys but
+    pagination are pruned. A single object is shaped itself, or as the only
+    dict it is wrapped in.
+    """
+    if listing:
+        key, items = find_items(result)
+        if items is not None:
+            shaped_items = [_shape_item(item, family, fields) for item in items]
+            if key is None:
+                return shaped_items
+            return {
+                name: shaped_items if name == key else value if name == "pagination" else prune(value)
+                for name, value in result.items()
+            }
+    if not isinstance(result, dict):
+        return result
+    if len(result) == 1:
+        (name, value), = result.items()
+        if isinstance(value, dict):
+            return {name: _shape_item(value, family, fields)}
+    return _shape_item(result, family, fields)
+
+
+def shape_tool(fn, name=None):
+    """Wrap an async tool of a shaped family with fields and compact arguments.
+
+    A tool that already takes fields (the paginated listings) projects the
+    items itself; compact then only applies when no fields were given. One
+    shaped call in SHAPING_SAMPLE_EVERY records its original and shaped size.
+    """
+    name = name or fn.__name__
+    family = FAMILY_OF[name]
+    listing = not name.startswith("get_") or name.startswith("get_all_")
+    signature = inspect.signature(fn)
+    projects_itself = "fields" in signature.parameters
+    shaped_calls = itertools.count()
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        compact = kwargs.pop("compact", COMPACT_RESPONSES)
+        fields = "" if projects_itself else kwargs.pop("fields", "")
+        if projects_itself and kwargs.get("fields"):
+            compact = False
+        result = await fn(*args, **kwargs)
+        if not (fields or compact) or not isinstance(result, dict) or "error" in result:
+            return result
+        shaped = shape(result, family, parse_fields(fields), listing)
+        if next(shaped_calls) % SHAPING_SAMPLE_EVERY == 0:
+            registry.record_shaping(name, len(dumps(result)), len(dumps(shaped)))
+        return shaped
+
+    parameters = list(signature.parameters.values())
+    added = [inspect.Parameter("compact", inspect.Parameter.KEYWORD_ONLY, default=COMPACT_RESPONSES, annotation=bool)]
+    if not projects_itself:
+        added.insert(0, inspect.Parameter("fields", inspect.Parameter.KEYWORD_ONLY, default="", annotation=str))
+    wrapper.__signature__ = signature.replace(parameters=parameters + added)
+    return wrapper
@@ -0,0 +1,101 @@
+# spark.py
+
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+# Bounds on the diagnostics returned when a Spark application fails.
+DIAGNOSTIC_ITEMS = int(os.getenv("WATSONX_DATA_SPARK_DIAGNOSTIC_ITEMS", "10"))
+DIAGNOSTIC_CHARS = int(os.getenv("WATSONX_DATA_SPARK_DIAGNOSTIC_CHARS", "2000"))
+
+SUCCEEDED_STATES = {"finished", "succeeded", "completed"}
+FAILED_STATES = {"failed", "error", "killed", "stopped", "cancelled", "canceled"}
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_time(value):
+    """Epoch seconds from an ISO-8601 string, epoch seconds or milliseconds, or a
+    duration such as "30m" or "7d" meaning that long ago. Returns None if unparsable."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    value = value.strip()
+    match = _DURATION.match(value.lower())
+    if match:
+        return time.time() - float(match.group(1)) * _UNITS[match.group(2)]
+    try:
+        return parse_time(float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        # The API reports UTC.
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def application_filter(states="", submitted_after="", submitted_before=""):
+    """Predicate for list_spark_engine_applications items, or None when nothing is filtered."""
+    wanted = {state.strip().lower() for state in states.split(",") if state.strip()}
+    after = parse_time(submitted_after)
+    before = parse_time(submitted_before)
+    if submitted_after and after is None or submitted_before and before is None:
+        raise ValueError("Times must be ISO-8601, epoch seconds, or a duration like 30m, 24h or 7d.")
+    if not wanted and after is None and before is None:
+        return None
+
+    def keep(application):
+        if not isinstance(application, dict):
+            return False
+        if wanted and str(application.get("state", "")).lower() not in wanted:
+            return False
+        if after is not None or before is not None:
+            submitted = parse_time(
+                application.get("submission_time") or application.get("creation_time") or application.get("start_time")
+            )
+            if submitted is None:
+                return False
+            if after is not None and submitted < after:
+                return False
+            if before is not None and submitted > before:
+                return False
+        return True
+
+    return keep
+
+
+def _tail(text):
+    text = str(text)
+    return text if len(text) <= DIAGNOSTIC_CHARS else "..." + text[-DIAGNOSTIC_CHARS:]
+
+
+def failure_diagnostics(status):
+    """The parts of an application status that explain a failure, bounded in size."""
+    if not isinstance(status, dict):
+        return None
+    details = status.get("state_details") or []
+    diagnostics = {
+        key: status[key]
+        for key in ("state", "return_code", "spark_application_id", "submission_time", "start_time", "failed_time",
+                    "end_time", "finish_time")
+        if status.get(key) is not None
+    }
+    diagnostics["state_details"] = [
+        {key: _tail(value) for key, value in item.items()} if isinstance(item, dict) else _tail(item)
+        for item in details[-DIAGNOSTIC_ITEMS:]
+    ]
+    if len(details) > DIAGNOSTIC_ITEMS:
+        diagnostics["omitted_state_details"] = len(details) - DIAGNOSTIC_ITEMS
+    application = status.get("application_details") or {}
+    if isinstance(application, dict):
+        for key in ("application", "arguments", "class"):
+            if application.get(key):
+                diagnostics[key] = _tail(application[key])
+    return diagnostics
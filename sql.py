@@ -0,0 +1,91 @@
+# sql.py
+
+import hashlib
+import re
+
+# Statements that cannot change data and are safe to cache or repeat. EXPLAIN is
+# left out because EXPLAIN ANALYZE executes the statement it explains.
+READ_ONLY_STATEMENTS = {"select", "with", "values", "show", "describe", "table"}
+
+
+def normalize_sql(sql):
+    """Canonical form of a statement: comments removed, whitespace collapsed,
+    keywords and identifiers lowercased, string and quoted-identifier contents kept.
+    """
+    out = []
+    i, n = 0, len(sql)
+    pending_space = False
+    while i < n:
+        ch = sql[i]
+        if ch in "'\"":
+            end = i + 1
+            while end < n:
+                if sql[end] == ch:
+                    # A doubled quote is an escaped quote inside the literal.
+                    if end + 1 < n and sql[end + 1] == ch:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            token = sql[i:end + 1]
+            i = end + 1
+        elif sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end == -1 else end
+            pending_space = True
+            continue
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            pending_space = True
+            continue
+        elif ch.isspace():
+            pending_space = True
+            i += 1
+            continue
+        else:
+            token = ch.lower()
+            i += 1
+        if pending_space and out:
+            out.append(" ")
+        pending_space = False
+        out.append(token)
+    return "".join(out).strip().rstrip(";").strip()
+
+
+def statement_type(sql):
+    match = re.match(r"[\s(]*([a-z_]+)", normalize_sql(sql))
+    return match.group(1) if match else ""
+
+
+def is_read_only(sql):
+    return statement_type(sql) in READ_ONLY_STATEMENTS
+
+
+def sql_text(body):
+    """The statement of a query request body, or None."""
+    for key in ("sql_string", "sql", "statement", "query"):
+        if isinstance(body.get(key), str):
+            return body[key]
+    return None
+
+
+_LITERALS = re.compile(r"\"(?:[^\"]|\"\")*\"|'(?:[^']|'')*'|(?<![\w$])\d+(?:\.\d+)?(?:e[+-]?\d+)?")
+_COMPARISONS = re.compile(r"\s*(<=|>=|<>|!=|=|<|>)\s*")
+_COMMAS = re.compile(r"\s*,\s*")
+_PAREN_SPACE = re.compile(r"(?<=\()\s+|\s+(?=\))")
+_LISTS = re.compile(r"\(\?(?:, \?)+\)")
+_ROWS = re.compile(r"\(\?\)(?:, \(\?\))+")
+
+
+def fingerprint_sql(sql):
+    """(fingerprint, template) of a statement: the normalized SQL with literals replaced
+    by ?, spacing around operators made uniform and IN/VALUES lists collapsed, and a
+    short hash of that template.
+
+    Statements that differ only in their literal values share a fingerprint.
+    """
+    template = _LITERALS.sub(lambda m: m.group(0) if m.group(0).startswith('"') else "?", normalize_sql(sql))
+    template = _PAREN_SPACE.sub("", _COMMAS.sub(", ", _COMPARISONS.sub(r" \1 ", template)))
+    template = _ROWS.sub("(?)", _LISTS.sub("(?)", template))
+    return hashlib.sha1(template.encode()).hexdigest()[:16], template
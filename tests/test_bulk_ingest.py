@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from bulk_ingest import bulk_ingest, collect_files, group_files
+
+
+class Tracker:
+    """Stand-in for IngestionTracker: jobs whose ID is in failing fail once, the rest complete."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    async def wait(self, job_ids, timeout, ctx=None):
+        jobs = []
+        for job_id in job_ids:
+            failed = any(job_id.endswith(suffix) for suffix in self.failing)
+            jobs.append({"job_id": job_id, "state": "failed" if failed else "completed", "error": None})
+        return {"jobs": jobs}
+
+
+def write(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_collect_files_keeps_known_data_files(tmp_path):
+    write(tmp_path, "a.parquet", 10)
+    write(tmp_path, "b.CSV", 5)
+    write(tmp_path, "notes.txt", 5)
+    files = collect_files(str(tmp_path))
+    assert [(p.rsplit("/", 1)[1], size, kind) for p, size, kind in files] == [
+        ("a.parquet", 10, "parquet"), ("b.CSV", 5, "csv"),
+    ]
+
+
+def test_groups_hold_one_type_and_respect_the_target_size():
+    files = [("a.csv", 40, "csv"), ("b.parquet", 40, "parquet"), ("c.csv", 40, "csv"),
+             ("d.csv", 40, "csv"), ("e.csv", 500, "csv")]
+    groups = group_files(files, target_bytes=100, max_files=10)
+    assert [(g["file_type"], g["files"]) for g in groups] == [
+        ("csv", ["a.csv", "c.csv"]), ("parquet", ["b.parquet"]), ("csv", ["d.csv"]), ("csv", ["e.csv"]),
+    ]
+
+
+def test_groups_respect_max_files():
+    files = [(f"{i}.csv", 1, "csv") for i in range(5)]
+    assert [len(g["files"]) for g in group_files(files, target_bytes=100, max_files=2)] == [2, 2, 1]
+
+
+def test_each_job_is_submitted_under_its_own_file_type(tmp_path):
+    write(tmp_path, "a.csv", 10)
+    write(tmp_path, "b.parquet", 10)
+    bodies = []
+
+    async def submit(body):
+        bodies.append(body)
+
+    result = asyncio.run(bulk_ingest(submit, Tracker(), str(tmp_path), {"target_table": "t"}))
+    types = {body["source_data_files"].rsplit(".", 1)[1]: body["source_file_type"] for body in bodies}
+    assert types == {"csv": "csv", "parquet": "parquet"}
+    assert result["succeeded"] == 2
+
+
+def test_template_type_that_does_not_match_every_file_is_refused(tmp_path):
+    write(tmp_path, "a.csv", 10)
+    write(tmp_path, "b.parquet", 10)
+
+    async def submit(body):
+        raise AssertionError("nothing should be submitted")
+
+    with pytest.raises(ValueError, match="also matches parquet"):
+        asyncio.run(bulk_ingest(submit, Tracker(), str(tmp_path), {"source_file_type": "csv"}))
+
+
+def test_failed_jobs_are_resubmitted_under_a_new_id(tmp_path):
+    write(tmp_path, "a.csv", 10)
+    job_ids = []
+
+    async def submit(body):
+        job_ids.append(body["job_id"])
+
+    result = asyncio.run(bulk_ingest(submit, Tracker(failing=["-0000"]), str(tmp_path), {"job_id": "load"}))
+    assert len(job_ids) == 2
+    assert job_ids[1] == job_ids[0] + "-r1"
+    assert result["succeeded"] == 1 and result["resubmissions"] == 1
@@ -0,0 +1,104 @@
+import asyncio
+
+from cache import INVALIDATED_BY, METADATA_TTLS, MetadataCache, TTLCache, make_key
+from executor import AsyncClient
+
+
+class Response:
+    def __init__(self, result, headers=None):
+        self.result = result
+        self.headers = headers or {}
+        self.status_code = 200
+
+    def get_result(self):
+        return self.result
+
+
+class FakeClient:
+    """Records SDK calls and answers each with a fresh response."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, kwargs))
+            return Response({"operation": name, "call": len(self.calls)})
+        return call
+
+
+def test_entries_expire_after_their_ttl():
+    cache = TTLCache(4)
+    cache.set(("list_tables", 1), "a", ttl=60)
+    cache.set(("list_tables", 2), "b", ttl=-1)
+    assert cache.get(("list_tables", 1)) == (True, "a")
+    assert cache.get(("list_tables", 2)) == (False, None)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(2)
+    cache.set(("a",), 1, 60)
+    cache.set(("b",), 2, 60)
+    cache.get(("a",))
+    cache.set(("c",), 3, 60)
+    assert cache.get(("b",)) == (False, None)
+    assert cache.get(("a",)) == (True, 1)
+
+
+def test_maxbytes_bounds_the_cache():
+    cache = TTLCache(10, maxbytes=100)
+    cache.set(("a",), 1, 60, size=60)
+    cache.set(("b",), 2, 60, size=60)
+    assert cache.get(("a",)) == (False, None)
+    assert cache.bytes == 60
+    cache.set(("c",), 3, 60, size=101)
+    assert cache.get(("c",)) == (False, None)
+
+
+def test_read_started_before_an_invalidation_is_not_stored():
+    cache = TTLCache(4)
+    generation = cache.generation
+    cache.invalidate(["list_tables"])
+    cache.set(("list_tables",), "stale", 60, generation)
+    assert cache.get(("list_tables",)) == (False, None)
+
+
+def test_writes_invalidate_only_dependent_reads():
+    cache = MetadataCache(16, METADATA_TTLS, INVALIDATED_BY)
+    cache.set(("list_catalogs",), "catalogs", 60)
+    cache.set(("list_tables",), "tables", 60)
+    cache.set(("list_columns",), "columns", 60)
+    cache.after_call("update_table")
+    assert cache.get(("list_catalogs",)) == (True, "catalogs")
+    assert cache.get(("list_tables",)) == (False, None)
+    assert cache.get(("list_columns",)) == (False, None)
+    cache.after_call("list_catalogs")
+    assert cache.get(("list_catalogs",)) == (True, "catalogs")
+
+
+def test_every_invalidated_operation_is_cacheable():
+    for dependents in INVALIDATED_BY.values():
+        assert set(dependents) <= set(METADATA_TTLS)
+
+
+def test_unhashable_arguments_are_not_cached():
+    assert make_key("list_tables", (), {"catalog_id": "c"}) is not None
+    assert make_key("list_tables", (), {"filters": ["a"]}) is None
+
+
+def test_client_serves_repeated_reads_from_the_cache_until_a_write():
+    client = FakeClient()
+    cache = MetadataCache(16, METADATA_TTLS, INVALIDATED_BY)
+    aclient = AsyncClient(lambda: client, cache=cache)
+
+    async def main():
+        first = await aclient.list_tables(catalog_id="c", schema_id="s")
+        second = await aclient.list_tables(catalog_id="c", schema_id="s")
+        await aclient.delete_table(catalog_id="c", schema_id="s", table_id="t")
+        third = await aclient.list_tables(catalog_id="c", schema_id="s")
+        return first, second, third
+
+    first, second, third = asyncio.run(main())
+    assert second is first
+    assert third is not first
+    assert [name for name, _ in client.calls] == ["list_tables", "delete_table", "list_tables"]
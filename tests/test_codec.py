@@ -0,0 +1,69 @@
+import asyncio
+import datetime
+import importlib.util
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from codec import CODECS, encoded_size, get_codec
+from tool_params import use_json_arguments
+
+AVAILABLE = [name for name in CODECS if name != "orjson" or importlib.util.find_spec("orjson")]
+
+
+@pytest.mark.parametrize("name", AVAILABLE)
+def test_codecs_round_trip_api_payloads(name):
+    _, dumps, loads = get_codec(name)
+    payload = {"rows": [[1, "naïve", None, 1.5, True]], "nested": {"big": 2 ** 70}}
+    text = dumps(payload)
+    assert isinstance(text, str) and " " not in text.replace("naïve", "")
+    assert loads(text) == payload
+    assert loads(text.encode()) == payload
+
+
+@pytest.mark.parametrize("name", AVAILABLE)
+def test_codecs_encode_values_the_standard_library_cannot(name):
+    _, dumps, loads = get_codec(name)
+    decoded = loads(dumps({"at": datetime.date(2024, 1, 2)}))
+    assert decoded == {"at": "2024-01-02"}
+
+
+@pytest.mark.parametrize("name", AVAILABLE)
+def test_decode_errors_are_value_errors(name):
+    _, _, loads = get_codec(name)
+    with pytest.raises(ValueError):
+        loads("{not json")
+
+
+def test_unknown_codec_is_refused():
+    with pytest.raises(ValueError, match="WATSONX_DATA_JSON_CODEC"):
+        get_codec("simplejson")
+
+
+def test_encoded_size_counts_utf8_bytes():
+    assert encoded_size({"a": "é"}) == len('{"a":"é"}'.encode())
+
+
+def test_json_arguments_are_decoded_once_and_strings_left_alone():
+    mcp = FastMCP("test")
+    seen = {}
+
+    async def tool(names: list[str], body_json: str, limit: int = 1) -> dict:
+        seen.update(names=names, body_json=body_json, limit=limit)
+        return {}
+
+    mcp.add_tool(tool)
+    use_json_arguments(mcp._tool_manager.get_tool("tool"))
+    asyncio.run(mcp._tool_manager.call_tool(
+        "tool", {"names": '["a", "b"]', "body_json": '{"sql": "select 1"}', "limit": "5"},
+    ))
+    assert seen == {"names": ["a", "b"], "body_json": '{"sql": "select 1"}', "limit": 5}
+
+
+def test_tool_results_are_encoded_with_the_codec():
+    from server import to_content
+
+    content = to_content({"at": datetime.datetime(2024, 1, 2, 3, 4, 5)})
+    assert [item.text for item in content] == ['{"at":"2024-01-02T03:04:05"}']
+    assert [item.text for item in to_content(["a", {"b": 1}])] == ["a", '{"b":1}']
+    assert to_content(None) == []
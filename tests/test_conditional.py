@@ -0,0 +1,85 @@
+import asyncio
+
+from cache import MetadataCache
+from conditional import ValidatorCache, body_size, conditional_headers
+from executor import AsyncClient
+from metrics import MetricsRegistry
+
+
+class Response:
+    def __init__(self, result, headers=None):
+        self.result = result
+        self.headers = headers or {}
+        self.status_code = 200
+
+    def get_result(self):
+        return self.result
+
+
+class NotModified(Exception):
+    code = 304
+
+
+class Server:
+    """SDK stand-in that answers If-None-Match with a 304 while the ETag matches."""
+
+    def __init__(self):
+        self.etag = '"v1"'
+        self.requests = []
+
+    def list_tables(self, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        if (headers or {}).get("If-None-Match") == self.etag:
+            raise NotModified()
+        return Response({"tables": ["t"]}, {"ETag": self.etag, "Content-Length": "1000"})
+
+
+def client(server, metrics=None):
+    cache = MetadataCache(16, {"list_tables": 0.01}, {})
+    return AsyncClient(lambda: server, cache=cache, validators=ValidatorCache(), metrics=metrics)
+
+
+def test_expired_entry_is_revalidated_and_reused_on_304():
+    server, metrics = Server(), MetricsRegistry()
+    aclient = client(server, metrics)
+
+    async def main():
+        first = await aclient.list_tables(catalog_id="c")
+        await asyncio.sleep(0.02)
+        second = await aclient.list_tables(catalog_id="c")
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert second is first
+    assert server.requests == [{}, {"If-None-Match": '"v1"'}]
+    upstream = metrics.snapshot()["upstream"]["list_tables"]
+    assert upstream["not_modified"] == 1 and upstream["bytes_saved"] == 1000
+    assert upstream["errors"] == {}
+
+
+def test_changed_resource_is_downloaded_again():
+    server = Server()
+    aclient = client(server)
+
+    async def main():
+        first = await aclient.list_tables(catalog_id="c")
+        await asyncio.sleep(0.02)
+        server.etag = '"v2"'
+        return first, await aclient.list_tables(catalog_id="c")
+
+    first, second = asyncio.run(main())
+    assert second is not first
+    assert second.headers["ETag"] == '"v2"'
+
+
+def test_responses_without_validators_are_not_kept():
+    validators = ValidatorCache()
+    validators.remember(("list_tables",), Response({}, {}))
+    assert validators.lookup(("list_tables",)) is None
+
+
+def test_conditional_headers_and_body_size():
+    assert conditional_headers("e", "Mon") == {"If-None-Match": "e", "If-Modified-Since": "Mon"}
+    assert conditional_headers() == {}
+    entry = {"size": None, "response": Response({"a": 1})}
+    assert body_size(entry) == len('{"a":1}')
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import ingestion
+from ingestion import GIVEN_UP, IngestionTracker
+from instances import current_instance
+from resilience import idempotency_key
+
+
+class Response:
+    def __init__(self, result):
+        self.result = result
+
+    def get_result(self):
+        return self.result
+
+
+def tracker(get_job=None):
+    async def list_jobs():
+        return Response({"jobs": []})
+
+    async def running(job_id):
+        return Response({"job_id": job_id, "status": "running"})
+
+    return IngestionTracker(list_jobs, get_job or running)
+
+
+def test_job_is_given_up_after_repeated_poll_errors(monkeypatch):
+    monkeypatch.setattr(ingestion, "JOB_MAX_POLL_ERRORS", 3)
+    jobs = tracker()
+    jobs.jobs["j"] = {"state": None, "result": None, "registered_at": time.time(), "finished_at": None, "errors": 0}
+    for _ in range(2):
+        jobs._update({"j": {"status": None, "poll_error": "timed out"}})
+    assert jobs.jobs["j"]["finished_at"] is None
+    jobs._update({"j": {"status": None, "poll_error": "timed out"}})
+    assert jobs.jobs["j"]["state"] == GIVEN_UP
+    assert jobs.jobs["j"]["finished_at"] is not None
+
+
+def test_successful_poll_resets_the_error_count(monkeypatch):
+    monkeypatch.setattr(ingestion, "JOB_MAX_POLL_ERRORS", 2)
+    jobs = tracker()
+    jobs.jobs["j"] = {"state": None, "result": None, "registered_at": time.time(), "finished_at": None, "errors": 0}
+    jobs._update({"j": {"poll_error": "timed out"}})
+    jobs._update({"j": {"status": "running"}})
+    jobs._update({"j": {"poll_error": "timed out"}})
+    assert jobs.jobs["j"]["state"] == "running"
+
+
+def test_running_job_is_given_up_after_max_age(monkeypatch):
+    monkeypatch.setattr(ingestion, "JOB_MAX_AGE", 60)
+    jobs = tracker()
+    jobs.jobs["j"] = {"state": "running", "result": None, "registered_at": time.time() - 61, "finished_at": None, "errors": 0}
+    jobs._update({"j": {"status": "running"}})
+    assert jobs.jobs["j"]["state"] == GIVEN_UP
+
+
+def test_register_prunes_expired_jobs_and_tracks_them_afresh(monkeypatch):
+    monkeypatch.setattr(ingestion, "JOB_RETENTION", 10)
+    jobs = tracker()
+    old = time.time() - 100
+    jobs.jobs["done"] = {"state": "completed", "result": {}, "registered_at": old, "finished_at": old, "errors": 0}
+    jobs.jobs["kept"] = {"state": "completed", "result": {}, "registered_at": time.time(), "finished_at": time.time(), "errors": 0}
+
+    async def main():
+        jobs.register(["done"])
+        jobs._task.cancel()
+
+    asyncio.run(main())
+    assert jobs.jobs["done"]["state"] is None
+    assert jobs.jobs["done"]["finished_at"] is None
+    assert "kept" in jobs.jobs
+
+
+def test_wait_reports_finished_jobs():
+    async def completed(job_id):
+        return Response({"job_id": job_id, "status": "completed", "rows_ingested": 10})
+
+    jobs = tracker(completed)
+    summary = asyncio.run(jobs.wait(["a", "b"], timeout=5))
+    assert summary["succeeded"] == 2
+    assert not summary["timed_out"]
+
+
+def test_poll_loop_keeps_the_instance_but_not_the_callers_idempotency_key():
+    seen = []
+
+    async def get_job(job_id):
+        seen.append((idempotency_key.get(), current_instance.get()))
+        return Response({"job_id": job_id, "status": "completed"})
+
+    jobs = tracker(get_job)
+
+    async def main():
+        idempotency_key.set("create-jobs-1")
+        current_instance.set("prod")
+        return await jobs.wait(["a"], timeout=5)
+
+    assert asyncio.run(main())["succeeded"] == 1
+    assert seen == [("", "prod")]
@@ -0,0 +1,114 @@
+import asyncio
+import importlib.util
+import pathlib
+
+import pytest
+
+from instances import ALL_INSTANCES, ClientRegistry, current_instance, fan_out, load_instances, scoped_path
+
+ENVIRONMENT = {
+    "IBM_CLOUD_IAM_URL": "https://dev.example.com",
+    "IBM_CLOUD_IAM_APIKEY": "dev-key",
+    "WATSONX_DATA_INSTANCES": "prod",
+    "WATSONX_DATA_INSTANCE_PROD_URL": "https://prod.example.com",
+}
+
+
+def test_instances_come_from_the_environment():
+    configs = load_instances({**ENVIRONMENT, "WATSONX_DATA_INSTANCES": "prod, eu-west"})
+    assert list(configs) == ["default", "prod", "eu-west"]
+    assert configs["eu-west"]["url_var"] == "WATSONX_DATA_INSTANCE_EU_WEST_URL"
+    assert configs["prod"]["apikey"] == "dev-key"
+
+
+def test_registry_builds_each_client_once_and_refuses_unknown_names():
+    built = []
+    registry = ClientRegistry({"dev": {"url": "a"}, "prod": {"url": "b"}}, lambda config: built.append(config) or config)
+    assert registry.get("prod") is registry.get("prod")
+    assert registry.get() == {"url": "a"}
+    assert len(built) == 2
+    with pytest.raises(ValueError, match="Unknown instance"):
+        registry.get("staging")
+    with pytest.raises(ValueError, match="only supported by read tools"):
+        registry.resolve(ALL_INSTANCES)
+
+
+def test_scoped_path_keeps_the_default_instance_path():
+    assert scoped_path("/tmp/index.sqlite", "") == "/tmp/index.sqlite"
+    assert scoped_path("/tmp/index.sqlite", "eu/west") == "/tmp/index-eu_west.sqlite"
+
+
+def test_fan_out_runs_on_every_instance():
+    async def tool():
+        if current_instance.get() == "b":
+            raise RuntimeError("down")
+        return {"instance": current_instance.get()}
+
+    async def main():
+        current_instance.set(ALL_INSTANCES)
+        fanned = await fan_out(tool, ["a", "b"])()
+        current_instance.set("a")
+        single = await fan_out(tool, ["a", "b"])()
+        return fanned, single
+
+    fanned, single = asyncio.run(main())
+    assert fanned == {"instances": {"a": {"instance": "a"}, "b": {"error": "down"}}}
+    assert single == {"instance": "a"}
+
+
+def test_fan_out_refuses_a_cursor():
+    async def main():
+        current_instance.set(ALL_INSTANCES)
+        return await fan_out(lambda **kwargs: None, ["a", "b"])(cursor="abc")
+
+    assert "cursor cannot be used" in asyncio.run(main())["error"]
+
+
+@pytest.fixture
+def multi_server(monkeypatch):
+    """A separate copy of server.py loaded with two instances configured."""
+    for name, value in ENVIRONMENT.items():
+        monkeypatch.setenv(name, value)
+    path = pathlib.Path(__file__).resolve().parent.parent / "server.py"
+    spec = importlib.util.spec_from_file_location("multi_instance_server", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    class Response:
+        def __init__(self, result):
+            self.result = result
+
+        def get_result(self):
+            return self.result
+
+    class Client:
+        async def list_presto_engines(self):
+            return Response({"engines": [current_instance.get() or "default"]})
+
+    monkeypatch.setattr(module, "aclient", Client())
+    return module
+
+
+def test_batch_operations_run_on_the_batch_instance(multi_server):
+    async def main():
+        return await multi_server.mcp.run_tool("batch_execute", {
+            "operations": [
+                {"tool": "list_presto_engines"},
+                {"tool": "list_presto_engines", "args": {"instance": "default"}},
+            ],
+            "instance": "prod",
+        })
+
+    result, _ = asyncio.run(main())
+    assert [entry["result"] for entry in result["results"]] == [{"engines": ["prod"]}, {"engines": ["default"]}]
+
+
+def test_read_tools_fan_out_and_server_tools_do_not(multi_server):
+    async def main():
+        engines, _ = await multi_server.mcp.run_tool("list_presto_engines", {"instance": "*"})
+        metrics, _ = await multi_server.mcp.run_tool("get_metadata_cache_stats", {"instance": "*"})
+        return engines, metrics
+
+    engines, metrics = asyncio.run(main())
+    assert engines == {"instances": {"default": {"engines": ["default"]}, "prod": {"engines": ["prod"]}}}
+    assert "instances" not in metrics
@@ -0,0 +1,79 @@
+import asyncio
+
+from inventory import inventory_snapshot
+
+
+class Response:
+    def __init__(self, result):
+        self.result = result
+
+    def get_result(self):
+        return self.result
+
+
+class Deployment:
+    """Async listings of a small deployment; operations in failing raise."""
+
+    def __init__(self, failing=(), delay=0):
+        self.failing = set(failing)
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __getattr__(self, operation):
+        async def call(**kwargs):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(self.delay)
+                if operation in self.failing:
+                    raise RuntimeError(f"{operation} unavailable")
+                return Response(LISTINGS.get(operation, {}).get(kwargs.get("engine_id"), LISTINGS.get(operation)))
+            finally:
+                self.in_flight -= 1
+        return call
+
+
+LISTINGS = {
+    "list_presto_engines": {"presto_engines": [
+        {"engine_id": "presto01", "display_name": "adhoc", "status": "running", "size_config": "small"},
+    ]},
+    "list_presto_engine_catalogs": {"presto01": {"catalogs": [{"catalog_name": "iceberg_data"}, {"catalog_name": "hive"}]}},
+    "list_prestissimo_engines": {"prestissimo_engines": []},
+    "list_spark_engines": {"spark_engines": [{"engine_id": "spark01", "status": "stopped"}]},
+    "list_db2_engines": {"db2_engines": []},
+    "list_bucket_registrations": {"bucket_registrations": [
+        {"bucket_id": "b1", "bucket_display_name": "lake", "associated_catalog": {"catalog_name": "iceberg_data"}},
+    ]},
+    "list_database_registrations": {"database_registrations": [
+        {"database_id": "d1", "database_details": {"hostname": "db.example.com"}, "associated_catalog": "pg"},
+    ]},
+    "list_catalogs": {"catalogs": [{"catalog_name": "iceberg_data", "catalog_type": "iceberg"}, {"catalog_name": "pg"}]},
+}
+
+
+def test_snapshot_joins_engines_storage_and_catalogs():
+    snapshot = asyncio.run(inventory_snapshot(Deployment(failing={"list_spark_engine_catalogs"})))
+    presto = snapshot["engines"][0]
+    assert presto == {"id": "presto01", "name": "adhoc", "status": "running", "size": "small", "type": "presto",
+                      "catalogs": ["hive", "iceberg_data"]}
+    catalogs = {catalog["name"]: catalog for catalog in snapshot["catalogs"]}
+    assert catalogs["iceberg_data"] == {"name": "iceberg_data", "type": "iceberg", "engines": ["presto01"], "buckets": ["b1"]}
+    assert catalogs["pg"]["databases"] == ["d1"]
+    assert catalogs["hive"] == {"name": "hive", "engines": ["presto01"]}
+    assert snapshot["databases"][0]["host"] == "db.example.com"
+    assert snapshot["counts"] == {"engines": 2, "buckets": 1, "databases": 1, "catalogs": 3}
+    assert snapshot["errors"] == {"list_spark_engine_catalogs:spark01": "list_spark_engine_catalogs unavailable"}
+
+
+def test_failed_listing_is_reported_not_raised():
+    snapshot = asyncio.run(inventory_snapshot(Deployment(failing={"list_catalogs"}), include_catalogs=False))
+    assert snapshot["errors"] == {"list_catalogs": "list_catalogs unavailable"}
+    assert "catalogs" not in snapshot["engines"][0]
+    assert snapshot["calls"] == 7
+
+
+def test_listings_run_concurrently_within_the_limit():
+    deployment = Deployment(delay=0.01)
+    asyncio.run(inventory_snapshot(deployment, concurrency=3))
+    assert deployment.max_in_flight == 3
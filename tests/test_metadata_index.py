@@ -0,0 +1,104 @@
+import asyncio
+import difflib
+
+from metadata_index import FuzzyNames, MetadataIndex, extract_objects
+
+
+class Response:
+    def __init__(self, result):
+        self.result = result
+
+    def get_result(self):
+        return self.result
+
+
+class Listings:
+    """Async stand-in for the AsyncClient's listing operations."""
+
+    def __init__(self):
+        self.tables = ["customer_orders", "customers", "order_items", "shipments"]
+        self.calls = []
+
+    async def list_all_schemas(self):
+        self.calls.append("schemas")
+        return Response({"schemas": [{"schema_name": "sales", "catalog_name": "iceberg"}]})
+
+    async def list_all_tables(self):
+        self.calls.append("tables")
+        return Response({"tables": [
+            {"table_name": name, "schema_name": "sales", "catalog_name": "iceberg"} for name in self.tables
+        ]})
+
+    async def get_all_columns(self):
+        self.calls.append("columns")
+        return Response({"columns": [
+            {"column_name": "customer_id", "type": "bigint", "table_name": "customers", "schema_name": "sales",
+             "catalog_name": "iceberg"},
+        ]})
+
+
+def test_extract_objects_builds_paths_from_parents():
+    rows = extract_objects("column", {"columns": [
+        {"column_name": "id", "type": "int", "table_name": "t", "schema_name": "s", "catalog_name": "c"},
+        {"type": "int"},
+    ]})
+    assert [(name, path, data_type) for _, name, path, data_type, _, _ in rows] == [("id", "c.s.t.id", "int")]
+
+
+def test_fuzzy_names_match_a_full_difflib_scan():
+    names = ["customers", "customer_orders", "costumers", "orders", "cust", "shipments", "c"]
+    index = FuzzyNames(names)
+    for needle in ("customers", "custmers", "order", "shipment", "ab"):
+        expected = difflib.get_close_matches(needle, sorted(set(names)), n=10, cutoff=0.75)
+        assert index.close_matches(needle, 10, 0.75) == expected
+
+
+def test_search_ranks_exact_prefix_substring_and_fuzzy_matches():
+    index = MetadataIndex(Listings(), path=":memory:")
+
+    async def main():
+        exact = await index.search("customers", kind="table")
+        prefix = await index.search("customer", kind="table")
+        substring = await index.search("order", kind="table")
+        fuzzy = await index.search("shipmnts", kind="table")
+        return exact, prefix, substring, fuzzy
+
+    exact, prefix, substring, fuzzy = asyncio.run(main())
+    assert exact["results"][0]["name"] == "customers" and exact["results"][0]["match"] == "exact"
+    assert [(r["name"], r["match"]) for r in prefix["results"]] == [("customers", "prefix"), ("customer_orders", "prefix")]
+    assert {r["name"]: r["match"] for r in substring["results"]} == {"order_items": "prefix", "customer_orders": "substring"}
+    assert [(r["path"], r["match"]) for r in fuzzy["results"]] == [("iceberg.sales.shipments", "fuzzy")]
+
+
+def test_fresh_index_is_not_listed_again_until_a_write_affects_it():
+    listings = Listings()
+    index = MetadataIndex(listings, path=":memory:")
+
+    async def main():
+        await index.search("customers", kind="table")
+        await index.search("customers", kind="table")
+        listings.tables.append("returns")
+        index.after_call("delete_table")
+        await index.search("returns", kind="table")
+        await asyncio.gather(*index._refreshing.values())
+        return await index.search("returns", kind="table")
+
+    result = asyncio.run(main())
+    assert listings.calls == ["tables", "tables"]
+    assert [r["name"] for r in result["results"]] == ["returns"]
+
+
+def test_write_during_a_refresh_leaves_the_kind_stale():
+    listings = Listings()
+    index = MetadataIndex(listings, path=":memory:")
+
+    async def main():
+        await index.search("customers", kind="table")
+        index._refreshed["table"] = 0
+        refresh = index._refresh_task("table")
+        await asyncio.sleep(0)
+        index.after_call("update_table")
+        await refresh
+        return index._refreshed["table"]
+
+    assert asyncio.run(main()) == 0
@@ -0,0 +1,55 @@
+import asyncio
+
+import metrics
+from metrics import MetricsRegistry, instrument
+
+
+def test_instrument_records_calls_latency_and_error_classes(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "registry", registry)
+
+    @instrument
+    async def tool(fail=False):
+        return {"error": "boom"} if fail else {"ok": True}
+
+    async def main():
+        await tool()
+        await tool(fail=True)
+
+    asyncio.run(main())
+    stats = registry.snapshot()["tools"]["tool"]
+    assert stats["calls"] == 2
+    assert stats["errors"] == {"ToolError": 1}
+    assert stats["latency_ms"]["p50"] is not None
+
+
+def test_upstream_errors_name_the_tool_error_class(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "registry", registry)
+
+    class ReadTimeout(Exception):
+        pass
+
+    @instrument
+    async def tool():
+        registry.record_upstream("list_catalogs", 0.01, error=ReadTimeout())
+        return {"error": "timed out"}
+
+    asyncio.run(tool())
+    assert registry.snapshot()["tools"]["tool"]["errors"] == {"ReadTimeout": 1}
+    assert "watsonx_data_upstream_latency_seconds_count" in registry.prometheus()
+
+
+def test_failing_collector_only_fails_its_own_section(monkeypatch):
+    import server
+    import transport
+
+    def connection_stats(client):
+        raise AttributeError("no adapter")
+
+    monkeypatch.setattr(transport, "connection_stats", connection_stats)
+    monkeypatch.setattr(server.clients, "built", lambda name="": object())
+    result = asyncio.run(server.get_server_metrics())
+    assert "error" not in result
+    assert result["connection_pool"] == {"error": "no adapter"}
+    assert "entries" in result["metadata_cache"]
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+import pagination
+from cache import TTLCache
+from instances import current_instance
+from pagination import decode_cursor, encode_cursor, paginate
+
+
+class Response:
+    def __init__(self, result, headers=None):
+        self.result = result
+        self.headers = headers or {}
+
+    def get_result(self):
+        return self.result
+
+
+def listing(count):
+    async def fetch():
+        return Response({"tables": [{"name": f"t{i}", "size": i} for i in range(count)], "region": "us"})
+    return fetch
+
+
+def test_pages_follow_the_cursor():
+    async def main():
+        first = await paginate(listing(5), limit=2, listing=("list_tables",))
+        second = await paginate(listing(0), limit=2, cursor=first["pagination"]["next_cursor"], listing=("list_tables",))
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert [t["name"] for t in first["tables"]] == ["t0", "t1"]
+    assert [t["name"] for t in second["tables"]] == ["t2", "t3"]
+    assert second["region"] == "us"
+    assert second["pagination"]["total"] == 5
+
+
+def test_cursor_from_another_listing_is_rejected():
+    async def main():
+        first = await paginate(listing(5), limit=2, listing=("list_tables", "a"))
+        await paginate(listing(5), limit=2, cursor=first["pagination"]["next_cursor"], listing=("list_tables", "b"))
+
+    with pytest.raises(ValueError, match="different listing"):
+        asyncio.run(main())
+
+
+def test_cursor_from_another_instance_is_rejected():
+    async def main():
+        first = await paginate(listing(5), limit=2, listing=("list_tables",))
+        current_instance.set("other")
+        await paginate(listing(5), limit=2, cursor=first["pagination"]["next_cursor"], listing=("list_tables",))
+
+    with pytest.raises(ValueError, match="different listing"):
+        asyncio.run(main())
+
+
+def test_malformed_cursor():
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("not a cursor")
+    assert decode_cursor(encode_cursor("abc", 7, "tag"), "tag") == ("abc", 7)
+
+
+def test_filter_keeps_the_list_found_before_filtering():
+    async def fetch():
+        return Response({"tables": [{"name": f"t{i}"} for i in range(4)], "tags": ["a", "b", "c"]})
+
+    async def main():
+        return await paginate(fetch, limit=10, keep=lambda item: item["name"] == "t0")
+
+    result = asyncio.run(main())
+    assert result["tables"] == [{"name": "t0"}]
+    assert result["tags"] == ["a", "b", "c"]
+
+
+def test_listing_too_large_to_snapshot_is_paged_by_fetching_again(monkeypatch):
+    monkeypatch.setattr(pagination, "_snapshots", TTLCache(16, maxbytes=10))
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        return Response({"tables": [{"name": f"t{i}"} for i in range(5)]})
+
+    async def main():
+        pages = [await paginate(fetch, limit=2, listing=("list_tables",))]
+        while pages[-1]["pagination"]["next_cursor"]:
+            pages.append(await paginate(fetch, limit=2, cursor=pages[-1]["pagination"]["next_cursor"], listing=("list_tables",)))
+        return pages
+
+    pages = asyncio.run(main())
+    assert [t["name"] for page in pages for t in page["tables"]] == [f"t{i}" for i in range(5)]
+    assert len(fetches) == 3
+    assert pagination._snapshots.stats()["entries"] == 0
+
+
+def test_snapshot_is_sized_from_content_length(monkeypatch):
+    def encoded_size(obj):
+        raise AssertionError("the listing was encoded to size it")
+
+    monkeypatch.setattr(pagination, "encoded_size", encoded_size)
+
+    async def fetch():
+        return Response({"tables": [{"name": f"t{i}"} for i in range(5)]}, {"Content-Length": "120"})
+
+    result = asyncio.run(paginate(fetch, limit=2, listing=("list_tables",)))
+    assert result["pagination"]["next_cursor"]
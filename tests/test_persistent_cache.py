@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import executor
+from persistent_cache import PersistentCache, affected_operations
+
+
+class Response:
+    def __init__(self, result, etag=None):
+        self.result = result
+        self.status_code = 200
+        self.headers = {"ETag": etag} if etag else {}
+
+    def get_result(self):
+        return self.result
+
+
+class NotModified(Exception):
+    code = 304
+
+
+class Upstream:
+    """The call(headers) a PersistentCache makes on a miss or revalidation."""
+
+    def __init__(self, not_modified=False):
+        self.not_modified = not_modified
+        self.headers = []
+
+    async def __call__(self, headers):
+        self.headers.append(headers)
+        if self.not_modified and headers:
+            raise NotModified()
+        return Response({"engines": [len(self.headers)]}, etag=f'"v{len(self.headers)}"')
+
+
+def cache(ttl=300, max_stale=3600):
+    return PersistentCache(path=":memory:", ttls={"list_presto_engines": ttl}, max_stale=max_stale)
+
+
+async def settle(store):
+    await asyncio.gather(*store._revalidating.values())
+
+
+def test_miss_then_fresh_hit():
+    store, upstream = cache(), Upstream()
+
+    async def main():
+        first, fresh_first = await store.fetch("list_presto_engines", (), {}, upstream)
+        second, fresh_second = await store.fetch("list_presto_engines", (), {}, upstream)
+        return first.get_result(), fresh_first, second.get_result(), fresh_second
+
+    assert asyncio.run(main()) == ({"engines": [1]}, True, {"engines": [1]}, True)
+    assert upstream.headers == [{}]
+    assert store.hits == 1 and store.misses == 1
+
+
+def test_expired_entry_is_served_stale_while_it_is_revalidated():
+    store, upstream = cache(ttl=0), Upstream()
+
+    async def main():
+        await store.fetch("list_presto_engines", (), {}, upstream)
+        stale, fresh = await store.fetch("list_presto_engines", (), {}, upstream)
+        await settle(store)
+        return stale.get_result(), fresh, store.load(store.key_for("list_presto_engines", (), {}))
+
+    stale, fresh, entry = asyncio.run(main())
+    assert stale == {"engines": [1]} and not fresh
+    assert upstream.headers[1] == {"If-None-Match": '"v1"'}
+    assert entry["response"].get_result() == {"engines": [2]}
+
+
+def test_not_modified_keeps_the_stored_entry():
+    store, upstream = cache(ttl=0), Upstream(not_modified=True)
+
+    async def main():
+        await store.fetch("list_presto_engines", (), {}, upstream)
+        await store.fetch("list_presto_engines", (), {}, upstream)
+        await settle(store)
+
+    asyncio.run(main())
+    assert store.not_modified == 1
+    assert store.load(store.key_for("list_presto_engines", (), {}))["response"].get_result() == {"engines": [1]}
+
+
+def test_writes_make_affected_entries_unusable():
+    store, upstream = cache(), Upstream()
+
+    async def main():
+        await store.fetch("list_presto_engines", (), {}, upstream)
+        store.after_call("delete_engine")
+        await asyncio.sleep(0.05)
+        return await store.fetch("list_presto_engines", (), {}, upstream)
+
+    response, fresh = asyncio.run(main())
+    assert response.get_result() == {"engines": [2]} and fresh
+    assert affected_operations("list_presto_engines") == ()
+
+
+def test_cache_hit_does_not_wait_behind_busy_api_workers(monkeypatch):
+    store, upstream = cache(), Upstream()
+    asyncio.run(store.fetch("list_presto_engines", (), {}, upstream))
+    busy = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(executor, "_executor", busy)
+    release = threading.Event()
+    busy.submit(release.wait)
+
+    async def main():
+        return await asyncio.wait_for(store.fetch("list_presto_engines", (), {}, upstream), 1)
+
+    try:
+        response, fresh = asyncio.run(main())
+    finally:
+        release.set()
+        busy.shutdown()
+    assert response.get_result() == {"engines": [1]} and fresh
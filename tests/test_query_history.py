@@ -0,0 +1,169 @@
+import asyncio
+import time
+
+from query_history import QueryHistory
+from query_results import META_KEY
+from sql import fingerprint_sql
+
+
+async def settle():
+    """Wait for the history's background writes."""
+    pending = asyncio.all_tasks() - {asyncio.current_task()}
+    await asyncio.gather(*pending)
+
+
+def test_record_run_accepts_a_result_without_metadata():
+    history = QueryHistory(":memory:")
+
+    async def main():
+        history.record_run("create table t (a int)", "presto01", time.time(), 0.1, None)
+        history.record_run("select 1", "presto01", time.time(), 0.2, {META_KEY: {"cached": True, "total_rows": 1}})
+        await settle()
+
+    asyncio.run(main())
+    ddl = history.fingerprint(fingerprint_sql("create table t (a int)")[0], 0, 10)
+    assert ddl["runs"] == 1
+    assert ddl["recent"][0]["rows"] is None
+    select = history.fingerprint(fingerprint_sql("select 1")[0], 0, 10)
+    assert select["cached_runs"] == 1
+
+
+def test_create_execute_query_returns_a_none_result(monkeypatch):
+    import server
+
+    history = QueryHistory(":memory:")
+    monkeypatch.setattr(server, "run_history", history)
+
+    class Response:
+        def get_result(self):
+            return None
+
+    async def create_execute_query(**kwargs):
+        return Response()
+
+    monkeypatch.setattr(server.aclient, "create_execute_query", create_execute_query)
+
+    async def main():
+        result = await server.create_execute_query('{"sql_string": "create table t (a int)", "engine_id": "presto01"}')
+        await settle()
+        return result
+
+    assert asyncio.run(main()) is None
+    assert history.fingerprint(fingerprint_sql("create table t (a int)")[0], 0, 10)["runs"] == 1
+
+
+def test_history_failure_does_not_change_the_result(monkeypatch):
+    import server
+
+    class BrokenHistory:
+        def record_run(self, *args):
+            raise RuntimeError("disk full")
+
+    monkeypatch.setattr(server, "run_history", BrokenHistory())
+
+    class Response:
+        def get_result(self):
+            return {"response": {"result": []}}
+
+    async def create_execute_query(**kwargs):
+        return Response()
+
+    monkeypatch.setattr(server.aclient, "create_execute_query", create_execute_query)
+    result = asyncio.run(server.create_execute_query('{"sql_string": "select 1"}', use_cache=False))
+    assert "error" not in result
+
+
+def test_only_writes_that_succeeded_are_recorded_as_events():
+    from executor import AsyncClient
+
+    history = QueryHistory(":memory:")
+
+    class Client:
+        def update_engine(self, **kwargs):
+            return {"ok": True}
+
+        def restart_presto_engine(self, **kwargs):
+            raise RuntimeError("engine busy")
+
+    aclient = AsyncClient(lambda: Client(), observers=[history])
+
+    async def main():
+        await aclient.update_engine(engine_id="presto01")
+        try:
+            await aclient.restart_presto_engine(engine_id="presto01")
+        except RuntimeError:
+            pass
+        await settle()
+
+    asyncio.run(main())
+    assert history._rows("SELECT operation FROM events", ()) == [("update_engine",)]
+
+
+class Listing:
+    def __init__(self, result):
+        self.result = result
+
+    def get_result(self):
+        return self.result
+
+
+def fake_engines(monkeypatch, server, presto, prestissimo):
+    calls = []
+
+    async def list_presto_engines():
+        return Listing({"presto_engines": [{"engine_id": engine} for engine in presto]})
+
+    async def list_prestissimo_engines():
+        return Listing({"prestissimo_engines": [{"engine_id": engine} for engine in prestissimo]})
+
+    def explain(operation):
+        async def call(**kwargs):
+            calls.append((operation, kwargs["engine_id"]))
+            return Listing({"result": [["- TableScan[table = t] => [a:bigint]"]]})
+        return call
+
+    monkeypatch.setattr(server.aclient, "list_presto_engines", list_presto_engines)
+    monkeypatch.setattr(server.aclient, "list_prestissimo_engines", list_prestissimo_engines)
+    for engine_type, operations in server._EXPLAIN_OPERATIONS.items():
+        monkeypatch.setattr(server.aclient, operations[1], explain(operations[1]))
+    return calls
+
+
+def test_background_analysis_runs_once_on_the_engine_type_of_the_query(monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, "run_history", None)
+    calls = fake_engines(monkeypatch, server, presto=["presto01"], prestissimo=["pe01"])
+    asyncio.run(server._analyze_in_background("select 1", "pe01"))
+    assert calls == [("run_prestissimo_explain_analyze_statement", "pe01")]
+    calls.clear()
+    asyncio.run(server._analyze_in_background("select 1", "spark01"))
+    assert calls == []
+
+
+def test_background_analyses_are_kept_and_capped(monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, "run_history", QueryHistory(":memory:"))
+    monkeypatch.setattr(server, "QUERY_HISTORY_ANALYZE", True)
+    monkeypatch.setattr(server, "QUERY_HISTORY_ANALYZE_MAX_CONCURRENT", 1)
+    started, release = [], None
+
+    async def analyze(sql, engine):
+        started.append(sql)
+        await release.wait()
+
+    monkeypatch.setattr(server, "_analyze_in_background", analyze)
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        server.record_query({"sql_string": "select a from t", "engine_id": "presto01"}, time.time(), 0.1, {})
+        server.record_query({"sql_string": "select b from t", "engine_id": "presto01"}, time.time(), 0.1, {})
+        await asyncio.sleep(0)
+        assert started == ["select a from t"] and len(server._analysis_tasks) == 1
+        release.set()
+        await settle()
+        assert not server._analysis_tasks
+
+    asyncio.run(main())
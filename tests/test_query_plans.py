@@ -0,0 +1,75 @@
+import pytest
+
+from query_plans import analyze_plan, parse_text_plan, plan_text
+
+ANALYZED = """\
+Fragment 1 [SOURCE]
+    CPU: 2.50s, Scheduled: 3.10s, Input: 5000000 rows (120MB); per task: avg.: 2500000.00 std.dev.: 3000000.00, Output: 10 rows (1kB)
+    Output layout: [count]
+    - Aggregate(PARTIAL) => [count:bigint]
+            CPU: 1.20s (48.00%), Scheduled: 1.50s (48.39%), Output: 10 rows (90B)
+        - TableScan[table = iceberg:sales.orders] => [orderkey:bigint]
+                CPU: 1.30s (52.00%), Scheduled: 1.60s (51.61%), Output: 5.00M rows (120MB)
+                Input: 5.00M rows (120MB), Filtered: 0.00%
+"""
+
+FILTERED_JOIN = """\
+Fragment 2 [HASH]
+    - InnerJoin[("custkey" = "custkey")] => [name:varchar]
+            Distribution: REPLICATED
+        - ScanFilter[table = iceberg:sales.orders, filterPredicate = (orderdate > DATE '2024-01-01')] => [custkey:bigint]
+                Input: 1000 rows (10kB), Filtered: 80.00%
+        - TableScan[table = iceberg:sales.customer] => [custkey:bigint, name:varchar]
+                Estimates: {rows: 3000000 (250MB), cpu: ?, memory: ?, network: ?}
+"""
+
+
+def test_text_plan_is_parsed_into_fragments_and_operator_trees():
+    fragments = parse_text_plan(ANALYZED)
+    assert [(f["id"], f["partitioning"]) for f in fragments] == [(1, "SOURCE")]
+    assert fragments[0]["cpu_ms"] == 2500 and fragments[0]["task_skew_pct"] == 120.0
+    aggregate = fragments[0]["plan"]
+    assert aggregate["operator"] == "Aggregate(PARTIAL)" and aggregate["outputs"] == "[count:bigint]"
+    scan = aggregate["children"][0]
+    assert scan["cpu_ms"] == 1300 and scan["cpu_pct"] == 52.0
+    assert scan["output_rows"] == 5_000_000 and scan["output_bytes"] == 120 * 1024 ** 2
+
+
+def test_findings_for_full_scans_skew_and_hotspots():
+    analysis = analyze_plan(ANALYZED)
+    kinds = [(finding["kind"], finding["operator"]) for finding in analysis["findings"]]
+    assert ("skewed_stage", None) in kinds
+    assert ("full_scan", "TableScan[iceberg:sales.orders]") in kinds
+    assert ("cpu_hotspot", "TableScan[iceberg:sales.orders]") in kinds
+    assert analysis["analyzed"] and analysis["operators"] == 2
+    assert analysis["hotspots"][0]["operator"] == "TableScan[iceberg:sales.orders]"
+
+
+def test_findings_for_missed_pruning_and_large_broadcast_joins():
+    findings = {finding["kind"]: finding for finding in analyze_plan(FILTERED_JOIN)["findings"]}
+    assert findings["missing_partition_pruning"]["filtered_pct"] == 80.0
+    assert findings["large_broadcast_join"]["build_bytes"] == 250 * 1024 ** 2
+    assert findings["full_scan"]["operator"] == "TableScan[iceberg:sales.customer]"
+
+
+def test_json_plan_uses_estimates():
+    plan = {"name": "Output", "identifier": "", "details": "", "children": [{
+        "name": "TableScan", "identifier": "[table = iceberg:s.t]", "details": "",
+        "estimates": [{"outputRowCount": 2e6, "outputSizeInBytes": float("nan")}], "children": [],
+    }]}
+    analysis = analyze_plan(plan)
+    scan = analysis["fragments"][0]["plan"]["children"][0]
+    assert scan["estimated_rows"] == 2_000_000 and "estimated_bytes" not in scan
+    assert not analysis["analyzed"]
+    assert [finding["kind"] for finding in analysis["findings"]] == ["full_scan"]
+
+
+def test_plan_text_unwraps_explain_responses():
+    assert plan_text({"result": [["line 1"], ["line 2"]]}) == "line 1\nline 2"
+    assert plan_text({"plan": '{"name": "Output"}'}) == {"name": "Output"}
+    assert plan_text(42) is None
+
+
+def test_output_without_operators_is_refused():
+    with pytest.raises(ValueError, match="no plan operators"):
+        analyze_plan("Query failed")
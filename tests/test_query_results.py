@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+import query_results
+from cache import MetadataCache
+from query_results import META_KEY, fetch_next_chunk, run_query
+
+
+class Response:
+    def __init__(self, result):
+        self.result = result
+
+    def get_result(self):
+        return self.result
+
+
+@pytest.fixture
+def query_cache(monkeypatch):
+    cache = MetadataCache(16, {}, {"update_table": ("query",)})
+    monkeypatch.setattr(query_results, "QUERY_CACHE", True)
+    monkeypatch.setattr(query_results, "query_cache", cache)
+    return cache
+
+
+def engine(rows=3):
+    calls = []
+
+    async def execute(body, stream):
+        calls.append(body["sql_string"])
+        return Response({"response": {"result": [[i] for i in range(rows)]}})
+
+    return execute, calls
+
+
+def test_rows_come_back_in_chunks():
+    execute, _ = engine(rows=5)
+
+    async def main():
+        first = await run_query(execute, {"sql_string": "select 1"}, chunk_rows=2, use_cache=False)
+        second = fetch_next_chunk(first[META_KEY]["result_id"])
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first["response"]["result"] == [[0], [1]]
+    assert first[META_KEY]["has_more"]
+    assert second["rows"] == [[2], [3]]
+
+
+def test_equivalent_statements_share_a_cached_result(query_cache):
+    execute, calls = engine()
+
+    async def main():
+        await run_query(execute, {"sql_string": "SELECT a FROM t"})
+        return await run_query(execute, {"sql_string": "select a\n  from t -- again"})
+
+    result = asyncio.run(main())
+    assert result[META_KEY]["cached"]
+    assert len(calls) == 1
+
+
+def test_use_cache_false_neither_reads_nor_writes(query_cache):
+    execute, calls = engine()
+
+    async def main():
+        await run_query(execute, {"sql_string": "select 1"}, use_cache=False)
+        return await run_query(execute, {"sql_string": "select 1"})
+
+    result = asyncio.run(main())
+    assert not result[META_KEY]["cached"]
+    assert len(calls) == 2
+    assert query_cache.stats()["entries"] == 1
+
+
+def test_write_statement_clears_the_cache(query_cache):
+    execute, calls = engine()
+
+    async def main():
+        await run_query(execute, {"sql_string": "select 1"})
+        await run_query(execute, {"sql_string": "delete from t"})
+        return await run_query(execute, {"sql_string": "select 1"})
+
+    assert not asyncio.run(main())[META_KEY]["cached"]
+    assert calls == ["select 1", "delete from t", "select 1"]
+
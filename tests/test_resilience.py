@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitOpen, Resilience, is_mutation, is_retryable
+
+
+class Unavailable(Exception):
+    code = 503
+
+
+def open_breaker():
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.before_call("op")
+    breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        breaker.before_call("op")
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = open_breaker()
+    breaker.opened_at = time.monotonic() - 31
+    assert breaker.state == "half_open"
+    assert breaker.before_call("op") is True
+    with pytest.raises(CircuitOpen):
+        breaker.before_call("op")
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.before_call("op") is False
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = open_breaker()
+    breaker.opened_at = time.monotonic() - 31
+    breaker.before_call("op")
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.trial_in_flight
+
+
+def test_cancelled_trial_releases_the_circuit():
+    resilience = Resilience(attempts=0)
+    breaker = resilience.breakers["op"] = open_breaker()
+    breaker.opened_at = time.monotonic() - 31
+
+    async def main():
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.Event().wait()
+
+        task = asyncio.create_task(resilience.call("op", hang, retryable=False))
+        await started.wait()
+        assert breaker.trial_in_flight
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        async def succeed():
+            return "ok"
+
+        return await resilience.call("op", succeed, retryable=False)
+
+    assert asyncio.run(main()) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_client_errors_do_not_open_the_circuit():
+    resilience = Resilience(attempts=0)
+    resilience.breakers["op"] = CircuitBreaker(threshold=1, cooldown=30)
+
+    class NotFound(Exception):
+        code = 404
+
+    async def fail():
+        raise NotFound()
+
+    with pytest.raises(NotFound):
+        asyncio.run(resilience.call("op", fail, retryable=True))
+    assert resilience.breakers["op"].state == "closed"
+
+
+def test_open_circuit_rejects_without_calling():
+    resilience = Resilience(attempts=0)
+    resilience.breakers["op"] = open_breaker()
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+
+    with pytest.raises(CircuitOpen):
+        asyncio.run(resilience.call("op", attempt, retryable=True))
+    assert calls == []
+    assert resilience.rejected["op"] == 1
+
+
+def test_statements_are_retryable_only_when_read_only():
+    assert is_retryable("list_engines", {})
+    assert is_retryable("create_execute_query", {"body": {"sql_string": "select 1"}})
+    assert not is_retryable("create_execute_query", {"body": {"sql_string": "delete from t"}})
+    assert not is_retryable("create_execute_query", {})
+    assert not is_retryable("create_schema", {})
+    assert is_mutation("create_schema")
+    assert not is_mutation("create_execute_query")
+
+
+def test_transient_read_failures_are_retried(monkeypatch):
+    import resilience as module
+
+    monkeypatch.setattr(module, "backoff_delay", lambda attempt, error=None: 0)
+    resilience = Resilience(attempts=3)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Unavailable()
+        return "ok"
+
+    assert asyncio.run(resilience.call("list_engines", flaky, retryable=True)) == "ok"
+    assert resilience.retries["list_engines"] == 2
+
+
+def test_writes_without_a_key_are_not_retried():
+    resilience = Resilience(attempts=3)
+    attempts = []
+
+    async def fail():
+        attempts.append(1)
+        raise Unavailable()
+
+    with pytest.raises(Unavailable):
+        asyncio.run(resilience.call("create_schema", fail, retryable=False))
+    assert len(attempts) == 1
@@ -0,0 +1,90 @@
+import asyncio
+import inspect
+
+import shaping
+from metrics import MetricsRegistry
+from pagination import project
+from shaping import prune, shape, shape_tool
+
+ENGINES = {
+    "presto_engines": [
+        {"engine_id": "p1", "status": "running", "display_name": "adhoc", "actions": ["pause"],
+         "build_version": "0.286", "_links": {"self": "x"}, "tags": []},
+    ],
+    "response": {"message": "ok", "message_code": "", "href": "y"},
+}
+
+
+def test_project_keeps_dotted_fields():
+    item = {"a": 1, "b": {"c": 2, "d": 3}, "e": None}
+    assert project(item, ["a", "b.c", "missing.x"]) == {"a": 1, "b": {"c": 2}}
+    assert project("not a dict", ["a"]) == "not a dict"
+
+
+def test_prune_drops_empty_values_and_links():
+    assert prune({"a": "", "b": {"href": "x"}, "c": [{"d": None, "e": 1}], "f": 0}) == {"c": [{"e": 1}], "f": 0}
+
+
+def test_compact_listing_keeps_family_fields():
+    shaped = shape(ENGINES, "engines")
+    assert shaped == {
+        "presto_engines": [{"engine_id": "p1", "display_name": "adhoc", "status": "running", "build_version": "0.286"}],
+        "response": {"message": "ok"},
+    }
+
+
+def test_fields_project_every_item():
+    assert shape(ENGINES, "engines", ["engine_id", "actions"])["presto_engines"] == [
+        {"engine_id": "p1", "actions": ["pause"]},
+    ]
+
+
+def test_single_object_in_a_wrapper_is_shaped():
+    result = {"engine": {"engine_id": "p1", "status": "running", "description": "long text"}}
+    assert shape(result, "engines", listing=False) == {"engine": {"engine_id": "p1", "status": "running"}}
+
+
+def test_item_without_family_fields_is_only_pruned():
+    assert shape({"items": [{"x": 1, "y": ""}]}, "engines") == {"items": [{"x": 1}]}
+
+
+def test_shape_tool_adds_arguments_and_samples_metrics(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(shaping, "registry", registry)
+    monkeypatch.setattr(shaping, "SHAPING_SAMPLE_EVERY", 2)
+
+    async def list_presto_engines() -> dict:
+        return ENGINES
+
+    tool = shape_tool(list_presto_engines)
+    assert {"fields", "compact"} <= set(inspect.signature(tool).parameters)
+
+    async def main():
+        full = await tool()
+        shaped = [await tool(compact=True) for _ in range(3)]
+        return full, shaped
+
+    full, shaped = asyncio.run(main())
+    assert full is ENGINES
+    assert all(result == shape(ENGINES, "engines") for result in shaped)
+    assert registry.snapshot()["tools"]["list_presto_engines"]["shaping"]["sampled_responses"] == 2
+
+
+def test_paginated_tool_projects_itself():
+    seen = {}
+
+    async def list_all_tables(fields: str = "") -> dict:
+        seen["fields"] = fields
+        return {"tables": [{"table_name": "t", "location": "s3://x", "extra": 1}]}
+
+    tool = shape_tool(list_all_tables)
+    result = asyncio.run(tool(fields="table_name", compact=True))
+    assert seen == {"fields": "table_name"}
+    assert result == {"tables": [{"table_name": "t", "location": "s3://x", "extra": 1}]}
+
+
+def test_errors_are_never_shaped():
+    async def get_table() -> dict:
+        return {"error": "not found", "href": "x"}
+
+    assert asyncio.run(shape_tool(get_table)(compact=True)) == {"error": "not found", "href": "x"}
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from executor import AsyncClient
+
+
+class Response:
+    def __init__(self, result):
+        self.result = result
+        self.headers = {}
+
+    def get_result(self):
+        return self.result
+
+
+class SlowClient:
+    """SDK stand-in whose calls take delay seconds and are counted per operation."""
+
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            with self._lock:
+                self.calls.append(name)
+            time.sleep(self.delay)
+            if self.error is not None:
+                raise self.error
+            return Response({"operation": name})
+        return call
+
+
+def test_concurrent_identical_reads_share_one_request():
+    client = SlowClient()
+    aclient = AsyncClient(lambda: client)
+
+    async def main():
+        return await asyncio.gather(*(aclient.list_presto_engines() for _ in range(5)))
+
+    responses = asyncio.run(main())
+    assert client.calls == ["list_presto_engines"]
+    assert all(response is responses[0] for response in responses)
+
+
+def test_different_arguments_are_not_coalesced():
+    client = SlowClient()
+    aclient = AsyncClient(lambda: client)
+
+    async def main():
+        await asyncio.gather(aclient.get_table(table_id="a"), aclient.get_table(table_id="b"))
+
+    asyncio.run(main())
+    assert client.calls == ["get_table", "get_table"]
+
+
+def test_writes_are_never_coalesced():
+    client = SlowClient()
+    aclient = AsyncClient(lambda: client)
+
+    async def main():
+        await asyncio.gather(aclient.create_schema(name="s"), aclient.create_schema(name="s"))
+
+    asyncio.run(main())
+    assert client.calls == ["create_schema", "create_schema"]
+
+
+def test_read_after_a_write_does_not_join_an_older_flight():
+    client = SlowClient()
+    aclient = AsyncClient(lambda: client)
+
+    async def main():
+        first = asyncio.create_task(aclient.list_schemas())
+        await asyncio.sleep(0.01)
+        await aclient.create_schema(name="s")
+        second = await aclient.list_schemas()
+        return await first, second
+
+    first, second = asyncio.run(main())
+    assert first is not second
+    assert client.calls.count("list_schemas") == 2
+
+
+def test_followers_share_the_leaders_error():
+    client = SlowClient(error=RuntimeError("unavailable"))
+    aclient = AsyncClient(lambda: client)
+
+    async def main():
+        return await asyncio.gather(*(aclient.list_catalogs() for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert client.calls == ["list_catalogs"]
+
+
+def test_follower_retries_when_the_leader_is_cancelled():
+    client = SlowClient()
+    aclient = AsyncClient(lambda: client)
+
+    async def main():
+        leader = asyncio.create_task(aclient.list_catalogs())
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(aclient.list_catalogs())
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()).get_result() == {"operation": "list_catalogs"}
+    assert client.calls == ["list_catalogs", "list_catalogs"]
+
+
+def test_single_flight_can_be_disabled():
+    client = SlowClient()
+    aclient = AsyncClient(lambda: client, single_flight=False)
+
+    async def main():
+        await asyncio.gather(aclient.list_catalogs(), aclient.list_catalogs())
+
+    asyncio.run(main())
+    assert client.calls == ["list_catalogs", "list_catalogs"]
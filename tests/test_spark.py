@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+import spark
+from spark import application_filter, failure_diagnostics, parse_time
+
+
+def test_parse_time_accepts_iso_epochs_and_durations():
+    assert parse_time("2024-01-01T00:00:00Z") == 1704067200
+    assert parse_time("2024-01-01T00:00:00") == 1704067200
+    assert parse_time(1704067200) == 1704067200
+    assert parse_time(1704067200000) == 1704067200
+    assert parse_time("1704067200") == 1704067200
+    assert abs(parse_time("2h") - (time.time() - 7200)) < 5
+    assert parse_time("yesterday") is None
+    assert parse_time("") is None
+
+
+def test_filter_by_state_and_submission_time():
+    keep = application_filter("Running, accepted", submitted_after="2024-01-01T00:00:00Z")
+    applications = [
+        {"id": 1, "state": "RUNNING", "submission_time": "2024-02-01T00:00:00Z"},
+        {"id": 2, "state": "finished", "submission_time": "2024-02-01T00:00:00Z"},
+        {"id": 3, "state": "accepted", "submission_time": "2023-12-31T00:00:00Z"},
+        {"id": 4, "state": "accepted"},
+        "not an application",
+    ]
+    assert [app["id"] for app in applications if keep(app)] == [1]
+
+
+def test_filter_by_submitted_before_uses_creation_time_as_fallback():
+    keep = application_filter(submitted_before="2024-01-01T00:00:00Z")
+    assert keep({"creation_time": "2023-06-01T00:00:00Z"})
+    assert not keep({"creation_time": "2024-06-01T00:00:00Z"})
+
+
+def test_no_filter_when_nothing_is_asked():
+    assert application_filter() is None
+
+
+def test_unparsable_times_are_refused():
+    with pytest.raises(ValueError, match="ISO-8601"):
+        application_filter(submitted_after="last tuesday")
+
+
+def test_failure_diagnostics_are_bounded(monkeypatch):
+    monkeypatch.setattr(spark, "DIAGNOSTIC_ITEMS", 2)
+    monkeypatch.setattr(spark, "DIAGNOSTIC_CHARS", 10)
+    status = {
+        "state": "failed",
+        "return_code": "1",
+        "state_details": [{"message": f"step {i}"} for i in range(5)],
+        "application_details": {"arguments": ["--input", "s3://bucket/very/long/path"]},
+    }
+    diagnostics = failure_diagnostics(status)
+    assert diagnostics["state_details"] == [{"message": "step 3"}, {"message": "step 4"}]
+    assert diagnostics["omitted_state_details"] == 3
+    assert diagnostics["arguments"].startswith("...") and len(diagnostics["arguments"]) == 13
+    assert diagnostics["return_code"] == "1"
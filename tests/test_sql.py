@@ -0,0 +1,39 @@
+from sql import fingerprint_sql, is_read_only, normalize_sql, sql_text
+
+
+def test_normalize_strips_comments_and_collapses_whitespace():
+    sql = "SELECT  a,\n  b -- note\nFROM T /* x */ WHERE s = 'Mixed  Case';"
+    assert normalize_sql(sql) == "select a, b from t where s = 'Mixed  Case'"
+
+
+def test_normalize_keeps_doubled_quotes_inside_literals():
+    assert normalize_sql("select 'it''s -- not a comment'") == "select 'it''s -- not a comment'"
+
+
+def test_is_read_only():
+    assert is_read_only("  (select 1)")
+    assert is_read_only("/* c */ WITH x AS (select 1) select * from x")
+    assert not is_read_only("create table t (a int)")
+    assert not is_read_only("explain analyze select 1")
+
+
+def test_sql_text_reads_known_keys():
+    assert sql_text({"sql_string": "select 1"}) == "select 1"
+    assert sql_text({"statement": "select 2"}) == "select 2"
+    assert sql_text({"sql": 3}) is None
+
+
+def test_fingerprint_ignores_literal_values_and_spacing():
+    first = fingerprint_sql("select * from t where id = 1 and name='a'")
+    second = fingerprint_sql("SELECT * FROM t WHERE id=42 AND name = 'bob'")
+    assert first == second
+    assert first[1] == "select * from t where id = ? and name = ?"
+
+
+def test_fingerprint_collapses_in_and_values_lists():
+    assert fingerprint_sql("select 1 from t where id in (1, 2, 3)")[1] == "select ? from t where id in (?)"
+    assert fingerprint_sql("insert into t values (1), (2)")[1] == "insert into t values (?)"
+
+
+def test_fingerprint_keeps_quoted_identifiers():
+    assert fingerprint_sql('select "Col1" from t')[0] != fingerprint_sql('select "Col2" from t')[0]
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+import waiters
+from waiters import find_state, poll_until
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(waiters, "POLL_INITIAL", 0.001)
+    monkeypatch.setattr(waiters, "POLL_MAX", 0.004)
+
+
+class Context:
+    def __init__(self):
+        self.messages = []
+        self.progress = []
+
+    async def info(self, message):
+        self.messages.append(message)
+
+    async def report_progress(self, progress, total):
+        self.progress.append((progress, total))
+
+
+def states(*sequence):
+    remaining = list(sequence)
+
+    async def fetch():
+        state = remaining.pop(0) if len(remaining) > 1 else remaining[0]
+        return {"engine": {"status": state}}
+
+    return fetch
+
+
+def test_find_state_searches_nested_results():
+    assert find_state({"engine": {"status": "RUNNING"}}) == "running"
+    assert find_state({"state": "paused", "status": 3}) == "paused"
+    assert find_state({"a": {"b": {"c": {"status": "deep"}}}}) is None
+
+
+def test_waits_until_the_target_state_and_reports_transitions():
+    ctx = Context()
+    outcome = asyncio.run(poll_until(
+        states("starting", "starting", "starting", "running"), ["RUNNING"], 5, ctx, label="Engine e1",
+    ))
+    assert outcome["reached"] and not outcome["failed"] and not outcome["timed_out"]
+    assert outcome["polls"] == 4
+    assert [t["state"] for t in outcome["transitions"]] == ["starting", "running"]
+    assert ctx.messages == ["Engine e1 is starting", "Engine e1 is running"]
+    assert len(ctx.progress) == 4
+
+
+def test_stops_on_a_failed_state():
+    outcome = asyncio.run(poll_until(states("starting", "failed"), ["running"], 5))
+    assert outcome["failed"] and not outcome["reached"]
+    assert outcome["state"] == "failed"
+
+
+def test_times_out_when_the_state_never_changes():
+    outcome = asyncio.run(poll_until(states("starting"), ["running"], 0.02))
+    assert outcome["timed_out"]
+    assert outcome["polls"] > 1
+
+
+def test_a_client_that_went_away_does_not_abort_the_wait():
+    class Gone(Context):
+        async def info(self, message):
+            raise ConnectionError("closed")
+
+    outcome = asyncio.run(poll_until(states("running"), ["running"], 5, Gone()))
+    assert outcome["reached"]
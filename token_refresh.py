@@ -0,0 +1,116 @@
+# token_refresh.py
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+# Refresh this many seconds before the token expires, plus up to REFRESH_JITTER more
+# so several server processes sharing an API key don't all hit IAM at once.
+REFRESH_LEAD = float(os.getenv("WATSONX_DATA_TOKEN_REFRESH_LEAD", "300"))
+REFRESH_JITTER = float(os.getenv("WATSONX_DATA_TOKEN_REFRESH_JITTER", "60"))
+# Delay before retrying after a failed background refresh.
+RETRY_DELAY = float(os.getenv("WATSONX_DATA_TOKEN_REFRESH_RETRY", "10"))
+
+
+class TokenRefresher:
+    """Keeps an IAM token manager's bearer token fresh from a background thread.
+
+    Installs itself as the token manager's get_token, so request threads only
+    read the cached token. If a caller finds the token missing or expired it
+    joins the single in-flight refresh instead of starting its own.
+    """
+
+    def __init__(self, token_manager):
+        self.token_manager = token_manager
+        self._lock = threading.Lock()
+        self._inflight = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.fetches = 0
+        self.failures = 0
+        self.last_fetch_ms = None
+        self.max_fetch_ms = 0.0
+        self.total_fetch_ms = 0.0
+        self.next_refresh_at = None
+
+    def start(self):
+        self.token_manager.get_token = self.get_token
+        self._thread = threading.Thread(target=self._run, name="iam-token-refresh", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def get_token(self):
+        manager = self.token_manager
+        if manager.access_token is None or manager.expire_time <= time.time():
+            self.refresh()
+        return manager.access_token
+
+    def refresh(self):
+        with self._lock:
+            inflight = self._inflight
+            owner = inflight is None
+            if owner:
+                inflight = self._inflight = Future()
+        if not owner:
+            return inflight.result()
+
+        start = time.perf_counter()
+        try:
+            response = self.token_manager.request_token()
+            self.token_manager._save_token_info(response)
+        except Exception as e:
+            self.failures += 1
+            inflight.set_exception(e)
+            raise
+        else:
+            self._record_fetch((time.perf_counter() - start) * 1000)
+            inflight.set_result(None)
+        finally:
+            with self._lock:
+                self._inflight = None
+
+    def _record_fetch(self, elapsed_ms):
+        self.fetches += 1
+        self.last_fetch_ms = elapsed_ms
+        self.total_fetch_ms += elapsed_ms
+        self.max_fetch_ms = max(self.max_fetch_ms, elapsed_ms)
+
+    def _next_delay(self):
+        expire_time = self.token_manager.expire_time
+        if not expire_time:
+            return 0
+        remaining = expire_time - time.time()
+        # Scale the lead and jitter down for short-lived tokens so we never spin.
+        lead = min(REFRESH_LEAD, remaining * 0.2)
+        jitter = random.uniform(0, min(REFRESH_JITTER, remaining * 0.1))
+        return max(remaining - lead - jitter, 1)
+
+    def _run(self):
+        delay = self._next_delay()
+        while True:
+            self.next_refresh_at = time.time() + delay
+            if self._stop.wait(delay):
+                return
+            try:
+                self.refresh()
+                delay = self._next_delay()
+            except Exception:
+                delay = RETRY_DELAY
+
+    def stats(self):
+        now = time.time()
+        expire_time = self.token_manager.expire_time
+        return {
+            "fetches": self.fetches,
+            "failures": self.failures,
+            "last_fetch_ms": self.last_fetch_ms,
+            "avg_fetch_ms": self.total_fetch_ms / self.fetches if self.fetches else None,
+            "max_fetch_ms": self.max_fetch_ms,
+            "expires_in_s": expire_time - now if expire_time else None,
+            "next_refresh_in_s": self.next_refresh_at - now if self.next_refresh_at else None,
+        }
@@ -0,0 +1,59 @@
+# tool_params.py
+
+import functools
+import inspect
+
+from mcp.server.fastmcp.utilities.func_metadata import FuncMetadata
+
+from codec import loads
+
+
+def bind_parameter(fn, name, annotation, default, var):
+    """Add a keyword-only parameter to an async tool.
+
+    The value is not passed to fn; it is set on the ContextVar var for the
+    duration of the call so the layers below (the AsyncClient) can read it.
+    The advertised signature is extended so FastMCP includes the parameter
+    in the tool's input schema.
+    """
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = var.set(kwargs.pop(name, default))
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            var.reset(token)
+
+    parameter = inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, default=default, annotation=annotation)
+    wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), parameter])
+    return wrapper
+
+
+class JsonArguments(FuncMetadata):
+    """FuncMetadata that pre-parses JSON-encoded arguments with the configured codec.
+
+    Unlike FastMCP's own pre-parsing, string parameters are left alone, so a
+    *_json: str argument holding a JSON object reaches the tool as text and is
+    decoded exactly once, by the tool.
+    """
+
+    def pre_parse_json(self, data):
+        parsed = dict(data)
+        for field_name, field_info in self.arg_model.model_fields.items():
+            value = data.get(field_name)
+            if not isinstance(value, str) or field_info.annotation is str:
+                continue
+            try:
+                decoded = loads(value)
+            except ValueError:
+                continue
+            if not isinstance(decoded, (str, int, float)):
+                parsed[field_name] = decoded
+        return parsed
+
+
+def use_json_arguments(tool):
+    tool.fn_metadata = JsonArguments(arg_model=tool.fn_metadata.arg_model)
+    return tool
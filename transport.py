@@ -0,0 +1,90 @@
+# transport.py
+
+import os
+import socket
+import ssl
+
+from ibm_cloud_sdk_core.utils import SSLHTTPAdapter
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from urllib3.util.ssl_ import create_urllib3_context
+
+from executor import MAX_WORKERS
+
+# Number of per-host connection pools kept by the session.
+POOL_CONNECTIONS = int(os.getenv("WATSONX_DATA_HTTP_POOL_CONNECTIONS", "4"))
+# Maximum connections kept open to a single host; sized to the worker pool by default.
+POOL_MAXSIZE = int(os.getenv("WATSONX_DATA_HTTP_POOL_MAXSIZE", str(MAX_WORKERS)))
+# Wait for a free pooled connection instead of opening a throwaway one.
+POOL_BLOCK = os.getenv("WATSONX_DATA_HTTP_POOL_BLOCK", "true").lower() == "true"
+CONNECT_TIMEOUT = float(os.getenv("WATSONX_DATA_HTTP_CONNECT_TIMEOUT", "10"))
+READ_TIMEOUT = float(os.getenv("WATSONX_DATA_HTTP_READ_TIMEOUT", "60"))
+# Retries for connection-level failures (refused connections, dropped keep-alive sockets).
+HTTP_RETRIES = int(os.getenv("WATSONX_DATA_HTTP_RETRIES", "2"))
+KEEPALIVE_IDLE = int(os.getenv("WATSONX_DATA_TCP_KEEPALIVE_IDLE", "60"))
+
+
+def _socket_options():
+    options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    # TCP_KEEPIDLE/TCP_KEEPINTVL are not available on every platform.
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(KEEPALIVE_IDLE // 4, 1)))
+    return options
+
+
+class PooledHTTPAdapter(SSLHTTPAdapter):
+    """SSLHTTPAdapter with TCP keep-alive enabled on pooled sockets."""
+
+    def __init__(self, *args, socket_options=None, **kwargs):
+        # Set before super().__init__, which builds the pool manager.
+        self._socket_options = socket_options
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        # Same TLS floor as SSLHTTPAdapter, plus our socket options.
+        ssl_context = create_urllib3_context()
+        ssl_context.minimum_version = ssl.TLSVersion.TLSv1_2
+        if self._socket_options is not None:
+            pool_kwargs["socket_options"] = self._socket_options
+        HTTPAdapter.init_poolmanager(self, connections, maxsize, block, ssl_context=ssl_context, **pool_kwargs)
+
+
+def configure_transport(client):
+    """Mount a tuned connection pool and timeouts on a WatsonxDataV2 client."""
+    # Only connection errors are retried here; status-code retries belong to callers,
+    # which know whether an operation is safe to repeat.
+    retries = Retry(total=HTTP_RETRIES, connect=HTTP_RETRIES, read=HTTP_RETRIES, status=0, backoff_factor=0.2)
+    adapter = PooledHTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=POOL_BLOCK,
+        max_retries=retries,
+        socket_options=_socket_options(),
+    )
+    client.http_adapter = adapter
+    client.http_client.mount("http://", adapter)
+    client.http_client.mount("https://", adapter)
+    client.set_http_config({"timeout": (CONNECT_TIMEOUT, READ_TIMEOUT)})
+    return client
+
+
+def connection_stats(client):
+    """Count new vs. reused connections across the client's connection pools."""
+    adapter = client.http_client.get_adapter(client.service_url or "https://")
+    pools = []
+    for key in adapter.poolmanager.pools.keys():
+        pool = adapter.poolmanager.pools.get(key)
+        if pool is not None:
+            pools.append(pool)
+    opened = sum(pool.num_connections for pool in pools)
+    requests_sent = sum(pool.num_requests for pool in pools)
+    return {
+        "pools": len(pools),
+        "new_connections": opened,
+        "reused_connections": max(requests_sent - opened, 0),
+        "requests": requests_sent,
+        "pool_maxsize": POOL_MAXSIZE,
+    }
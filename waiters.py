@@ -0,0 +1,90 @@
+# waiters.py
+
+import asyncio
+import os
+import time
+
+# Server-side polling: the first poll follows POLL_INITIAL seconds after the previous
+# one and each unchanged poll waits POLL_FACTOR times longer, up to POLL_MAX.
+# A state change drops the interval back to POLL_INITIAL.
+POLL_INITIAL = float(os.getenv("WATSONX_DATA_POLL_INITIAL", "1"))
+POLL_MAX = float(os.getenv("WATSONX_DATA_POLL_MAX", "15"))
+POLL_FACTOR = float(os.getenv("WATSONX_DATA_POLL_FACTOR", "1.5"))
+# Longest a single wait_for_* call may block.
+MAX_WAIT = float(os.getenv("WATSONX_DATA_MAX_WAIT", "3600"))
+
+FAILED_STATES = {"failed", "error", "errored", "killed", "cancelled", "canceled", "stopped"}
+
+
+def find_state(result, depth=2):
+    """Return the lowercased status/state field of an API result, searching nested dicts."""
+    if not isinstance(result, dict):
+        return None
+    for key in ("status", "state"):
+        if isinstance(result.get(key), str):
+            return result[key].lower()
+    if depth:
+        for value in result.values():
+            state = find_state(value, depth - 1)
+            if state is not None:
+                return state
+    return None
+
+
+async def notify(ctx, message=None, progress=None, total=None):
+    """Send a log and/or progress notification if the call has an MCP context."""
+    if ctx is None:
+        return
+    try:
+        if message is not None:
+            await ctx.info(message)
+        if progress is not None:
+            await ctx.report_progress(progress, total)
+    except Exception:
+        # A client that went away must not abort the wait.
+        pass
+
+
+async def poll_until(fetch, targets, timeout, ctx=None, label="", terminal=FAILED_STATES):
+    """Poll fetch() with adaptive backoff until its state is in targets.
+
+    Stops early when the state is in terminal (and not a target). Every
+    state change is sent to the client as a log message; progress is the
+    elapsed share of the timeout.
+    """
+    timeout = max(0.0, min(timeout, MAX_WAIT))
+    targets = {target.lower() for target in targets}
+    start = time.monotonic()
+    delay = POLL_INITIAL
+    polls = 0
+    state = None
+    transitions = []
+    while True:
+        result = await fetch()
+        polls += 1
+        elapsed = time.monotonic() - start
+        new_state = find_state(result)
+        if new_state != state or polls == 1:
+            state = new_state
+            transitions.append({"state": state, "at_s": round(elapsed, 1)})
+            await notify(ctx, f"{label} is {state}")
+            delay = POLL_INITIAL
+        else:
+            delay = min(delay * POLL_FACTOR, POLL_MAX)
+        await notify(ctx, progress=min(elapsed, timeout), total=timeout)
+
+        reached = state in targets
+        failed = not reached and state in terminal
+        remaining = timeout - elapsed
+        if reached or failed or remaining <= 0:
+            return {
+                "state": state,
+                "reached": reached,
+                "failed": failed,
+                "timed_out": not reached and not failed,
+                "elapsed_s": round(elapsed, 1),
+                "polls": polls,
+                "transitions": transitions,
+                "result": result,
+            }
+        await asyncio.sleep(min(delay, remaining))